@@ -0,0 +1,60 @@
+"""
+Rule Codegen Benchmark
+======================
+인터프리터 엔진과 규칙 세트 특화 함수(engine.codegen) 비교:
+내장 규칙 평가만(_evaluate_builtin), validate() 루프 전체, 코드 생성/디스크 캐시 로드 비용.
+
+실행: python benchmarks/bench_codegen.py [n_records]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord
+from engine.codegen import RuleCompiler
+from engine.sagemaker_replication import SyntheticClaimGenerator
+
+def best_of(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main(n_records: int = 100_000):
+    df = SyntheticClaimGenerator(seed=42).generate(n_records, anomaly_rate=0.3)
+    claims = [ClaimRecord.from_dict(row) for row in df.to_dict("records")]
+    cache_dir = tempfile.mkdtemp(prefix="rxhcc_codegen_bench_")
+    try:
+        interpreted = RxHCCRuleEngine()
+        compiled = RxHCCRuleEngine()
+
+        t0 = time.perf_counter()
+        compiled.enable_codegen(cache_dir)
+        cold_s = time.perf_counter() - t0
+        warm_s = best_of(lambda: RuleCompiler(cache_dir).function(compiled.ruleset), repeat=5)
+
+        assert [compiled.validate(c) for c in claims] == [interpreted.validate(c) for c in claims]
+
+        rs = interpreted.ruleset
+        fn = compiled._codegen.function(rs)
+        builtin_i = best_of(lambda: [interpreted._evaluate_builtin(c, rs) for c in claims])
+        builtin_c = best_of(lambda: [fn(c) for c in claims])
+        loop_i = best_of(lambda: [interpreted.validate(c) for c in claims])
+        loop_c = best_of(lambda: [compiled.validate(c) for c in claims])
+
+        print(f"records: {n_records:,}")
+        print(f"codegen cold (generate + write + compile): {cold_s * 1e3:.1f} ms, warm (verified disk load): {warm_s * 1e3:.1f} ms")
+        print(f"{'path':<22}{'interpreted':>13}{'codegen':>10}{'speedup':>9}")
+        print(f"{'built-in checks only':<22}{builtin_i:>12.3f}s{builtin_c:>9.3f}s{builtin_i / builtin_c:>8.2f}x")
+        print(f"{'validate() loop':<22}{loop_i:>12.3f}s{loop_c:>9.3f}s{loop_i / loop_c:>8.2f}x")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,58 @@
+"""
+Columnar / Vocabulary Encoding Benchmark
+========================================
+청구 단위 validate() 루프 vs int32 사전 인코딩 기반 validate_columnar 시간 비교,
+그리고 ClaimRecord 리스트 vs EncodedClaims 메모리 비교.
+
+실행: python benchmarks/bench_columnar.py [n_claims]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord
+from engine.sagemaker_replication import SyntheticClaimGenerator
+from engine.vocab import EncodedClaims
+
+def traced(fn):
+    """fn() 실행 결과와 그 결과가 붙잡고 있는 메모리(bytes)"""
+    tracemalloc.start()
+    value = fn()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, current
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    df = SyntheticClaimGenerator(seed=42).generate(n, anomaly_rate=0.3)
+    engine = RxHCCRuleEngine()
+
+    records = df.to_dict("records")
+    claims, claim_bytes = traced(lambda: [ClaimRecord.from_dict(r) for r in records])
+    encoded, encoded_bytes = traced(lambda: EncodedClaims.from_dataframe(df))
+    print(f"claims={n} vocab icd={len(encoded.icd.vocab)} ndc={len(encoded.ndc.vocab)} hcc={len(encoded.hcc.vocab)}")
+    print(f"ClaimRecord list : {claim_bytes / 1e6:8.1f} MB")
+    print(f"EncodedClaims    : {encoded_bytes / 1e6:8.1f} MB  ({claim_bytes / encoded_bytes:.1f}x smaller)")
+
+    start = time.perf_counter()
+    for claim in claims:
+        engine.validate(claim)
+    scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    EncodedClaims.from_dataframe(df)
+    encode = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.validate_columnar(df, encoded=encoded)
+    columnar = time.perf_counter() - start
+
+    print(f"validate() loop  : {scalar * 1000:8.1f} ms")
+    print(f"encode           : {encode * 1000:8.1f} ms")
+    print(f"validate_columnar: {columnar * 1000:8.1f} ms  ({scalar / (encode + columnar):.1f}x incl. encode)")
+
+if __name__ == "__main__":
+    main()
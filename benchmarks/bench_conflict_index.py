@@ -0,0 +1,69 @@
+"""
+Conflict Rule Index Benchmark
+=============================
+ICD 충돌 규칙 테이블 크기에 따른 검증 시간 측정.
+역인덱스(_conflict_index) 경로와 기존 선형 스캔을 비교.
+
+실행: python benchmarks/bench_conflict_index.py
+"""
+import csv
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, ICD_CONFLICT_RULES, Severity
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_claims.csv')
+TABLE_SIZES = [3, 100, 1000, 5000]
+
+def load_claims():
+    with open(SAMPLE_CSV, newline='', encoding='utf-8') as f:
+        return [ClaimRecord.from_dict(row) for row in csv.DictReader(f)]
+
+def synthetic_conflict_rules(n: int):
+    """기본 규칙 + 실제 청구에 거의 매칭되지 않는 합성 규칙으로 n개 테이블 구성"""
+    rules = list(ICD_CONFLICT_RULES)
+    for i in range(n - len(rules)):
+        rules.append({
+            "rule_id": f"CONFLICT-S{i:05d}",
+            "name": f"Synthetic Conflict {i}",
+            "codes_a": [f"Q{i % 100:02d}.{i // 100}"],
+            "codes_b": [f"R{i % 97:02d}"],
+            "severity": Severity.WARNING,
+            "message": "synthetic",
+        })
+    return rules[:n]
+
+def linear_conflict_scan(rules, claim: ClaimRecord):
+    """인덱스 도입 전 _check_icd_conflicts와 동일한 전체 스캔"""
+    fired = []
+    for rule in rules:
+        has_a = any(any(icd.startswith(code) for code in rule["codes_a"]) for icd in claim.icd_codes)
+        has_b = any(any(icd.startswith(code) for code in rule["codes_b"]) for icd in claim.icd_codes)
+        if has_a and has_b:
+            fired.append(rule["rule_id"])
+    return fired
+
+def main():
+    claims = load_claims()
+    print(f"claims={len(claims)}")
+    print(f"{'rules':>6} {'linear (ms)':>12} {'indexed (ms)':>13} {'speedup':>8}")
+    for size in TABLE_SIZES:
+        rules = synthetic_conflict_rules(size)
+        engine = RxHCCRuleEngine(custom_conflicts=rules)
+
+        start = time.perf_counter()
+        expected = [linear_conflict_scan(rules, c) for c in claims]
+        linear_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        got = [[r.rule_id for r in engine._check_icd_conflicts(c)] for c in claims]
+        indexed_ms = (time.perf_counter() - start) * 1000
+
+        assert got == expected, "indexed conflict results diverge from linear scan"
+        print(f"{size:>6} {linear_ms:>12.1f} {indexed_ms:>13.1f} {linear_ms / indexed_ms:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
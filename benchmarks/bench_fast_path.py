@@ -0,0 +1,58 @@
+"""
+Fast Path Benchmark
+===================
+규칙 어휘(RuleSet.vocabulary)에 걸리는 코드가 없는 청구를 그래프 없이 자동 승인하는 fast path의
+트래픽 비율과 run_validation() 처리량 (fast path on/off).
+- routine: FWADataGenerator의 일반 외래 청구 (요통, 상기도 감염, 건강검진 등 규칙 대상이 아닌 코드가 대부분)
+- rule sample: data/sample_claims.csv (규칙 검증용으로 당뇨/GLP-1/HCC 코드 위주로 뽑은 샘플)
+
+실행: python benchmarks/bench_fast_path.py [n_claims]
+"""
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import langgraph_integrity as li
+from engine.fwa_data_generator import FWADataGenerator
+
+SAMPLE_CLAIMS = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_claims.csv')
+
+def routine_claims(n: int):
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        df = FWADataGenerator(seed=42).generate(n, output_path=os.path.join(tmp, "claims.csv"))
+    df = df.rename(columns={"member_id": "patient_id"})
+    df["ndc_code"] = df["ndc_code"].fillna("")
+    return df[["claim_id", "patient_id", "diagnosis_code", "ndc_code", "provider_id", "claim_amount"]].to_dict("records")
+
+def run(claims, enabled: bool):
+    li.set_fast_path_enabled(enabled)
+    li.reset_fast_path_stats()
+    t0 = time.perf_counter()
+    stages = [li.run_validation(c)["stage"] for c in claims]
+    return time.perf_counter() - t0, stages, li.fast_path_stats()
+
+def main(n_claims: int = 2000):
+    traffic = {
+        "routine": routine_claims(n_claims),
+        "rule sample": pd.read_csv(SAMPLE_CLAIMS, dtype=str, keep_default_na=False).head(n_claims).to_dict("records"),
+    }
+    li.run_validation(traffic["rule sample"][0]) # 그래프/엔진 캐시 준비
+
+    print(f"{'traffic':<14}{'claims':>8}{'fast path':>11}{'off claims/s':>14}{'on claims/s':>13}{'speedup':>9}")
+    for name, claims in traffic.items():
+        off_s, off_stages, _ = run(claims, enabled=False)
+        on_s, on_stages, stats = run(claims, enabled=True)
+        assert on_stages == off_stages
+        print(f"{name:<14}{len(claims):>8,}{stats['fast_path_share']:>10.1%} "
+              f"{len(claims) / off_s:>13,.0f}{len(claims) / on_s:>13,.0f}{off_s / on_s:>8.1f}x")
+    li.set_fast_path_enabled(True)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,62 @@
+"""
+Validation Graph Cache Benchmark
+================================
+run_validation() 단건 지연시간: 캐시 비운 직후 첫 호출(cold: 엔진 생성 + 그래프 컴파일)과
+이후 호출(warm: 캐시 재사용), 그리고 청구마다 그래프/엔진을 새로 만들던 기존 방식 비교.
+
+실행: python benchmarks/bench_graph_cache.py [n_calls]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import langgraph_integrity as li
+from engine.rules import RxHCCRuleEngine
+
+CLAIM = {
+    "claim_id": "BENCH-001",
+    "patient_id": "PAT-001",
+    "icd_codes": "E10.9,E11.65",
+    "ndc_codes": "00088-2500-33",
+    "hcc_codes": "HCC18",
+}
+
+def per_call_compile(claim):
+    """기존 동작: 호출마다 그래프 컴파일 + 엔진 생성"""
+    RxHCCRuleEngine()
+    graph = li.build_validation_graph()
+    return graph.invoke(li._initial_state(claim, "full"))
+
+def timed_ms(fn, n: int):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return samples
+
+def main(n_calls: int = 200):
+    if not li.LANGGRAPH_AVAILABLE:
+        print("langgraph not installed; run_validation uses the sequential fallback")
+        return
+    colds = []
+    for _ in range(5):
+        li.clear_validation_cache()
+        colds += timed_ms(lambda: li.run_validation(CLAIM), 1)
+    warm = timed_ms(lambda: li.run_validation(CLAIM), n_calls)
+    uncached = timed_ms(lambda: per_call_compile(CLAIM), max(n_calls // 4, 10))
+
+    def row(name, samples):
+        p95 = sorted(samples)[int(len(samples) * 0.95) - 1] if len(samples) >= 20 else max(samples)
+        print(f"{name:<28}{statistics.median(samples):>10.2f}{p95:>10.2f}")
+
+    print(f"{'run_validation latency':<28}{'p50 ms':>10}{'p95 ms':>10}")
+    row("cold (compile + engine)", colds)
+    row("warm (cached)", warm)
+    row("compile per call (before)", uncached)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
@@ -0,0 +1,56 @@
+"""
+Rule Branch Fan-out Benchmark
+=============================
+run_validation() (규칙 단위별 branch fan-out) vs run_validation_sequential() (단일 rules 노드) 지연시간.
+외부 조회가 있는 느린 규칙(참조 데이터/이력 조회 등)을 sleep으로 흉내 낸 커스텀 규칙 N개를 등록하면
+fan-out 경로는 대기 시간이 겹치고, 순차 경로는 합산됨. 느린 규칙이 없을 때는 branch 분기 오버헤드를 측정.
+
+실행: python benchmarks/bench_graph_fanout.py [n_calls] [slow_rule_ms]
+"""
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import langgraph_integrity as li
+
+CLAIM = {
+    "claim_id": "BENCH-001",
+    "patient_id": "PAT-001",
+    "icd_codes": "E10.9,E11.65",
+    "ndc_codes": "00088-2500-33",
+    "hcc_codes": "HCC18",
+}
+
+def p50_ms(fn, n: int) -> float:
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1e3)
+    return statistics.median(samples)
+
+def main(n_calls: int = 50, slow_rule_ms: float = 20.0):
+    if not li.LANGGRAPH_AVAILABLE:
+        print("langgraph not installed; only the sequential path is available")
+        return
+    print(f"{'slow rules':<12}{'fan-out p50 ms':>16}{'sequential p50 ms':>19}")
+    for n_slow in (0, 1, 3):
+        li.clear_validation_cache()
+        engine = li.get_validation_engine()
+        for _ in range(n_slow):
+            engine.add_custom_rule(lambda claim: time.sleep(slow_rule_ms / 1e3))
+        li.run_validation(CLAIM)
+        fanout = p50_ms(lambda: li.run_validation(CLAIM), n_calls)
+        sequential = p50_ms(lambda: li.run_validation_sequential(CLAIM), n_calls)
+        print(f"{n_slow:<12}{fanout:>16.2f}{sequential:>19.2f}")
+    li.clear_validation_cache()
+    print(f"(slow rule latency: {slow_rule_ms:.0f} ms each)")
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 50,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 20.0,
+    )
@@ -0,0 +1,51 @@
+"""
+Incremental Re-validation Benchmark
+===================================
+규칙 테이블 항목 하나(I10 허용 NDC에 인슐린 추가)를 바꾼 뒤
+PandasBatchValidator 전체 재실행과 revalidate_dataframe() delta 재검증의 소요 시간 비교.
+
+실행: python benchmarks/bench_incremental.py [n_records]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.incremental import DependencyIndex
+from engine.ruleset import RuleSet
+from engine.sagemaker_replication import SyntheticClaimGenerator, PandasBatchValidator
+
+def main(n_records: int = 200_000):
+    df = SyntheticClaimGenerator(seed=42).generate(n_records, anomaly_rate=0.15)
+    validator = PandasBatchValidator()
+    validated = validator.validate_dataframe(df)
+
+    t0 = time.perf_counter()
+    index = DependencyIndex.from_dataframe(validated)
+    index_s = time.perf_counter() - t0
+
+    data = RuleSet.default().to_dict()
+    data["icd_ndc_mappings"]["I10"]["valid_ndc_prefixes"].append("00088-2500")
+    ruleset = RuleSet.from_dict(data)
+
+    full = PandasBatchValidator()
+    full.engine.swap_ruleset(ruleset)
+    t0 = time.perf_counter()
+    expected = full.validate_dataframe(df)
+    full_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    patched = validator.revalidate_dataframe(validated, ruleset, index=index)
+    delta_s = time.perf_counter() - t0
+    report = validator.last_revalidation
+
+    assert patched["validation_results"].equals(expected["validation_results"])
+    print(f"records: {n_records:,}")
+    print(f"dependency index build: {index_s:.2f}s (one-off, reusable)")
+    print(f"full re-run:            {full_s:.2f}s")
+    print(f"delta re-validation:    {delta_s:.2f}s "
+          f"({report.n_affected:,} affected, {report.n_changed:,} changed, {full_s / delta_s:.1f}x faster)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,88 @@
+"""
+Claim / Finding Memory Footprint Benchmark
+==========================================
+__dict__ 기반 ClaimRecord/ValidationResult + 결과마다 복사된 규칙 메타데이터(기존 방식)와
+slots + intern 코드 + 공유 rule_meta(현재 방식)의 메모리 사용량 비교.
+
+실행: python benchmarks/bench_memory.py [n_claims]
+"""
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, Severity
+from engine.sagemaker_replication import SyntheticClaimGenerator
+
+@dataclass
+class LegacyClaimRecord:
+    claim_id: str
+    patient_id: str
+    icd_codes: List[str]
+    ndc_codes: List[str]
+    hcc_codes: List[str] = field(default_factory=list)
+    provider_id: str = ""
+    claim_date: str = ""
+    claim_amount: float = 0.0
+
+@dataclass
+class LegacyValidationResult:
+    rule_id: str
+    rule_name: str
+    severity: Severity
+    message: str
+    details: Dict = field(default_factory=dict)
+
+def legacy_split(val) -> List[str]:
+    return [v.strip() for v in val.split(',') if v.strip()] if isinstance(val, str) else []
+
+def build_legacy(records, engine):
+    """기존 방식: 코드 문자열 비공유, 규칙 메타데이터를 list로 복사한 details"""
+    claims, findings = [], []
+    for row in records:
+        claim = LegacyClaimRecord(
+            claim_id=str(row["claim_id"]), patient_id=str(row["patient_id"]),
+            icd_codes=legacy_split(row["icd_codes"]), ndc_codes=legacy_split(row["ndc_codes"]),
+            hcc_codes=legacy_split(row["hcc_codes"]), provider_id=str(row["provider_id"]),
+            claim_date=str(row["claim_date"]), claim_amount=float(row["claim_amount"]),
+        )
+        claims.append(claim)
+        findings.append([
+            LegacyValidationResult(
+                r.rule_id, r.rule_name, r.severity, r.message,
+                {k: list(v) if isinstance(v, tuple) else v for k, v in r.all_details().items()},
+            )
+            for r in engine.validate(ClaimRecord.from_dict(row))
+        ])
+    return claims, findings
+
+def build_current(records, engine):
+    claims = [ClaimRecord.from_dict(row) for row in records]
+    return claims, [engine.validate(c) for c in claims]
+
+def measure(build, records, engine) -> int:
+    tracemalloc.start()
+    kept = build(records, engine)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df = SyntheticClaimGenerator(seed=42).generate(n, anomaly_rate=0.3)
+    records = df.to_dict("records")
+    engine = RxHCCRuleEngine()
+
+    legacy = measure(build_legacy, records, engine)
+    current = measure(build_current, records, engine)
+    print(f"claims={n}")
+    print(f"legacy  (__dict__, copied details) : {legacy / 1e6:8.1f} MB  ({legacy / n:6.0f} B/claim)")
+    print(f"current (slots, interned, rule_meta): {current / 1e6:8.1f} MB  ({current / n:6.0f} B/claim)")
+    print(f"reduction: {legacy / current:.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+Parallel Batch Validation Benchmark
+===================================
+PandasBatchValidator 처리량(claims/s)을 워커 수 1 → N으로 늘리며 측정.
+풀 기동 비용을 제외하기 위해 워커 수별로 한 번 warm-up 후 측정.
+
+실행: python benchmarks/bench_parallel.py [n_claims] [max_workers] [chunk_size]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.sagemaker_replication import SyntheticClaimGenerator, PandasBatchValidator
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    max_workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    chunk_size = int(sys.argv[3]) if len(sys.argv) > 3 else 5000
+    df = SyntheticClaimGenerator(seed=42).generate(n, anomaly_rate=0.3)
+    print(f"claims={n} cpu_count={os.cpu_count()} chunk_size={chunk_size}")
+
+    baseline = None
+    workers = 1
+    while workers <= max_workers:
+        validator = PandasBatchValidator(workers=workers, chunk_size=chunk_size)
+        validator.validate_dataframe(df.head(chunk_size * workers)) # warm-up (풀 기동)
+        start = time.perf_counter()
+        validator.validate_dataframe(df)
+        elapsed = time.perf_counter() - start
+        validator.close()
+
+        baseline = baseline or elapsed
+        print(f"workers={workers:3d}: {elapsed:7.2f} s  {n / elapsed:10,.0f} claims/s  ({baseline / elapsed:.2f}x)")
+        workers *= 2
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Rule Profiling Benchmark
+========================
+프로파일링 비활성/활성 시 validate() 처리 시간 비교 후 규칙 단위 통계 출력.
+
+실행: python benchmarks/bench_profiling.py [n_claims]
+"""
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord
+from engine.sagemaker_replication import SyntheticClaimGenerator
+
+def run(engine, claims) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for claim in claims:
+            engine.validate(claim)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    df = SyntheticClaimGenerator(seed=42).generate(n, anomaly_rate=0.3)
+    claims = [ClaimRecord.from_dict(r) for r in df.to_dict("records")]
+
+    engine = RxHCCRuleEngine()
+    disabled = run(engine, claims)
+    engine.enable_profiling()
+    enabled = run(engine, claims)
+
+    print(f"claims={n}")
+    print(f"profiling off: {disabled * 1000:8.1f} ms")
+    print(f"profiling on : {enabled * 1000:8.1f} ms  (+{(enabled / disabled - 1) * 100:.0f}%)")
+    print(json.dumps(engine.profile_snapshot(), indent=2))
+
+if __name__ == "__main__":
+    main()
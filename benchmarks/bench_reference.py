@@ -0,0 +1,93 @@
+"""
+Reference Dictionary Benchmark
+==============================
+전체 규모(ICD-10-CM ~70k, NDC package ~300k)의 합성 원본 파일로
+원본 파싱 → set 구성(프로세스마다 반복되는 기존 방식) vs memory-mapped 바이너리 열기 비교,
+코드 조회 처리량과 워커에 전달되는 pickle 크기 측정.
+
+실행: python benchmarks/bench_reference.py [n_icd] [n_ndc]
+"""
+import os
+import pickle
+import random
+import shutil
+import string
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.reference import (
+    ReferenceData, ICD_SOURCE_FILE, NDC_SOURCE_FILE,
+    parse_icd10cm_codes, parse_ndc_packages, normalize_icd, normalize_ndc,
+)
+
+def write_sources(source_dir: str, n_icd: int, n_ndc: int, rng: random.Random):
+    icds = set()
+    while len(icds) < n_icd:
+        icds.add(rng.choice(string.ascii_uppercase) + f"{rng.randint(0, 99):02d}" + str(rng.randint(0, 9999)))
+    with open(os.path.join(source_dir, ICD_SOURCE_FILE), "w") as f:
+        for code in sorted(icds):
+            f.write(f"{code:<8}Synthetic diagnosis {code}\n")
+    ndcs = set()
+    while len(ndcs) < n_ndc:
+        ndcs.add(f"{rng.randint(0, 99999):05d}-{rng.randint(0, 999):03d}-{rng.randint(0, 99):02d}")
+    with open(os.path.join(source_dir, NDC_SOURCE_FILE), "w") as f:
+        f.write("PRODUCTNDC\tNDCPACKAGECODE\tPACKAGEDESCRIPTION\n")
+        for code in sorted(ndcs):
+            f.write(f"{code.rsplit('-', 1)[0]}\t{code}\t1 BOTTLE in 1 CARTON\n")
+    return sorted(icds), sorted(ndcs)
+
+def main(n_icd: int = 70_000, n_ndc: int = 300_000):
+    rng = random.Random(42)
+    workdir = tempfile.mkdtemp(prefix="rxhcc_reference_bench_")
+    try:
+        source_dir, cache_dir = os.path.join(workdir, "src"), os.path.join(workdir, "cache")
+        os.makedirs(source_dir)
+        icds, ndcs = write_sources(source_dir, n_icd, n_ndc, rng)
+
+        t0 = time.perf_counter()
+        icd_set = {normalize_icd(c) for c in parse_icd10cm_codes(os.path.join(source_dir, ICD_SOURCE_FILE))}
+        ndc_set = {normalize_ndc(c) for c in parse_ndc_packages(os.path.join(source_dir, NDC_SOURCE_FILE))}
+        parse_s = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ReferenceData.load(source_dir, cache_dir)
+        cold_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reference = ReferenceData.load(source_dir, cache_dir)
+        warm_s = time.perf_counter() - t0
+
+        # 청구에 실제로 등장하는 NDC는 소수 제품에 집중 (활성 5k개 + 무효 코드 10%)
+        active = rng.sample(ndcs, 5_000)
+        queries = [rng.choice(active) if rng.random() < 0.9 else f"99999-{rng.randint(0, 9999):04d}-99"
+                   for _ in range(200_000)]
+        unique_queries = list(dict.fromkeys(queries))
+        t0 = time.perf_counter()
+        hits_set = sum(normalize_ndc(q) in ndc_set for q in queries)
+        set_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        hits_bisect = sum(reference.ndc.contains_many(unique_queries))
+        bulk_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        hits_mmap = sum(q in reference.ndc for q in queries)
+        mmap_s = time.perf_counter() - t0
+        assert hits_set == hits_mmap
+
+        bin_bytes = sum(os.path.getsize(os.path.join(cache_dir, f)) for f in os.listdir(cache_dir))
+        print(f"ICD codes: {len(icd_set):,}, NDC packages: {len(ndc_set):,}")
+        print(f"parse sources into sets (per process): {parse_s * 1e3:8.1f} ms")
+        print(f"compile to .bin + memmap (once):      {cold_s * 1e3:8.1f} ms")
+        print(f"open existing .bin (per process):      {warm_s * 1e3:8.1f} ms")
+        print(f".bin size on disk: {bin_bytes / 1e6:.1f} MB, pickled ReferenceData: {len(pickle.dumps(reference))} bytes")
+        print(f"200k NDC lookups: set {set_s * 1e3:.0f} ms, memmap (memo) {mmap_s * 1e3:.0f} ms, "
+              f"contains_many over {len(unique_queries):,} unique {bulk_s * 1e3:.0f} ms ({hits_bisect:,} hits)")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 70_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 300_000,
+    )
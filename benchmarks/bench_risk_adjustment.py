@@ -0,0 +1,62 @@
+"""
+Risk Adjustment Benchmark
+=========================
+환자별 HCC/RAF 계산: 청구 행 루프(ClaimRecord + HCCModel.raf_score)와
+벡터화 경로(EncodedClaims vocab 매핑 + (환자, HCC) 키 groupby) 비교.
+
+실행: python benchmarks/bench_risk_adjustment.py [n_records] [n_patients]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from engine.rules import ClaimRecord
+from engine.risk_adjustment import HCCModel, compute_risk_adjustment
+from engine.sagemaker_replication import SyntheticClaimGenerator
+from engine.vocab import EncodedClaims
+
+def row_loop(df: pd.DataFrame, model: HCCModel) -> dict:
+    icds = {}
+    for data in df.to_dict("records"):
+        claim = ClaimRecord.from_dict(data)
+        icds.setdefault(claim.patient_id, []).extend(claim.icd_codes)
+    return {p: model.raf_score(codes) for p, codes in icds.items()}
+
+def main(n_records: int = 500_000, n_patients: int = 100_000):
+    df = SyntheticClaimGenerator(seed=42).generate(n_records, anomaly_rate=0.3)
+    df["patient_id"] = "PAT-" + (pd.Series(range(len(df))) % n_patients).astype(str)
+
+    t0 = time.perf_counter()
+    model = HCCModel.from_dir()
+    load_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    encoded = EncodedClaims.from_dataframe(df)
+    encode_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    result = compute_risk_adjustment(df, model, encoded=encoded)
+    vector_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    expected = row_loop(df, model)
+    loop_s = time.perf_counter() - t0
+
+    got = dict(zip(result.patients["patient_id"], result.patients["raf_score"]))
+    assert all(abs(got[p] - expected[p]) < 1e-9 for p in expected)
+
+    print(f"records: {n_records:,}, patients: {n_patients:,}, model HCCs: {model.n_hccs}, crosswalk rows: {len(model.icd_keys)}")
+    print(f"model load: {load_s * 1e3:.1f} ms")
+    print(f"row loop:             {loop_s:.3f}s")
+    print(f"vectorized (encode):  {encode_s:.3f}s")
+    print(f"vectorized (compute): {vector_s:.3f}s  -> {loop_s / (encode_s + vector_s):.1f}x incl. encoding")
+    print(f"summary: {result.summary()}")
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 500_000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 100_000,
+    )
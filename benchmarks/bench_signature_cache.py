@@ -0,0 +1,47 @@
+"""
+Signature Cache Benchmark
+=========================
+코드 조합이 반복되는(skewed) 배치에서 시그니처 캐시 on/off 검증 시간 비교.
+
+실행: python benchmarks/bench_signature_cache.py
+"""
+import csv
+import os
+import sys
+import time
+from dataclasses import replace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, claim_signature
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_claims.csv')
+REPEAT = 50
+
+def load_skewed_claims():
+    """sample_claims.csv를 REPEAT배로 복제 (claim_id만 다름)"""
+    with open(SAMPLE_CSV, newline='', encoding='utf-8') as f:
+        base = [ClaimRecord.from_dict(row) for row in csv.DictReader(f)]
+    return [replace(c, claim_id=f"{c.claim_id}-{i}") for i in range(REPEAT) for c in base]
+
+def run(engine, claims) -> float:
+    start = time.perf_counter()
+    for claim in claims:
+        engine.validate(claim)
+    return time.perf_counter() - start
+
+def main():
+    claims = load_skewed_claims()
+    unique = len({claim_signature(c) for c in claims})
+    print(f"claims={len(claims)} unique_signatures={unique}")
+
+    baseline = run(RxHCCRuleEngine(), claims)
+    cached_engine = RxHCCRuleEngine(cache_size=4096)
+    cached = run(cached_engine, claims)
+
+    print(f"no cache : {baseline * 1000:8.1f} ms")
+    print(f"cache    : {cached * 1000:8.1f} ms  ({baseline / cached:.1f}x)")
+    print(f"stats    : {cached_engine.cache_stats()}")
+
+if __name__ == "__main__":
+    main()
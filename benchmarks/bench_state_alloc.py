@@ -0,0 +1,86 @@
+"""
+ValidationState Allocation Profile
+==================================
+data/sample_claims.csv 청구를 fast path 없이 전체 파이프라인으로 검증하면서 측정:
+- 청구당 ClaimRecord.from_dict / ValidationResult.to_dict 호출 수 (parse/serialize 왕복)
+- 청구당 transient peak (tracemalloc, 호출마다 reset_peak) 와 최종 상태 보관 크기
+- 청구당 지연시간 (tracemalloc 없이)
+
+실행: python benchmarks/bench_state_alloc.py [n_claims]
+"""
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import langgraph_integrity as li
+from engine.rules import ClaimRecord, ValidationResult
+
+SAMPLE_CLAIMS = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_claims.csv')
+
+def count_calls(n_claims, fn, claims):
+    """from_dict / to_dict 호출 수 (청구당)"""
+    counts = {"from_dict": 0, "to_dict": 0}
+    from_dict, to_dict = ClaimRecord.from_dict.__func__, ValidationResult.to_dict
+    def counted_from_dict(cls, data):
+        counts["from_dict"] += 1
+        return from_dict(cls, data)
+    def counted_to_dict(self, *args, **kwargs):
+        counts["to_dict"] += 1
+        return to_dict(self, *args, **kwargs)
+    ClaimRecord.from_dict = classmethod(counted_from_dict)
+    ValidationResult.to_dict = counted_to_dict
+    try:
+        for c in claims:
+            fn(c)
+    finally:
+        ClaimRecord.from_dict = classmethod(from_dict)
+        ValidationResult.to_dict = to_dict
+    return {k: v / n_claims for k, v in counts.items()}
+
+def profile(fn, claims):
+    n = len(claims)
+    calls = count_calls(n, fn, claims)
+
+    tracemalloc.start()
+    peaks = []
+    states = []
+    base = tracemalloc.get_traced_memory()[0]
+    for c in claims:
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        states.append(fn(c))
+        peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    retained = (tracemalloc.get_traced_memory()[0] - base) / n
+    tracemalloc.stop()
+    del states
+
+    t0 = time.perf_counter()
+    for c in claims:
+        fn(c)
+    us = (time.perf_counter() - t0) / n * 1e6
+    return calls, statistics.median(peaks), retained, us
+
+def main(n_claims: int = 500):
+    claims = pd.read_csv(SAMPLE_CLAIMS, dtype=str, keep_default_na=False).head(n_claims).to_dict("records")
+    li.set_fast_path_enabled(False)
+    li.run_validation(claims[0]) # 그래프/엔진 캐시 준비
+    paths = {"sequential": li.run_validation_sequential}
+    if li.LANGGRAPH_AVAILABLE:
+        paths["graph"] = li.run_validation
+
+    print(f"claims: {len(claims):,} (fast path disabled)")
+    print(f"{'path':<12}{'from_dict':>11}{'to_dict':>9}{'peak KiB':>10}{'retained KiB':>14}{'us/claim':>10}")
+    for name, fn in paths.items():
+        calls, peak, retained, us = profile(fn, claims)
+        print(f"{name:<12}{calls['from_dict']:>11.2f}{calls['to_dict']:>9.2f}"
+              f"{peak / 1024:>10.1f}{retained / 1024:>14.2f}{us:>10.0f}")
+    li.set_fast_path_enabled(True)
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
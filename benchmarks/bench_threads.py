@@ -0,0 +1,63 @@
+"""
+Multithreaded Engine Benchmark
+==============================
+동시 요청 서버 시나리오: 스레드 N개가 청구를 나눠 검증할 때
+(a) 요청마다 엔진 생성 vs (b) 공유 엔진 1개 처리량 비교,
+그리고 검증 도중 규칙 세트를 계속 교체해도 처리량이 유지되는지 측정.
+GIL 빌드에서는 순수 Python 규칙 평가가 병렬로 실행되지 않으므로 스레드 수 증가에 따른 확장은 제한적.
+
+실행: python benchmarks/bench_threads.py [n_records]
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord
+from engine.ruleset import RuleSet
+from engine.sagemaker_replication import SyntheticClaimGenerator
+
+def run_threads(n_threads: int, claims, validate) -> float:
+    """청구를 n_threads개 조각으로 나눠 동시에 검증. 초당 처리 건수 반환"""
+    chunks = [claims[i::n_threads] for i in range(n_threads)]
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_threads) as pool:
+        list(pool.map(lambda chunk: [validate(c) for c in chunk], chunks))
+    return len(claims) / (time.perf_counter() - t0)
+
+def main(n_records: int = 50_000):
+    df = SyntheticClaimGenerator(seed=42).generate(n_records, anomaly_rate=0.3)
+    claims = [ClaimRecord.from_dict(row) for row in df.to_dict("records")]
+    shared = RxHCCRuleEngine()
+    per_request_claims = claims[: max(1, n_records // 50)]
+
+    print(f"records: {n_records:,}, cpus: {os.cpu_count()}")
+    print(f"{'threads':<9}{'per-request engine':>20}{'shared engine':>15}{'shared + swaps':>16}")
+    for n_threads in (1, 2, 4, 8):
+        per_request = run_threads(n_threads, per_request_claims, lambda c: RxHCCRuleEngine().validate(c))
+        shared_tput = run_threads(n_threads, claims, shared.validate)
+
+        # 검증 도중 규칙 세트를 계속 교체 (규칙 배포 중 트래픽)
+        rulesets = [RuleSet.default(), RuleSet.from_tables(conflict_rules=[])]
+        stop = threading.Event()
+        swaps = [0]
+        def swapper():
+            while not stop.is_set():
+                shared.swap_ruleset(rulesets[swaps[0] % 2])
+                swaps[0] += 1
+                time.sleep(0.001)
+        writer = threading.Thread(target=swapper)
+        writer.start()
+        swapped_tput = run_threads(n_threads, claims, shared.validate)
+        stop.set()
+        writer.join()
+        shared.swap_ruleset(rulesets[0])
+
+        print(f"{n_threads:<9}{per_request:>16,.0f}/s{shared_tput:>11,.0f}/s{swapped_tput:>12,.0f}/s"
+              f"  ({swaps[0]} swaps)")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,50 @@
+"""
+Triage Mode Latency Benchmark
+=============================
+청구 단위 validate() 지연 시간 분포(p50/p99)를 full 모드와 triage 모드로 비교.
+실시간 경로처럼 비용이 큰 커스텀 규칙(외부 조회 시뮬레이션)을 하나 등록한 상태에서 측정.
+
+실행: python benchmarks/bench_triage.py [n_claims]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord
+from engine.sagemaker_replication import SyntheticClaimGenerator
+
+def provider_history_rule(claim: ClaimRecord):
+    """비용이 큰 커스텀 규칙 (≈200µs 외부 조회 시뮬레이션, 위반 없음)"""
+    deadline = time.perf_counter() + 0.0002
+    while time.perf_counter() < deadline:
+        pass
+    return None
+
+def latencies(engine, claims, mode) -> np.ndarray:
+    out = np.empty(len(claims))
+    for i, claim in enumerate(claims):
+        start = time.perf_counter()
+        engine.validate(claim, mode=mode)
+        out[i] = time.perf_counter() - start
+    return out * 1e6
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    df = SyntheticClaimGenerator(seed=42).generate(n, anomaly_rate=0.5)
+    claims = [ClaimRecord.from_dict(r) for r in df.to_dict("records")]
+    engine = RxHCCRuleEngine()
+    engine.add_custom_rule(provider_history_rule)
+
+    latencies(engine, claims[:500], "triage") # 카운터 warm-up
+    for mode in ("full", "triage"):
+        lat = latencies(engine, claims, mode)
+        print(f"{mode:6s}: mean {lat.mean():7.1f} µs  p50 {np.percentile(lat, 50):7.1f} µs  "
+              f"p99 {np.percentile(lat, 99):7.1f} µs")
+    print("triage order:", list(engine.triage_stats()))
+
+if __name__ == "__main__":
+    main()
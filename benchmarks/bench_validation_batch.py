@@ -0,0 +1,45 @@
+"""
+Validation Batch API Benchmark
+==============================
+run_validation() 단건 루프 vs run_validation_batch() (그래프 batch / executor) vs arun_validation_batch().
+노드가 순수 Python이라 GIL 빌드에서는 동시 실행 이득이 제한적이며, 주 효과는 I/O 대기가 있는 배포 환경의 처리량.
+
+실행: python benchmarks/bench_validation_batch.py [n_claims] [max_concurrency]
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine import langgraph_integrity as li
+from engine.sagemaker_replication import SyntheticClaimGenerator
+
+def main(n_claims: int = 1000, max_concurrency: int = 8):
+    claims = SyntheticClaimGenerator(seed=42).generate(n_claims, anomaly_rate=0.3).to_dict("records")
+    li.run_validation(claims[0]) # 그래프/엔진 캐시 준비
+
+    timings = {}
+    t0 = time.perf_counter()
+    serial = [li.run_validation(c) for c in claims]
+    timings["run_validation loop"] = time.perf_counter() - t0
+    for sequential in (False, True):
+        path = "executor" if sequential or not li.LANGGRAPH_AVAILABLE else "graph"
+        t0 = time.perf_counter()
+        batch = li.run_validation_batch(claims, max_concurrency=max_concurrency, sequential=sequential)
+        timings[f"run_validation_batch ({path})"] = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        abatch = asyncio.run(li.arun_validation_batch(claims, max_concurrency=max_concurrency, sequential=sequential))
+        timings[f"arun_validation_batch ({path})"] = time.perf_counter() - t0
+        assert [s["stage"] for s in batch] == [s["stage"] for s in abatch] == [s["stage"] for s in serial]
+
+    print(f"claims: {n_claims:,}, max_concurrency: {max_concurrency}, cpus: {os.cpu_count()}")
+    for name, seconds in timings.items():
+        print(f"{name:<38}{seconds:>8.3f}s{n_claims / seconds:>10,.0f} claims/s")
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 8,
+    )
@@ -0,0 +1,58 @@
+"""
+Batch Planner
+=============
+배치를 코드 시그니처 단위로 factorize하여 고유 조합당 한 번만 검증하고
+결과를 같은 시그니처의 모든 청구로 broadcast하기 위한 실행 계획.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+from engine.rules import ClaimRecord, claim_signature
+
+Signature = Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]
+
+@dataclass
+class BatchPlan:
+    """
+    signatures: 고유 시그니처 (첫 등장 순서)
+    representatives: 시그니처별 대표 청구의 입력 위치
+    inverse: 청구 위치 → 시그니처 번호
+    """
+    signatures: List[Signature] = field(default_factory=list)
+    representatives: List[int] = field(default_factory=list)
+    inverse: List[int] = field(default_factory=list)
+
+    @property
+    def n_claims(self) -> int:
+        return len(self.inverse)
+
+    @property
+    def n_unique(self) -> int:
+        return len(self.signatures)
+
+    @property
+    def dedup_ratio(self) -> float:
+        """청구 수 / 고유 시그니처 수. 1.0이면 dedup 이득 없음"""
+        return self.n_claims / self.n_unique if self.n_unique else 1.0
+
+    def summary(self) -> Dict:
+        return {
+            "n_claims": self.n_claims,
+            "n_unique_signatures": self.n_unique,
+            "dedup_ratio": round(self.dedup_ratio, 2),
+        }
+
+def plan_batch(claims: Sequence[ClaimRecord]) -> BatchPlan:
+    """청구 목록을 코드 시그니처로 factorize"""
+    plan = BatchPlan()
+    positions: Dict[Signature, int] = {}
+    for i, claim in enumerate(claims):
+        sig = claim_signature(claim)
+        idx = positions.get(sig)
+        if idx is None:
+            idx = len(plan.signatures)
+            positions[sig] = idx
+            plan.signatures.append(sig)
+            plan.representatives.append(i)
+        plan.inverse.append(idx)
+    return plan
@@ -0,0 +1,339 @@
+"""
+Rule Code Generation
+====================
+RuleSet 하나에 특화된 내장 규칙 검증 함수를 Python 소스로 생성.
+매핑/충돌/GLP-1/HCC/선언형 규칙 상수를 literal로 인라인하고, prefix 매칭은 prefix 길이별 slice + 집합 조회,
+충돌 규칙은 비트마스크로 펼쳐서 RxHCCRuleEngine._evaluate_builtin()과 같은 결과를 같은 순서로 생성.
+생성 소스는 규칙 세트 버전(내용 해시)별 파일로 사용자 전용 디렉토리(0o700)에 저장하고,
+다음 로드에서는 소스 생성 없이 파일을 읽어 compile (pyc 캐시 미사용).
+파일은 본인 소유 일반 파일이고 group/other 쓰기 권한이 없으며 헤더의 버전/sha256이 본문과 맞을 때만 사용.
+RxHCCRuleEngine.enable_codegen()으로 켤 때만 사용 (opt-in).
+"""
+from types import ModuleType
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, TYPE_CHECKING
+import hashlib
+import logging
+import os
+import stat
+import threading
+
+from engine.rules import ClaimRecord, ValidationResult, Severity
+
+if TYPE_CHECKING:
+    from engine.ruleset import RuleSet
+
+logger = logging.getLogger(__name__)
+
+# 생성기 로직이 바뀌면 올려서 이전 캐시 파일을 무효화
+CODEGEN_VERSION = 1
+# 캐시 디렉토리 (환경 변수로 변경 가능)
+CODEGEN_DIR_ENV = "RXHCC_CODEGEN_DIR"
+
+# ============================================================
+# 소스 생성
+# ============================================================
+class _Source:
+    """들여쓰기와 상수 literal을 관리하는 소스 버퍼"""
+    def __init__(self):
+        self.constants: List[str] = []
+        self.lines: List[str] = []
+        self._n = 0
+
+    def const(self, value_src: str, hint: str = "K") -> str:
+        """build() 스코프 상수 정의 후 이름 반환"""
+        name = f"_{hint}{self._n}"
+        self._n += 1
+        self.constants.append(f"    {name} = {value_src}")
+        return name
+
+    def emit(self, indent: int, line: str):
+        self.lines.append("    " * indent + line)
+
+def _by_length(prefixes: Iterable[str]) -> Dict[int, List[str]]:
+    groups: Dict[int, List[str]] = {}
+    for p in prefixes:
+        groups.setdefault(len(p), []).append(p)
+    return {n: sorted(set(ps)) for n, ps in sorted(groups.items())}
+
+def _prefix_test(src: _Source, var: str, prefixes: Iterable[str], hint: str) -> str:
+    """var.startswith(p)를 prefix 길이별 `var[:n] in frozenset` 식으로 펼침"""
+    tests = []
+    for n, group in _by_length(prefixes).items():
+        name = src.const(f"frozenset({group!r})", hint)
+        tests.append(f"{var}[:{n}] in {name}")
+    return " or ".join(tests) if tests else "False"
+
+def _prefix_lookup(src: _Source, var: str, table: Dict[str, object], hint: str, union: bool) -> Tuple[str, Optional[str]]:
+    """
+    prefix → 값 사전 조회식. prefix 길이가 하나면 단일 dict.get 식,
+    여러 개면 길이별 조회를 합치는 헬퍼 함수를 생성 (union=True면 frozenset 합집합, 아니면 비트 OR).
+    """
+    by_len: Dict[int, Dict[str, object]] = {}
+    for prefix, value in table.items():
+        by_len.setdefault(len(prefix), {})[prefix] = value
+    empty = "_EMPTY" if union else "0"
+    if not by_len:
+        return empty, None
+    names = [(n, src.const(repr(by_len[n]), hint)) for n in sorted(by_len)]
+    if len(names) == 1:
+        n, name = names[0]
+        return f"{name}.get({var}[:{n}], {empty})", None
+
+    helper = f"_{hint}_lookup"
+    body = [f"    def {helper}(code):", f"        found = {empty}"]
+    for n, name in names:
+        body.append(f"        found = found | {name}.get(code[:{n}], {empty})")
+    body.append("        return found")
+    src.constants.extend(body)
+    return f"{helper}({var})", helper
+
+def generate_source(rs: 'RuleSet') -> str:
+    """규칙 세트 특화 모듈 소스. 모듈의 build(rs)가 validate_builtin(claim) 함수를 반환"""
+    src = _Source()
+
+    # --- 1) ICD-NDC 매핑: NDC prefix → 허용 ICD 카테고리 집합 ---
+    ndc_categories: Dict[str, set] = {}
+    for category, mapping in rs.mappings.items():
+        for prefix in mapping.valid_ndc_prefixes:
+            ndc_categories.setdefault(prefix, set()).add(category)
+    ndc_cats_expr, _ = _prefix_lookup(
+        src, "ndc.strip()", {p: frozenset(c) for p, c in ndc_categories.items()}, "NDCCAT", union=True
+    )
+    mappings = src.const(repr({c: m.description for c, m in rs.mappings.items()}), "MAP")
+    mapping_meta = src.const("{c: m.meta for c, m in _rs.mappings.items()}", "MAPMETA")
+
+    # --- 2) 충돌 규칙: ICD prefix → 규칙 비트마스크 (A측/B측) ---
+    side_a: Dict[str, int] = {}
+    side_b: Dict[str, int] = {}
+    for k, rule in enumerate(rs.conflicts):
+        for prefix in rule.codes_a:
+            side_a[prefix] = side_a.get(prefix, 0) | (1 << k)
+        for prefix in rule.codes_b:
+            side_b[prefix] = side_b.get(prefix, 0) | (1 << k)
+    side_a_expr, _ = _prefix_lookup(src, "icd", side_a, "CA", union=False)
+    side_b_expr, _ = _prefix_lookup(src, "icd", side_b, "CB", union=False)
+
+    # --- 3) GLP-1 ---
+    glp1_ndc_test = _prefix_test(src, "ndc", rs.glp1_ndc_prefixes, "GNDC")
+    glp1_icd_test = _prefix_test(src, "icd", rs.glp1_valid_icd_prefixes, "GICD")
+    type1_test = _prefix_test(src, "icd", ("E10",), "T1")
+
+    # --- 4) HCC ---
+    hcc = src.const(repr({
+        code: (frozenset(m.expected_icd_set), m.description, m.risk_score_impact) for code, m in rs.hcc.items()
+    }), "HCC")
+    hcc_meta = src.const("{c: m.meta for c, m in _rs.hcc.items()}", "HCCMETA")
+
+    # ---------------- 함수 본문 ----------------
+    e = src.emit
+    e(1, "def validate_builtin(claim):")
+    e(2, "icd_codes = claim.icd_codes")
+    e(2, "ndc_codes = claim.ndc_codes")
+    e(2, "results = []")
+    e(2, "append = results.append")
+
+    e(2, "# 1) ICD-NDC 매핑 검증")
+    if rs.mappings:
+        e(2, "ndc_cats = None")
+        e(2, "for icd in icd_codes:")
+        e(3, "code = icd.strip().upper()")
+        e(3, "category = code.split('.')[0] if '.' in code else code[:3]")
+        e(3, f"description = {mappings}.get(category)")
+        e(3, "if description is None:")
+        e(4, "continue")
+        e(3, "if ndc_cats is None:")
+        e(4, f"ndc_cats = [{ndc_cats_expr} for ndc in ndc_codes]")
+        e(3, "for ndc, cats in zip(ndc_codes, ndc_cats):")
+        e(4, "if category not in cats:")
+        e(5, "append(ValidationResult('NDC-MISMATCH-001', 'ICD-NDC Mapping Mismatch', _WARNING, None, "
+             f"{{'icd_code': icd, 'ndc_code': ndc}}, {mapping_meta}[category], 'NDC-MISMATCH-001', "
+             "(icd, description, ndc)))")
+
+    e(2, "# 2) ICD 충돌 검증")
+    if rs.conflicts:
+        e(2, "side_a = side_b = 0")
+        e(2, "for icd in icd_codes:")
+        e(3, f"side_a |= {side_a_expr}")
+        e(3, f"side_b |= {side_b_expr}")
+        e(2, "fired = side_a & side_b")
+        e(2, "if fired:")
+        for k, rule in enumerate(rs.conflicts):
+            severity = src.const(f"Severity.{rule.severity.name}", "SEV")
+            meta = src.const(f"_rs.conflicts[{k}].meta", "CMETA")
+            message = "None" if rule.template_id else repr(rule.message)
+            e(3, f"if fired & {1 << k}:  # {rule.rule_id!r}")
+            e(4, f"append(ValidationResult({rule.rule_id!r}, {rule.name!r}, {severity}, {message}, "
+                 f"{{'icd_codes': icd_codes}}, {meta}, {rule.template_id!r}))")
+
+    e(2, "# 3) GLP-1 특별 검증")
+    e(2, "for ndc in ndc_codes:")
+    e(3, f"if {glp1_ndc_test}:")
+    e(4, "indication = type1 = False")
+    e(4, "for icd in icd_codes:")
+    e(5, f"if {glp1_icd_test}:")
+    e(6, "indication = True")
+    e(5, f"if {type1_test}:")
+    e(6, "type1 = True")
+    e(4, "if not indication:")
+    e(5, "append(ValidationResult('GLP1-001', 'GLP-1 Off-Label Use Detection', _CRITICAL, None, "
+         "{'ndc_codes': ndc_codes, 'icd_codes': icd_codes}, _rs.glp1_meta, 'GLP1-001'))")
+    e(4, "if type1:")
+    e(5, "append(ValidationResult('GLP1-002', 'GLP-1 for Type 1 Diabetes', _CRITICAL, None, "
+         "{'ndc_codes': ndc_codes, 'icd_codes': icd_codes}, None, 'GLP1-002'))")
+    e(4, "break")
+
+    e(2, "# 4) HCC Upcoding 검증")
+    if rs.hcc:
+        e(2, "for hcc in claim.hcc_codes:")
+        e(3, "hcc_upper = hcc.upper()")
+        e(3, f"entry = {hcc}.get(hcc_upper)")
+        e(3, "if entry is not None:")
+        e(4, "expected, description, impact = entry")
+        e(4, "for icd in icd_codes:")
+        e(5, "if icd in expected:")
+        e(6, "break")
+        e(4, "else:")
+        e(5, "append(ValidationResult('HCC-UPCODE-001', 'Potential HCC Upcoding', _CRITICAL, None, "
+             f"{{'actual_icds': icd_codes}}, {hcc_meta}[hcc_upper], 'HCC-UPCODE-001', "
+             "(hcc_upper, description, impact)))")
+
+    e(2, "# 5) 선언형 커스텀 규칙")
+    if rs.declarative:
+        e(2, "icd_up = [c.strip().upper() for c in icd_codes]")
+        e(2, "ndc_up = [c.strip().upper() for c in ndc_codes]")
+        e(2, "hcc_up = [c.strip().upper() for c in claim.hcc_codes]")
+        for k, rule in enumerate(rs.declarative):
+            conditions = []
+            for field_name in rule.any_fields:
+                prefixes = src.const(repr(getattr(rule, f"{field_name}_any")), "DA")
+                conditions.append(f"any(c.startswith({prefixes}) for c in {field_name}_up)")
+            for field_name in rule.none_fields:
+                prefixes = src.const(repr(getattr(rule, f"{field_name}_none")), "DN")
+                conditions.append(f"not any(c.startswith({prefixes}) for c in {field_name}_up)")
+            severity = src.const(f"Severity.{rule.severity.name}", "SEV")
+            meta = src.const(f"_rs.declarative[{k}].meta", "DMETA")
+            e(2, f"if {' and '.join(conditions)}:  # {rule.rule_id!r}")
+            e(3, f"append(ValidationResult({rule.rule_id!r}, {rule.name!r}, {severity}, {rule.message!r}, "
+                 f"{{'icd_codes': icd_codes, 'ndc_codes': ndc_codes}}, {meta}))")
+    e(2, "return results")
+
+    header = [
+        f'"""Generated by engine.codegen (v{CODEGEN_VERSION}) for RuleSet {rs.version}. Do not edit."""',
+        "",
+        "def build(_rs, ValidationResult, Severity):",
+        "    _EMPTY = frozenset()",
+        "    _WARNING = Severity.WARNING",
+        "    _CRITICAL = Severity.CRITICAL",
+    ]
+    return "\n".join(header + src.constants + src.lines + ["    return validate_builtin", ""])
+
+# ============================================================
+# 디스크 캐시 + 로드
+# ============================================================
+def user_cache_dir(name: str) -> str:
+    """사용자 전용 캐시 디렉토리 ($XDG_CACHE_HOME, 기본 ~/.cache 아래 rxhcc/<name>)"""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "rxhcc", name)
+
+def default_cache_dir() -> str:
+    """RXHCC_CODEGEN_DIR 또는 user_cache_dir("codegen")"""
+    return os.environ.get(CODEGEN_DIR_ENV) or user_cache_dir("codegen")
+
+def ensure_private_dir(path: str):
+    """캐시 디렉토리를 0o700으로 생성. 다른 사용자 소유이거나 group/other 쓰기 권한이 있으면 거부"""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if os.name != "posix":
+        return
+    st = os.stat(path)
+    if st.st_uid != os.getuid():
+        raise PermissionError(f"Cache dir {path} is owned by another user")
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        raise PermissionError(f"Cache dir {path} is writable by other users")
+
+class RuleCompiler:
+    """
+    규칙 세트 버전별 특화 함수 제공.
+    소스 파일은 cache_dir/ruleset_<version>_v<CODEGEN_VERSION>.py.
+    첫 줄 헤더(규칙 세트 버전, CODEGEN_VERSION, 본문 sha256)와 파일 소유자/권한 검증에 실패하면 재생성.
+    """
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self._modules: Dict[str, object] = {}
+        self._current: Tuple[Optional[str], Optional[Callable]] = (None, None)
+        self._lock = threading.Lock()
+        self.generated = 0
+        self.loaded = 0
+
+    def path_for(self, rs: 'RuleSet') -> str:
+        return os.path.join(self.cache_dir, f"ruleset_{rs.version}_v{CODEGEN_VERSION}.py")
+
+    def function(self, rs: 'RuleSet') -> Callable[[ClaimRecord], List[ValidationResult]]:
+        """rs에 특화된 validate_builtin(claim). 직전 규칙 세트와 같으면 바로 반환"""
+        version, fn = self._current
+        if version == rs.version and fn is not None:
+            return fn
+        with self._lock:
+            module = self._modules.get(rs.version)
+            if module is None:
+                module = self._modules[rs.version] = self._load(rs)
+            fn = module.build(rs, ValidationResult, Severity)
+            self._current = (rs.version, fn)
+        return fn
+
+    def _header(self, rs: 'RuleSet', body: str) -> str:
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        return f"# rxhcc-codegen ruleset={rs.version} v{CODEGEN_VERSION} sha256={digest}\n"
+
+    def _read_verified(self, rs: 'RuleSet', path: str) -> Optional[str]:
+        """검증된 캐시 파일 본문. 없으면 None, 검증 실패면 경고 후 None"""
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+        except OSError:
+            return None
+        with os.fdopen(fd, "rb") as f:
+            st = os.fstat(f.fileno())
+            data = f.read()
+        if not stat.S_ISREG(st.st_mode):
+            problem = "not a regular file"
+        elif os.name == "posix" and st.st_uid != os.getuid():
+            problem = "owned by another user"
+        elif st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            problem = "writable by other users"
+        else:
+            try:
+                text = data.decode("utf-8")
+            except UnicodeDecodeError:
+                text = ""
+            header, _, body = text.partition("\n")
+            if header + "\n" == self._header(rs, body):
+                return body
+            problem = "header/sha256 mismatch"
+        logger.warning("Codegen cache file %s rejected (%s); regenerating", path, problem)
+        return None
+
+    def _load(self, rs: 'RuleSet'):
+        """검증된 디스크 파일이 있으면 소스 생성 없이 로드, 없거나 검증 실패면 생성 후 기록"""
+        path = self.path_for(rs)
+        ensure_private_dir(self.cache_dir)
+        source = self._read_verified(rs, path)
+        if source is not None:
+            self.loaded += 1
+        else:
+            source = generate_source(rs)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self._header(rs, source) + source)
+            os.replace(tmp, path)
+            self.generated += 1
+            logger.info("Generated specialized rule module for RuleSet %s: %s", rs.version, path)
+
+        module = ModuleType(f"rxhcc_codegen_{rs.version}")
+        module.__file__ = path
+        # 본문은 헤더 한 줄 뒤에 있으므로 traceback 줄 번호가 파일과 맞도록 한 줄 띄워서 compile
+        exec(compile("\n" + source, path, "exec"), module.__dict__)
+        return module
+
+    def stats(self) -> Dict:
+        return {"cache_dir": self.cache_dir, "generated": self.generated, "loaded_from_disk": self.loaded,
+                "modules": len(self._modules)}
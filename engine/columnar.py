@@ -0,0 +1,404 @@
+"""
+Columnar Validation Path
+========================
+RxHCCRuleEngine의 내장 규칙(ICD-NDC 매핑, ICD 충돌, GLP-1, HCC Upcoding, 선언형 커스텀 규칙)을
+청구 단위 루프 대신 NumPy/pandas 컬럼 연산으로 실행.
+코드는 engine.vocab으로 데이터셋당 한 번 int32 ID로 인코딩하고,
+prefix/카테고리 소속은 고유 코드당 한 번만 계산한 뒤 정수 배열에 대해 규칙을 평가.
+스칼라 엔진(validate)과 동일한 findings를 동일한 순서로 생성.
+"""
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, TYPE_CHECKING
+import logging
+
+import numpy as np
+import pandas as pd
+
+from engine.rules import (
+    RxHCCRuleEngine,
+    ClaimRecord,
+    Severity,
+    RuleFlag,
+    SEVERITY_RANK,
+    GLP1_DRUG_GROUP,
+    GLP1_INDICATION_GROUP,
+    TYPE1_DIABETES_GROUP,
+    CONFLICT_SIDE_A,
+)
+from engine.messages import render_message
+from engine.vocab import (
+    CodeVocabulary,
+    EncodedClaims,
+    EncodedCodeColumn,
+)
+
+if TYPE_CHECKING:
+    from engine.ruleset import RuleSet
+
+logger = logging.getLogger(__name__)
+
+FINDING_COLUMNS = [
+    "row", "claim_id", "rule_id", "rule_name", "severity", "message",
+    "icd_code", "ndc_code", "hcc_code",
+]
+
+# 스칼라 엔진의 규칙 실행 순서 (findings 정렬 키)
+(_FAMILY_MAPPING, _FAMILY_CONFLICT, _FAMILY_GLP1, _FAMILY_HCC, _FAMILY_DECLARATIVE, _FAMILY_CUSTOM,
+ _FAMILY_PASS) = range(7)
+
+@dataclass
+class ColumnarResult:
+    """
+    validate_columnar 결과.
+    findings: 청구당 finding 1행의 long-format 테이블 (row = 입력 DataFrame의 위치 인덱스)
+    max_severity: 청구별 최고 심각도 (입력 index 정렬)
+    flags: 청구별 RuleFlag 비트 OR 값
+    """
+    findings: pd.DataFrame
+    max_severity: pd.Series
+    flags: pd.Series
+
+    @property
+    def is_flagged(self) -> pd.Series:
+        return self.max_severity.isin([Severity.CRITICAL.value, Severity.WARNING.value])
+
+# ============================================================
+# 고유 코드 단위 규칙 소속 (문자열 연산은 vocab 크기만큼만)
+# ============================================================
+def _csr(pairs: List[Tuple[int, int]], n_codes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(code_id, value) 쌍 → code_id별 CSR (offsets, values)"""
+    pairs.sort()
+    code_ids = np.fromiter((p[0] for p in pairs), dtype=np.int64, count=len(pairs))
+    offsets = np.zeros(n_codes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(code_ids, minlength=n_codes), out=offsets[1:])
+    values = np.fromiter((p[1] for p in pairs), dtype=np.int64, count=len(pairs))
+    return offsets, values
+
+def _expand(entry_ids: np.ndarray, offsets: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """코드 항목별 CSR 소속을 펼침 → (항목 위치, 값)"""
+    counts = offsets[entry_ids + 1] - offsets[entry_ids]
+    positions = np.repeat(np.arange(len(entry_ids), dtype=np.int64), counts)
+    within = np.arange(len(positions), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return positions, values[np.repeat(offsets[entry_ids], counts) + within]
+
+class _IcdAttributes:
+    """ICD vocab 코드별: 매핑 카테고리, GLP-1 적응증/제1형 여부, 충돌 규칙 측, HCC 뒷받침"""
+    def __init__(self, vocab: CodeVocabulary, rs: 'RuleSet', categories: List[str], hcc_keys: List[str]):
+        n = len(vocab)
+        category_pos = {c: i for i, c in enumerate(categories)}
+        self.category = np.full(n, -1, dtype=np.int32)
+        self.glp1_indication = np.zeros(n, dtype=bool)
+        self.type1 = np.zeros(n, dtype=bool)
+        conflict_pairs = []
+        for i, code in enumerate(vocab.codes):
+            self.category[i] = category_pos.get(RxHCCRuleEngine._get_icd_prefix(code), -1)
+            groups = rs.icd_index.match(code)
+            self.glp1_indication[i] = GLP1_INDICATION_GROUP in groups
+            self.type1[i] = TYPE1_DIABETES_GROUP in groups
+            for side, k in rs.conflict_index.match(code):
+                # 규칙 k의 A측 → 2k, B측 → 2k+1
+                conflict_pairs.append((i, 2 * k + (0 if side == CONFLICT_SIDE_A else 1)))
+        support_pairs = []
+        for r, hcc_key in enumerate(hcc_keys):
+            for icd in rs.hcc[hcc_key].expected_icd_set:
+                code_id = vocab.id_of(icd)
+                if code_id is not None:
+                    support_pairs.append((code_id, r))
+        self.conflicts = _csr(conflict_pairs, n)
+        self.hcc_support = _csr(support_pairs, n)
+
+class _NdcAttributes:
+    """NDC vocab 코드별: GLP-1 여부, 허용되는 ICD 카테고리 (ndc_id * n_categories + category 정렬 키)"""
+    def __init__(self, vocab: CodeVocabulary, rs: 'RuleSet', categories: List[str]):
+        category_pos = {c: i for i, c in enumerate(categories)}
+        self.n_categories = max(len(categories), 1)
+        self.glp1 = np.zeros(len(vocab), dtype=bool)
+        valid_keys = []
+        for i, code in enumerate(vocab.codes):
+            self.glp1[i] = rs.ndc_index.matches(code, GLP1_DRUG_GROUP)
+            for group in rs.ndc_index.match(code.strip()):
+                pos = category_pos.get(group)
+                if pos is not None:
+                    valid_keys.append(i * self.n_categories + pos)
+        self.valid_keys = np.unique(np.asarray(valid_keys, dtype=np.int64))
+
+def _rows_with(col: EncodedCodeColumn, code_mask: np.ndarray) -> np.ndarray:
+    """vocab 코드 마스크에 해당하는 코드를 가진 청구 위치"""
+    return np.unique(col.rows[code_mask[col.ids]]).astype(np.int64)
+
+def _frame(rows: np.ndarray, family: int, k1, k2, rule_id, rule_name, severity, message,
+           icd_code=None, ndc_code=None, hcc_code=None) -> pd.DataFrame:
+    return pd.DataFrame({
+        "row": np.asarray(rows, dtype=np.int64),
+        "_family": family,
+        "_k1": k1,
+        "_k2": k2,
+        "rule_id": rule_id,
+        "rule_name": rule_name,
+        "severity": severity,
+        "message": message,
+        "icd_code": icd_code,
+        "ndc_code": ndc_code,
+        "hcc_code": hcc_code,
+    })
+
+# ============================================================
+# 규칙군별 정수 배열 연산
+# ============================================================
+def _icd_ndc_mapping(enc: EncodedClaims, icd_attr: _IcdAttributes, ndc_attr: _NdcAttributes,
+                     rs: 'RuleSet', categories: List[str]) -> pd.DataFrame:
+    icd_category = icd_attr.category[enc.icd.ids]
+    mapped = np.flatnonzero(icd_category >= 0)
+    if len(mapped) == 0 or enc.ndc.n_entries == 0:
+        return None
+
+    # 매핑 대상 ICD 항목 × 같은 청구의 NDC 항목
+    rows = enc.icd.rows[mapped].astype(np.int64)
+    counts = enc.ndc.offsets[rows + 1] - enc.ndc.offsets[rows]
+    icd_entry = np.repeat(mapped, counts)
+    if len(icd_entry) == 0:
+        return None
+    within = np.arange(len(icd_entry), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    ndc_entry = np.repeat(enc.ndc.offsets[rows], counts) + within
+
+    keys = enc.ndc.ids[ndc_entry].astype(np.int64) * ndc_attr.n_categories + icd_category[icd_entry]
+    bad = ~np.isin(keys, ndc_attr.valid_keys)
+    if not bad.any():
+        return None
+    icd_entry, ndc_entry = icd_entry[bad], ndc_entry[bad]
+
+    # 메시지는 finding이 난 항목만 문자열로 디코드
+    icd_codes = enc.icd.vocab.decode(enc.icd.ids[icd_entry])
+    ndc_codes = enc.ndc.vocab.decode(enc.ndc.ids[ndc_entry])
+    descriptions = [rs.mappings[categories[c]].description for c in icd_category[icd_entry]]
+    messages = [
+        render_message("NDC-MISMATCH-001", params)
+        for params in zip(icd_codes, descriptions, ndc_codes)
+    ]
+    return _frame(
+        enc.icd.rows[icd_entry], _FAMILY_MAPPING, icd_entry, ndc_entry,
+        "NDC-MISMATCH-001", "ICD-NDC Mapping Mismatch", Severity.WARNING.value, messages,
+        icd_code=icd_codes, ndc_code=ndc_codes,
+    )
+
+def _icd_conflicts(enc: EncodedClaims, icd_attr: _IcdAttributes, rs: 'RuleSet') -> pd.DataFrame:
+    positions, side_keys = _expand(enc.icd.ids, *icd_attr.conflicts)
+    if len(positions) == 0:
+        return None
+
+    # (청구, 규칙 k) 키가 A측과 B측 양쪽에 모두 있으면 충돌
+    n_rules = len(rs.conflicts)
+    keys = enc.icd.rows[positions].astype(np.int64) * n_rules + side_keys // 2
+    side_a = side_keys % 2 == 0
+    fired = np.intersect1d(keys[side_a], keys[~side_a])
+    if len(fired) == 0:
+        return None
+
+    fired_k = fired % n_rules
+    rules = [rs.conflicts[k] for k in fired_k]
+    return _frame(
+        fired // n_rules, _FAMILY_CONFLICT, fired_k, 0,
+        [r.rule_id for r in rules], [r.name for r in rules],
+        [r.severity.value for r in rules], [r.message for r in rules],
+    )
+
+def _glp1(enc: EncodedClaims, icd_attr: _IcdAttributes, ndc_attr: _NdcAttributes) -> List[pd.DataFrame]:
+    glp1_rows = _rows_with(enc.ndc, ndc_attr.glp1)
+    if len(glp1_rows) == 0:
+        return []
+
+    frames = []
+    off_label = np.setdiff1d(glp1_rows, _rows_with(enc.icd, icd_attr.glp1_indication))
+    if len(off_label):
+        frames.append(_frame(
+            off_label, _FAMILY_GLP1, 0, 0, "GLP1-001", "GLP-1 Off-Label Use Detection",
+            Severity.CRITICAL.value, render_message("GLP1-001")
+        ))
+
+    type1 = np.intersect1d(glp1_rows, _rows_with(enc.icd, icd_attr.type1))
+    if len(type1):
+        frames.append(_frame(
+            type1, _FAMILY_GLP1, 1, 0, "GLP1-002", "GLP-1 for Type 1 Diabetes",
+            Severity.CRITICAL.value, render_message("GLP1-002")
+        ))
+    return frames
+
+def _hcc_upcoding(enc: EncodedClaims, icd_attr: _IcdAttributes, rs: 'RuleSet', hcc_keys: List[str]) -> pd.DataFrame:
+    if enc.hcc.n_entries == 0 or not hcc_keys:
+        return None
+    key_pos = {k: r for r, k in enumerate(hcc_keys)}
+    hcc_rule = np.array([key_pos.get(c.upper(), -1) for c in enc.hcc.vocab.codes], dtype=np.int64)[enc.hcc.ids]
+    entries = np.flatnonzero(hcc_rule >= 0)
+    if len(entries) == 0:
+        return None
+
+    # (청구, HCC 규칙) 키 중 뒷받침 ICD가 없는 항목
+    n_rules = len(hcc_keys)
+    keys = enc.hcc.rows[entries].astype(np.int64) * n_rules + hcc_rule[entries]
+    positions, support_rule = _expand(enc.icd.ids, *icd_attr.hcc_support)
+    supported = enc.icd.rows[positions].astype(np.int64) * n_rules + support_rule
+    fire = ~np.isin(keys, supported)
+    if not fire.any():
+        return None
+
+    entries = entries[fire]
+    rules = [rs.hcc[hcc_keys[r]] for r in hcc_rule[entries]]
+    messages = [
+        render_message("HCC-UPCODE-001", (m.hcc_code, m.description, m.risk_score_impact))
+        for m in rules
+    ]
+    return _frame(
+        enc.hcc.rows[entries], _FAMILY_HCC, entries, 0, "HCC-UPCODE-001", "Potential HCC Upcoding",
+        Severity.CRITICAL.value, messages, hcc_code=[m.hcc_code for m in rules],
+    )
+
+def _declarative(enc: EncodedClaims, rs: 'RuleSet') -> pd.DataFrame:
+    """선언형 규칙: (청구, 규칙) 키별로 _any 조건 필드가 모두 매칭되고 _none 조건은 하나도 매칭되지 않으면 발동"""
+    n_rules = len(rs.declarative)
+    if n_rules == 0:
+        return None
+    any_keys, none_keys = [], []
+    for field_name, col in (("icd", enc.icd), ("ndc", enc.ndc), ("hcc", enc.hcc)):
+        index = rs.declarative_index[field_name]
+        # 규칙 k의 _any 조건 → 2k, _none 조건 → 2k+1
+        pairs = [
+            (i, 2 * k + (0 if is_any else 1))
+            for i, code in enumerate(col.vocab.codes)
+            for k, is_any in index.match(code.strip().upper())
+        ]
+        if not pairs:
+            continue
+        positions, values = _expand(col.ids, *_csr(pairs, len(col.vocab)))
+        keys = col.rows[positions].astype(np.int64) * n_rules + values // 2
+        any_keys.append(np.unique(keys[values % 2 == 0]))
+        none_keys.append(keys[values % 2 == 1])
+    if not any_keys:
+        return None
+
+    # 필드별 고유 키를 합쳐 센 횟수 = 매칭된 _any 필드 수
+    candidates, counts = np.unique(np.concatenate(any_keys), return_counts=True)
+    required = np.array([len(r.any_fields) for r in rs.declarative], dtype=np.int64)
+    fired = candidates[counts == required[candidates % n_rules]]
+    if len(fired) and none_keys:
+        fired = fired[~np.isin(fired, np.concatenate(none_keys))]
+    if len(fired) == 0:
+        return None
+
+    fired_k = fired % n_rules
+    rules = [rs.declarative[k] for k in fired_k]
+    return _frame(
+        fired // n_rules, _FAMILY_DECLARATIVE, fired_k, 0,
+        [r.rule_id for r in rules], [r.name for r in rules],
+        [r.severity.value for r in rules], [r.message for r in rules],
+    )
+
+def _custom_rules(engine: RxHCCRuleEngine, df: pd.DataFrame) -> pd.DataFrame:
+    """커스텀 규칙은 임의 callable이므로 청구 단위로 실행 (slow path)"""
+    rows, orders, findings = [], [], []
+    for pos, data in enumerate(df.to_dict("records")):
+        claim = ClaimRecord.from_dict(data)
+        for k, rule_fn in enumerate(engine.custom_rules):
+            try:
+                result = rule_fn(claim)
+                if result:
+                    rows.append(pos)
+                    orders.append(k)
+                    findings.append(result)
+            except Exception as e:
+                logger.error("Custom rule error: %s", e)
+    if not findings:
+        return None
+    return pd.DataFrame({
+        "row": np.asarray(rows, dtype=np.int64),
+        "_family": _FAMILY_CUSTOM,
+        "_k1": np.asarray(orders, dtype=np.int64),
+        "_k2": 0,
+        "rule_id": [r.rule_id for r in findings],
+        "rule_name": [r.rule_name for r in findings],
+        "severity": [r.severity.value for r in findings],
+        "message": [r.message for r in findings],
+        "icd_code": None,
+        "ndc_code": None,
+        "hcc_code": None,
+    })
+
+_FAMILY_FLAGS = {
+    _FAMILY_MAPPING: RuleFlag.NDC_MISMATCH,
+    _FAMILY_CONFLICT: RuleFlag.ICD_CONFLICT,
+    _FAMILY_GLP1: RuleFlag.GLP1,
+    _FAMILY_HCC: RuleFlag.HCC_UPCODING,
+    _FAMILY_DECLARATIVE: RuleFlag.CUSTOM,
+    _FAMILY_CUSTOM: RuleFlag.CUSTOM,
+    _FAMILY_PASS: RuleFlag.NONE,
+}
+
+# ============================================================
+# 메인 진입점
+# ============================================================
+def validate_columnar(engine: RxHCCRuleEngine, df: pd.DataFrame,
+                      encoded: Optional[EncodedClaims] = None) -> ColumnarResult:
+    """
+    DataFrame의 모든 청구를 컬럼 단위로 검증.
+    findings 순서는 청구별로 validate()의 결과 순서와 동일.
+    encoded: 같은 df를 미리 인코딩한 EncodedClaims (여러 규칙 세트로 재검증 시 재사용)
+    """
+    n = len(df)
+    enc = encoded if encoded is not None else EncodedClaims.from_dataframe(df)
+
+    rs = engine.ruleset
+    categories = list(rs.mappings.keys())
+    hcc_keys = list(rs.hcc.keys())
+    icd_attr = _IcdAttributes(enc.icd.vocab, rs, categories, hcc_keys)
+    ndc_attr = _NdcAttributes(enc.ndc.vocab, rs, categories)
+
+    frames = [
+        _icd_ndc_mapping(enc, icd_attr, ndc_attr, rs, categories),
+        _icd_conflicts(enc, icd_attr, rs),
+    ]
+    frames.extend(_glp1(enc, icd_attr, ndc_attr))
+    frames.append(_hcc_upcoding(enc, icd_attr, rs, hcc_keys))
+    frames.append(_declarative(enc, rs))
+    if engine.has_custom_rules:
+        frames.append(_custom_rules(engine, df))
+    frames = [f for f in frames if f is not None and not f.empty]
+
+    if "claim_id" in df.columns:
+        claim_ids = df["claim_id"].astype(str).to_numpy(dtype=object)
+    else:
+        claim_ids = np.full(n, "UNKNOWN", dtype=object)
+
+    # 결과 없는 청구는 PASS
+    hit_rows = np.unique(np.concatenate([f["row"].to_numpy() for f in frames])) if frames else np.array([], dtype=np.int64)
+    pass_rows = np.setdiff1d(np.arange(n, dtype=np.int64), hit_rows)
+    if len(pass_rows):
+        frames.append(_frame(
+            pass_rows, _FAMILY_PASS, 0, 0, "PASS-000", "All Checks Passed", Severity.PASS.value,
+            [render_message("PASS-000", (cid,)) for cid in claim_ids[pass_rows]]
+        ))
+
+    if frames:
+        findings = pd.concat(frames, ignore_index=True)
+        findings = findings.sort_values(["row", "_family", "_k1", "_k2"], kind="stable")
+        findings = findings.reset_index(drop=True)
+    else:
+        findings = pd.DataFrame(columns=["row", "_family", "_k1", "_k2"] + FINDING_COLUMNS[2:])
+    findings["claim_id"] = claim_ids[findings["row"].to_numpy(dtype=np.int64)]
+
+    rows = findings["row"].to_numpy(dtype=np.int64)
+    ranks = findings["severity"].map(SEVERITY_RANK).to_numpy(dtype=np.int64)
+    max_rank = np.zeros(n, dtype=np.int64)
+    np.maximum.at(max_rank, rows, ranks)
+    rank_labels = np.full(max(SEVERITY_RANK.values()) + 1, Severity.PASS.value, dtype=object)
+    for sev, rank in SEVERITY_RANK.items():
+        rank_labels[rank] = sev
+    max_severity = pd.Series(rank_labels[max_rank], index=df.index, name="max_severity", dtype=object)
+
+    family_bits = np.array([int(_FAMILY_FLAGS[f]) for f in range(len(_FAMILY_FLAGS))], dtype=np.int64)
+    flags = np.zeros(n, dtype=np.int64)
+    np.bitwise_or.at(flags, rows, family_bits[findings["_family"].to_numpy(dtype=np.int64)])
+
+    return ColumnarResult(
+        findings=findings[FINDING_COLUMNS],
+        max_severity=max_severity,
+        flags=pd.Series(flags, index=df.index, name="rule_flags"),
+    )
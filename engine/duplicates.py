@@ -0,0 +1,216 @@
+"""
+Streaming Duplicate Claim Detection
+===================================
+청구 간(cross-claim) 중복 탐지. (환자, 제공자, 일자, 코드, 금액)의 64-bit 해시 fingerprint를
+시간 창(window) 동안만 보관하여 끝없는 청구 스트림에서도 메모리를 제한.
+정확 모드(fingerprint → 원 청구 ID, 창 밖 eviction)와 옵션 Bloom filter 모드(회전하는 두 세대 필터) 지원.
+RxHCCRuleEngine.add_custom_rule(detector)로 등록하면 DUPLICATE-001 finding을 일반 결과 형식으로 반환.
+"""
+from hashlib import blake2b
+from math import ceil, log
+from typing import Dict, List, Optional, Tuple
+import heapq
+import threading
+
+from engine.rules import ClaimRecord, ValidationResult, Severity, claim_day
+
+# ============================================================
+# Fingerprint
+# ============================================================
+def claim_fingerprint(claim: ClaimRecord) -> int:
+    """(patient, provider, date, 정렬된 ICD/NDC/HCC, 금액) 64-bit 해시. 코드 순서/공백/대소문자 무관"""
+    codes = tuple(
+        ",".join(sorted(c.strip().upper() for c in group))
+        for group in (claim.icd_codes, claim.ndc_codes, claim.hcc_codes)
+    )
+    key = "\x1f".join((
+        claim.patient_id, claim.provider_id, claim.claim_date[:10], *codes, f"{claim.claim_amount:.2f}"
+    ))
+    return int.from_bytes(blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+def _claim_key(fingerprint: int, claim_id: str) -> int:
+    """(fingerprint, claim_id) 64-bit 해시. Bloom 모드에서 같은 청구의 재검증을 구분하는 키"""
+    key = f"{fingerprint:016x}\x1f{claim_id}"
+    return int.from_bytes(blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+# ============================================================
+# Bloom filter
+# ============================================================
+class BloomFilter:
+    """64-bit fingerprint용 Bloom filter (double hashing)"""
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and 0 < error_rate < 1")
+        self.capacity = capacity
+        self.n_bits = max(int(ceil(-capacity * log(error_rate) / (log(2) ** 2))), 8)
+        self.n_hashes = max(int(round(self.n_bits / capacity * log(2))), 1)
+        self.bits = bytearray((self.n_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, fingerprint: int):
+        h1 = fingerprint & 0xFFFFFFFF
+        h2 = (fingerprint >> 32) | 1
+        for i in range(self.n_hashes):
+            yield (h1 + i * h2) % self.n_bits
+
+    def add(self, fingerprint: int):
+        for pos in self._positions(fingerprint):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, fingerprint: int) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(fingerprint))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+# ============================================================
+# Detector
+# ============================================================
+class DuplicateDetector:
+    """
+    스트리밍 중복 청구 탐지기 (custom rule 호환: detector(claim) -> Optional[ValidationResult]).
+    window_days: 관측된 최신 청구 일자 기준으로 fingerprint를 보관하는 기간
+    max_entries: 정확 모드 보관 상한 (초과 시 가장 오래된 일자부터 eviction)
+    use_bloom: True면 두 세대 Bloom filter 사용 (원 청구 ID 없음, 오탐률 error_rate).
+               세대당 bloom_capacity개 또는 window_days 경과 시 회전.
+               같은 청구의 재검증 구분용으로 (fingerprint, claim_id) 필터를 세대마다 하나 더 둠
+    같은 claim_id의 재검증(증분 재검증, fallback 재실행)은 자기 자신의 중복으로 보지 않음.
+    청구는 입력 순서대로 관측해야 하므로 프로세스 병렬 배치(engine.parallel)에서는 워커별로만 탐지됨.
+    stateful: triage 모드에서 CRITICAL 중단 후에도 실행되어 full 모드와 같은 청구를 관측
+    """
+    stateful = True
+
+    def __init__(self, window_days: int = 30, max_entries: int = 1_000_000, use_bloom: bool = False,
+                 bloom_capacity: int = 1_000_000, error_rate: float = 0.001,
+                 severity: Severity = Severity.WARNING):
+        self.window_days = window_days
+        self.max_entries = max_entries
+        self.use_bloom = use_bloom
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self.severity = severity
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._seen: Dict[int, Tuple[str, int]] = {} # fingerprint → (claim_id, day)
+            self._expiry: List[Tuple[int, int]] = [] # (day, fingerprint) min-heap
+            self._watermark: Optional[int] = None # 관측된 최신 일자
+            self._current = BloomFilter(self.bloom_capacity, self.error_rate) if self.use_bloom else None
+            self._previous: Optional[BloomFilter] = None
+            self._current_ids = BloomFilter(self.bloom_capacity, self.error_rate) if self.use_bloom else None
+            self._previous_ids: Optional[BloomFilter] = None
+            self._generation_start: Optional[int] = None
+            self.checked = 0
+            self.duplicates = 0
+            self.evictions = 0
+
+    def __call__(self, claim: ClaimRecord) -> Optional[ValidationResult]:
+        return self.check(claim)
+
+    def check(self, claim: ClaimRecord) -> Optional[ValidationResult]:
+        """청구를 관측하고, 창 안에 같은 fingerprint가 있으면 DUPLICATE-001 반환"""
+        fingerprint = claim_fingerprint(claim)
+        day = claim_day(claim)
+        with self._lock:
+            self.checked += 1
+            if day is not None and (self._watermark is None or day > self._watermark):
+                self._watermark = day
+            day = day if day is not None else (self._watermark or 0)
+
+            if self.use_bloom:
+                original = self._check_bloom(fingerprint, day, claim.claim_id)
+            else:
+                original = self._check_exact(fingerprint, day, claim.claim_id)
+            if original is None:
+                return None
+            self.duplicates += 1
+
+        if original:
+            return ValidationResult(
+                rule_id="DUPLICATE-001",
+                rule_name="Duplicate Claim",
+                severity=self.severity,
+                details={"claim_id": claim.claim_id, "original_claim_id": original,
+                         "fingerprint": f"{fingerprint:016x}"},
+                template_id="DUPLICATE-001",
+                params=(original,)
+            )
+        return ValidationResult(
+            rule_id="DUPLICATE-001",
+            rule_name="Duplicate Claim",
+            severity=self.severity,
+            details={"claim_id": claim.claim_id, "fingerprint": f"{fingerprint:016x}",
+                     "false_positive_rate": self.error_rate},
+            template_id="DUPLICATE-001-PROBABLE"
+        )
+
+    def _check_exact(self, fingerprint: int, day: int, claim_id: str) -> Optional[str]:
+        self._evict()
+        seen = self._seen.get(fingerprint)
+        if seen is not None:
+            # 같은 청구의 재검증은 중복 아님 (TimelineStore와 같은 기준)
+            return seen[0] if seen[0] != claim_id else None
+        self._seen[fingerprint] = (claim_id, day)
+        heapq.heappush(self._expiry, (day, fingerprint))
+        if len(self._seen) > self.max_entries:
+            self._pop_oldest()
+        return None
+
+    def _evict(self):
+        """watermark - window_days 이전 일자의 fingerprint 제거"""
+        if self._watermark is None:
+            return
+        cutoff = self._watermark - self.window_days
+        while self._expiry and self._expiry[0][0] < cutoff:
+            self._pop_oldest()
+
+    def _pop_oldest(self):
+        day, fingerprint = heapq.heappop(self._expiry)
+        seen = self._seen.get(fingerprint)
+        if seen is not None and seen[1] == day:
+            del self._seen[fingerprint]
+            self.evictions += 1
+
+    def _check_bloom(self, fingerprint: int, day: int, claim_id: str) -> Optional[str]:
+        """
+        중복이면 "" (원 청구 ID 미보관), 신규 또는 같은 청구의 재검증이면 None.
+        (fingerprint, claim_id) 키는 처음 관측한 청구만 기록하므로 중복 청구를 재검증하면 계속 중복.
+        claim 키 필터의 오탐은 중복 미탐(확률 error_rate)으로만 나타남.
+        """
+        if self._generation_start is None:
+            self._generation_start = day
+        if self._current.count >= self.bloom_capacity or day - self._generation_start > self.window_days:
+            # 세대 회전: 직전 세대까지만 기억 → 메모리는 필터 두 개로 고정
+            self._previous, self._previous_ids = self._current, self._current_ids
+            self._current = BloomFilter(self.bloom_capacity, self.error_rate)
+            self._current_ids = BloomFilter(self.bloom_capacity, self.error_rate)
+            self._generation_start = day
+            self.evictions += self._previous.count
+
+        key = _claim_key(fingerprint, claim_id)
+        if key in self._current_ids or (self._previous_ids is not None and key in self._previous_ids):
+            return None
+        if fingerprint in self._current or (self._previous is not None and fingerprint in self._previous):
+            return ""
+        self._current.add(fingerprint)
+        self._current_ids.add(key)
+        return None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                "mode": "bloom" if self.use_bloom else "exact",
+                "checked": self.checked,
+                "duplicates": self.duplicates,
+                "evictions": self.evictions,
+                "window_days": self.window_days,
+            }
+            if self.use_bloom:
+                stats["bloom_bytes"] = 2 * self._current.nbytes * (2 if self._previous is not None else 1)
+            else:
+                stats["entries"] = len(self._seen)
+            return stats
@@ -0,0 +1,358 @@
+"""
+Incremental Re-validation
+=========================
+규칙 테이블 일부(예: ICD_NDC_VALID_MAPPINGS 항목 하나)가 바뀌었을 때 이력 데이터 전체를 다시 돌리지 않고,
+바뀐 규칙이 건드릴 수 있는 청구만 재검증하여 저장된 결과를 patch.
+
+- DependencyIndex: 청구가 가진 ICD/NDC/HCC 코드와 결과 rule_id → 청구 위치 역인덱스 (prefix 질의는 정렬된 코드 + bisect)
+- diff_rulesets(): 두 RuleSet 스냅샷을 비교해 바뀐 ICD 카테고리, 충돌 규칙 prefix, GLP-1 prefix, HCC 코드, 선언형 규칙 prefix 추출
+- IncrementalValidator: 결과 + 인덱스를 보관하고 apply_ruleset()으로 delta만 재검증
+"""
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Set, TYPE_CHECKING
+import logging
+import time
+
+from engine.rules import ClaimRecord, ValidationResult, RxHCCRuleEngine
+from engine.ruleset import RuleSet
+
+if TYPE_CHECKING:
+    from engine.vocab import EncodedClaims, EncodedCodeColumn
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# 의존성 인덱스
+# ============================================================
+class _Postings:
+    """
+    코드 문자열 → 청구 위치 집합 (추가/삭제 O(1), 재검증 순서와 무관).
+    prefix 질의용 정렬 키는 추가 후 첫 질의 시 다시 만듦
+    """
+    __slots__ = ("postings", "_keys")
+
+    def __init__(self):
+        self.postings: Dict[str, Set[int]] = {}
+        self._keys: Optional[List[str]] = None
+
+    @classmethod
+    def from_encoded(cls, col: 'EncodedCodeColumn') -> '_Postings':
+        """vocab 인코딩된 CSR 컬럼에서 코드별 청구 위치 목록을 한 번에 구성"""
+        import numpy as np
+        postings = cls()
+        order = np.lexsort((col.rows, col.ids))
+        ids, rows = col.ids[order], col.rows[order]
+        bounds = np.flatnonzero(np.diff(ids)) + 1
+        for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(ids)]))):
+            if end > start:
+                postings.postings[col.vocab.codes[ids[start]]] = set(rows[start:end].tolist())
+        return postings
+
+    def add(self, code: str, pos: int):
+        positions = self.postings.get(code)
+        if positions is None:
+            self.postings[code] = {pos}
+            self._keys = None
+        else:
+            positions.add(pos)
+
+    def discard(self, code: str, pos: int):
+        positions = self.postings.get(code)
+        if positions is not None:
+            positions.discard(pos)
+
+    def keys(self) -> List[str]:
+        if self._keys is None:
+            self._keys = sorted(self.postings)
+        return self._keys
+
+    def with_prefixes(self, prefixes: Iterable[str]) -> Set[int]:
+        """code.startswith(prefix)인 코드를 가진 청구 위치"""
+        keys = self.keys()
+        found: Set[int] = set()
+        for prefix in prefixes:
+            i = bisect_left(keys, prefix)
+            while i < len(keys) and keys[i].startswith(prefix):
+                found.update(self.postings[keys[i]])
+                i += 1
+        return found
+
+    def matching(self, predicate) -> Set[int]:
+        """predicate(code)가 참인 코드를 가진 청구 위치 (고유 코드 수만큼만 평가)"""
+        found: Set[int] = set()
+        for code, positions in self.postings.items():
+            if predicate(code):
+                found.update(positions)
+        return found
+
+class DependencyIndex:
+    """
+    청구 위치 → 규칙 의존성 역인덱스.
+    코드는 청구에 적힌 원문 그대로 보관하고, 질의 시 엔진과 같은 방식(카테고리 추출, prefix, 대문자 HCC)으로 매칭.
+    rule_id 인덱스는 결과를 함께 넘긴 경우에만 채워지며(tracks_rules), 없으면 코드 기반 질의로 대체.
+    """
+    def __init__(self):
+        self.icd = _Postings()
+        self.ndc = _Postings()
+        self.hcc = _Postings()
+        self.rules = _Postings()
+        self.n_claims = 0
+        self.tracks_rules = True
+
+    @classmethod
+    def from_claims(cls, claims: Sequence[ClaimRecord],
+                    results: Optional[Sequence[List[ValidationResult]]] = None) -> 'DependencyIndex':
+        index = cls()
+        index.tracks_rules = results is not None
+        for pos, claim in enumerate(claims):
+            index.add(pos, claim, results[pos] if results is not None else None)
+        return index
+
+    @classmethod
+    def from_dataframe(cls, df, encoded: 'EncodedClaims' = None) -> 'DependencyIndex':
+        """
+        검증 대상 DataFrame 행 순서(위치) 기준 인덱스 (rule_id 인덱스 없음).
+        encoded: engine.vocab.EncodedClaims.from_dataframe(df) 결과 (columnar 검증과 공유 시)
+        """
+        from engine.vocab import EncodedClaims
+        if encoded is None:
+            encoded = EncodedClaims.from_dataframe(df)
+        index = cls()
+        index.tracks_rules = False
+        index.icd = _Postings.from_encoded(encoded.icd)
+        index.ndc = _Postings.from_encoded(encoded.ndc)
+        index.hcc = _Postings.from_encoded(encoded.hcc)
+        index.n_claims = encoded.n_rows
+        return index
+
+    def add(self, pos: int, claim: ClaimRecord, results: Optional[List[ValidationResult]] = None):
+        for icd in claim.icd_codes:
+            self.icd.add(icd, pos)
+        for ndc in claim.ndc_codes:
+            self.ndc.add(ndc, pos)
+        for hcc in claim.hcc_codes:
+            self.hcc.add(hcc, pos)
+        if results is not None:
+            for r in results:
+                self.rules.add(r.rule_id, pos)
+        self.n_claims = max(self.n_claims, pos + 1)
+
+    def update_rules(self, pos: int, old: List[ValidationResult], new: List[ValidationResult]):
+        """재검증 후 rule_id 인덱스 갱신"""
+        for rule_id in {r.rule_id for r in old} - {r.rule_id for r in new}:
+            self.rules.discard(rule_id, pos)
+        for r in new:
+            self.rules.add(r.rule_id, pos)
+
+    def claims_with_rules(self, rule_ids: Iterable[str]) -> Set[int]:
+        found: Set[int] = set()
+        for rule_id in rule_ids:
+            found.update(self.rules.postings.get(rule_id, ()))
+        return found
+
+    def affected_by(self, diff: 'RuleSetDiff') -> Set[int]:
+        """규칙 세트 변경으로 결과가 달라질 수 있는 청구 위치 (상위 집합)"""
+        affected: Set[int] = set()
+        if diff.mapping_categories:
+            categories = diff.mapping_categories
+            affected |= self.icd.matching(lambda icd: RxHCCRuleEngine._get_icd_prefix(icd) in categories)
+        if diff.conflict_prefixes:
+            affected |= self.icd.with_prefixes(diff.conflict_prefixes)
+        if diff.conflict_rule_ids:
+            if self.tracks_rules:
+                affected |= self.claims_with_rules(diff.conflict_rule_ids)
+            else:
+                affected |= self.icd.with_prefixes(diff.conflict_rule_prefixes)
+        if diff.glp1_ndc_prefixes:
+            # GLP-1 판정은 원문 NDC, 매핑 검증은 strip()한 NDC 기준 → 둘 다 매칭
+            prefixes = diff.glp1_ndc_prefixes
+            affected |= self.ndc.matching(lambda ndc: ndc.startswith(prefixes) or ndc.strip().startswith(prefixes))
+        if diff.glp1_icd_prefixes:
+            # 적응증 prefix 목록은 GLP1-001 finding의 rule_meta에도 실리므로 GLP-1 청구 전체가 영향권
+            affected |= self.ndc.with_prefixes(diff.glp1_drug_prefixes)
+        if diff.hcc_codes:
+            codes = diff.hcc_codes
+            affected |= self.hcc.matching(lambda hcc: hcc.upper() in codes)
+        for field_name, prefixes in diff.declarative_prefixes.items():
+            # 선언형 규칙은 _any 조건이 매칭된 청구에서만 발동
+            prefixes = tuple(prefixes)
+            postings = getattr(self, field_name)
+            affected |= postings.matching(lambda code: code.strip().upper().startswith(prefixes))
+        return affected
+
+# ============================================================
+# 규칙 세트 diff
+# ============================================================
+@dataclass
+class RuleSetDiff:
+    """
+    두 RuleSet 간 변경분 (재검증 범위 산정용).
+    mapping_categories: 추가/삭제/변경된 ICD-NDC 매핑 카테고리 (예: "E11")
+    conflict_prefixes: 코드 그룹이 바뀐 충돌 규칙의 신/구 ICD prefix
+    conflict_rule_ids: 이름/심각도/메시지만 바뀐 충돌 규칙 (conflict_rule_prefixes는 rule_id 인덱스가 없을 때 대체용)
+    glp1_ndc_prefixes: 추가/삭제된 GLP-1 NDC prefix
+    glp1_icd_prefixes: 추가/삭제된 GLP-1 적응증 ICD prefix (glp1_drug_prefixes: 신/구 GLP-1 NDC prefix 전체)
+    hcc_codes: 추가/삭제/변경된 HCC 코드
+    declarative_prefixes: 변경된 선언형 규칙(신/구)의 필드별 _any 조건 prefix
+    """
+    old_version: str
+    new_version: str
+    mapping_categories: Set[str] = field(default_factory=set)
+    conflict_prefixes: Set[str] = field(default_factory=set)
+    conflict_rule_ids: Set[str] = field(default_factory=set)
+    conflict_rule_prefixes: Set[str] = field(default_factory=set)
+    glp1_ndc_prefixes: tuple = ()
+    glp1_icd_prefixes: tuple = ()
+    glp1_drug_prefixes: tuple = ()
+    hcc_codes: Set[str] = field(default_factory=set)
+    declarative_prefixes: Dict[str, Set[str]] = field(default_factory=dict)
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.mapping_categories or self.conflict_prefixes or self.conflict_rule_ids
+                    or self.glp1_ndc_prefixes or self.glp1_icd_prefixes or self.hcc_codes
+                    or self.declarative_prefixes)
+
+    def summary(self) -> Dict:
+        return {
+            "old_version": self.old_version,
+            "new_version": self.new_version,
+            "mapping_categories": sorted(self.mapping_categories),
+            "conflict_prefixes": sorted(self.conflict_prefixes),
+            "conflict_rule_ids": sorted(self.conflict_rule_ids),
+            "glp1_ndc_prefixes": sorted(self.glp1_ndc_prefixes),
+            "glp1_icd_prefixes": sorted(self.glp1_icd_prefixes),
+            "hcc_codes": sorted(self.hcc_codes),
+            "declarative_prefixes": {f: sorted(p) for f, p in self.declarative_prefixes.items()},
+        }
+
+def diff_rulesets(old: RuleSet, new: RuleSet) -> RuleSetDiff:
+    """컴파일된 규칙 항목 단위 비교"""
+    diff = RuleSetDiff(old_version=old.version, new_version=new.version)
+    if old.version == new.version:
+        return diff
+
+    for category in set(old.mappings) | set(new.mappings):
+        if old.mappings.get(category) != new.mappings.get(category):
+            diff.mapping_categories.add(category)
+
+    # 충돌 결과는 테이블 순서대로 나오므로 위치 단위로 비교 (삽입/삭제 시 뒤쪽 규칙도 변경으로 취급)
+    for k in range(max(len(old.conflicts), len(new.conflicts))):
+        before = old.conflicts[k] if k < len(old.conflicts) else None
+        after = new.conflicts[k] if k < len(new.conflicts) else None
+        if before == after:
+            continue
+        if (before is not None and after is not None and before.rule_id == after.rule_id
+                and before.codes_a == after.codes_a and before.codes_b == after.codes_b):
+            diff.conflict_rule_ids.add(after.rule_id)
+            diff.conflict_rule_prefixes.update(after.codes_a + after.codes_b)
+            continue
+        for rule in (before, after):
+            if rule is not None:
+                diff.conflict_prefixes.update(rule.codes_a + rule.codes_b)
+
+    diff.glp1_ndc_prefixes = tuple(sorted(set(old.glp1_ndc_prefixes) ^ set(new.glp1_ndc_prefixes)))
+    diff.glp1_icd_prefixes = tuple(sorted(set(old.glp1_valid_icd_prefixes) ^ set(new.glp1_valid_icd_prefixes)))
+    if diff.glp1_icd_prefixes:
+        diff.glp1_drug_prefixes = tuple(sorted(set(old.glp1_ndc_prefixes) | set(new.glp1_ndc_prefixes)))
+
+    for hcc_code in set(old.hcc) | set(new.hcc):
+        if old.hcc.get(hcc_code) != new.hcc.get(hcc_code):
+            diff.hcc_codes.add(hcc_code)
+
+    for k in range(max(len(old.declarative), len(new.declarative))):
+        before = old.declarative[k] if k < len(old.declarative) else None
+        after = new.declarative[k] if k < len(new.declarative) else None
+        if before == after:
+            continue
+        for rule in (before, after):
+            if rule is None:
+                continue
+            for field_name in rule.any_fields:
+                diff.declarative_prefixes.setdefault(field_name, set()).update(getattr(rule, f"{field_name}_any"))
+    return diff
+
+# ============================================================
+# 증분 재검증
+# ============================================================
+@dataclass
+class RevalidationReport:
+    """apply_ruleset() 실행 결과"""
+    diff: RuleSetDiff
+    n_claims: int
+    n_affected: int
+    n_changed: int
+    elapsed_s: float
+
+    def summary(self) -> Dict:
+        return {
+            **self.diff.summary(),
+            "n_claims": self.n_claims,
+            "n_affected": self.n_affected,
+            "n_changed": self.n_changed,
+            "affected_ratio": round(self.n_affected / self.n_claims, 4) if self.n_claims else 0.0,
+            "elapsed_s": round(self.elapsed_s, 3),
+        }
+
+class IncrementalValidator:
+    """
+    이력 청구의 검증 결과와 의존성 인덱스를 보관하고, 규칙 세트 변경 시 영향받는 청구만 재검증.
+    커스텀 규칙은 재검증 대상 청구에 대해서만 다시 실행되므로, 청구 순서에 의존하는 상태형 규칙
+    (DuplicateDetector, TimelineStore 기반 규칙)은 이 경로와 함께 쓰지 않는 것을 권장.
+    """
+    def __init__(self, engine: RxHCCRuleEngine = None):
+        self.engine = engine or RxHCCRuleEngine()
+        self.claims: List[ClaimRecord] = []
+        self.results: List[List[ValidationResult]] = []
+        self.index = DependencyIndex()
+        self._ruleset: RuleSet = self.engine.ruleset
+        self.last_report: Optional[RevalidationReport] = None
+
+    @property
+    def rules_version(self) -> str:
+        """보관 중인 결과가 기준으로 하는 규칙 세트 버전"""
+        return self._ruleset.version
+
+    def validate_all(self, claims: Sequence[ClaimRecord]) -> List[List[ValidationResult]]:
+        """전체 검증 후 결과와 인덱스 재구성"""
+        self._ruleset = self.engine.ruleset
+        self.claims = list(claims)
+        self.results = self.engine.validate_many(self.claims)
+        self.index = DependencyIndex.from_claims(self.claims, self.results)
+        return self.results
+
+    def extend(self, claims: Sequence[ClaimRecord]) -> List[List[ValidationResult]]:
+        """신규 청구를 현재 규칙 세트로 검증하여 추가"""
+        if self.engine.ruleset.version != self._ruleset.version:
+            raise ValueError("Engine ruleset changed outside apply_ruleset(); call apply_ruleset() first")
+        start = len(self.claims)
+        new_results = self.engine.validate_many(list(claims))
+        for offset, (claim, results) in enumerate(zip(claims, new_results)):
+            self.index.add(start + offset, claim, results)
+        self.claims.extend(claims)
+        self.results.extend(new_results)
+        return new_results
+
+    def apply_ruleset(self, ruleset: RuleSet) -> RevalidationReport:
+        """엔진에 새 규칙 세트를 swap하고 영향받는 청구만 재검증하여 결과 patch"""
+        t0 = time.perf_counter()
+        diff = diff_rulesets(self._ruleset, ruleset)
+        self.engine.swap_ruleset(ruleset)
+        self._ruleset = ruleset
+
+        affected = sorted(self.index.affected_by(diff))
+        n_changed = 0
+        if affected:
+            revalidated = self.engine.validate_many([self.claims[i] for i in affected])
+            for pos, results in zip(affected, revalidated):
+                if results != self.results[pos]:
+                    n_changed += 1
+                    self.index.update_rules(pos, self.results[pos], results)
+                    self.results[pos] = results
+
+        report = RevalidationReport(diff, len(self.claims), len(affected), n_changed, time.perf_counter() - t0)
+        self.last_report = report
+        logger.info("Incremental revalidation %s -> %s: %d/%d claims re-validated, %d changed (%.3fs)",
+                    diff.old_version, diff.new_version, len(affected), len(self.claims), n_changed, report.elapsed_s)
+        return report
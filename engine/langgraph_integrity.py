@@ -2,18 +2,34 @@
 LangGraph-based Integrity Validation Workflow
 ==============================================
 StateGraph를 사용하여 다단계 검증 파이프라인 구현.
+full 모드에서는 parse 후 청구에 해당하는 규칙 단위(ICD-NDC 매핑, 충돌, GLP-1, HCC, 커스텀 규칙 등)를
+Send로 병렬 branch에 fan-out하고, rule_findings reducer로 모은 뒤 merge_rules에서 규칙 순서대로 합침.
+노드는 상태 전체가 아닌 변경분만 반환 (findings는 operator.add로 누적되므로 중복 방지).
+상태는 파싱된 ClaimRecord와 ValidationResult 객체를 그대로 들고 다니고, severity별 개수를 증분 누적하여
+스코어링이 결과 목록을 다시 훑지 않음. merge_rules 이후 rule_findings는 비우고, 반환 직전에
+findings를 dict 형태의 results로 한 번만 직렬화. 반환 상태는 JSON 직렬화 가능한 값만 보관
+(record → claim_record dict, 객체 채널 findings/rule_findings/record/engine_state 제거).
+컴파일된 그래프와 규칙 엔진은 프로세스 단위로 한 번만 만들어 재사용하고, 규칙 세트가 바뀔 때만 다시 컴파일.
+규칙 어휘(RuleSet.vocabulary)에 걸리는 코드가 없는 청구는 그래프를 거치지 않고 자동 승인 (fast path).
 """
-from typing import TypedDict, List, Dict, Annotated
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, List, Dict, Annotated, Optional, Sequence, Tuple
 from enum import Enum
+import asyncio
 import json
 import logging
 import operator
+import threading
 
 logger = logging.getLogger(__name__)
 
 # LangGraph 임포트 (설치 안 됐을 경우 fallback)
 try:
     from langgraph.graph import StateGraph, END
+    try:
+        from langgraph.types import Send
+    except ImportError: # langgraph < 0.2
+        from langgraph.constants import Send
     LANGGRAPH_AVAILABLE = True
 except ImportError:
     LANGGRAPH_AVAILABLE = False
@@ -22,6 +38,7 @@ except ImportError:
 from engine.rules import (
     RxHCCRuleEngine,
     ClaimRecord,
+    EngineState,
     ValidationResult,
     Severity
 )
@@ -29,107 +46,224 @@ from engine.rules import (
 # ============================================================
 # State 정의
 # ============================================================
+def _add_counts(a: Dict[str, int], b: Dict[str, int]) -> Dict[str, int]:
+    """severity별 결과 수 reducer (노드가 반환한 증분을 누적)"""
+    if not b:
+        return a
+    merged = dict(a)
+    for severity, n in b.items():
+        merged[severity] = merged.get(severity, 0) + n
+    return merged
+
+def _add_or_clear(a: List, b: Optional[List]) -> List:
+    """누적 reducer. None 변경분은 채널을 비움 (merge_rules가 branch 결과를 합친 뒤 사용)"""
+    return [] if b is None else a + b
+
 class ValidationState(TypedDict):
-    """LangGraph 상태 스키마"""
+    """
+    LangGraph 상태 스키마.
+    노드 사이에서는 파싱된 ClaimRecord와 ValidationResult 객체를 그대로 전달하고,
+    results(dict 목록)는 반환 직전 _finalize()에서 findings를 대체하여 한 번만 직렬화.
+    """
     claim: Dict # 원본 청구 데이터
-    claim_record: Dict # 파싱된 ClaimRecord (dict로 직렬화)
-    results: Annotated[List[Dict], operator.add] # 누적되는 검증 결과
+    record: Optional[ClaimRecord] # 파싱된 청구 (parse 실패 시 None)
+    findings: Annotated[List[ValidationResult], operator.add] # 누적되는 검증 결과 (typed, 반환 시 results로 대체)
+    severity_counts: Annotated[Dict[str, int], _add_counts] # severity 값별 findings 수 (증분 누적)
+    rule_findings: Annotated[List[Tuple], _add_or_clear] # 규칙 branch별 (순번, 규칙 단위, ValidationResult 목록). merge_rules 후 비움
+    engine_state: Optional[EngineState] # parse 시점의 규칙 스냅샷 (모든 branch가 같은 규칙 세트 사용)
+    results: List[Dict] # 최종 결과 (반환 상태 전용: findings 직렬화)
+    claim_record: Dict # 파싱된 청구 dict (반환 상태 전용: record 직렬화, parse 실패 시 {})
     stage: str # 현재 단계
     should_escalate: bool # 에스컬레이션 필요 여부
     escalation_reason: str # 에스컬레이션 사유
     metadata: Dict # 추가 메타데이터
 
+# 누적 채널 (그래프 reducer와 순차 실행 _apply_update가 공유)
+_REDUCERS = {"findings": operator.add, "rule_findings": _add_or_clear, "severity_counts": _add_counts}
+
+# ============================================================
+# 프로세스 공유 엔진 + 컴파일된 그래프 캐시
+# ============================================================
+# 엔진은 규칙 상태를 불변 스냅샷으로 교체하므로 여러 스레드가 그대로 공유 (triage 카운터도 호출 간 누적).
+# 그래프는 (규칙 버전, 컴파일 결과) 튜플 하나로 보관하여 읽기는 잠금 없이 참조 1회.
+_ENGINE: Optional[RxHCCRuleEngine] = None
+_GRAPH: Tuple[Optional[str], object] = (None, None)
+_CACHE_LOCK = threading.Lock()
+
+def get_validation_engine() -> RxHCCRuleEngine:
+    """노드가 사용하는 프로세스 공유 규칙 엔진 (최초 호출 시 생성)"""
+    engine = _ENGINE
+    if engine is None:
+        engine = _build_engine()
+    return engine
+
+def _build_engine() -> RxHCCRuleEngine:
+    global _ENGINE
+    with _CACHE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = RxHCCRuleEngine()
+        return _ENGINE
+
+def set_validation_ruleset(ruleset):
+    """공유 엔진의 규칙 세트 교체. 캐시된 그래프는 다음 호출에서 새 버전으로 다시 컴파일됨"""
+    get_validation_engine().swap_ruleset(ruleset)
+
+def get_validation_graph():
+    """
+    컴파일된 검증 그래프 (프로세스 공유). 공유 엔진의 규칙 버전이 바뀐 경우에만 재컴파일.
+    LangGraph 미설치 시 None.
+    """
+    global _GRAPH
+    if not LANGGRAPH_AVAILABLE:
+        return None
+    version = get_validation_engine().rules_version
+    cached_version, graph = _GRAPH
+    if cached_version == version:
+        return graph
+    with _CACHE_LOCK:
+        cached_version, graph = _GRAPH
+        if cached_version != version:
+            graph = build_validation_graph()
+            _GRAPH = (version, graph)
+            logger.info("Compiled validation graph for rules %s", version)
+        return graph
+
+def clear_validation_cache():
+    """공유 엔진과 컴파일된 그래프 폐기 (테스트, 규칙 모듈 재로딩 시)"""
+    global _ENGINE, _GRAPH
+    with _CACHE_LOCK:
+        _ENGINE = None
+        _GRAPH = (None, None)
+
 # ============================================================
-# 노드 함수들
+# 노드 함수들 (상태 변경분만 반환)
 # ============================================================
-def parse_claim(state: ValidationState) -> ValidationState:
-    """1단계: 청구 데이터 파싱 및 정규화"""
+def _count_severities(findings: List[ValidationResult]) -> Dict[str, int]:
+    counts = {}
+    for r in findings:
+        counts[r.severity.value] = counts.get(r.severity.value, 0) + 1
+    return counts
+
+def _with_findings(update: Dict, findings: List[ValidationResult]) -> Dict:
+    """변경분에 findings와 severity 증분 추가"""
+    update["findings"] = findings
+    update["severity_counts"] = _count_severities(findings)
+    return update
+
+def _parse_ok(record: ClaimRecord) -> ValidationResult:
+    return ValidationResult(
+        rule_id="PARSE-OK",
+        rule_name="Claim Parsing",
+        severity=Severity.INFO,
+        message=f"Claim {record.claim_id} 파싱 완료. ICD: {len(record.icd_codes)}, NDC: {len(record.ndc_codes)}"
+    )
+
+def parse_claim(state: ValidationState) -> Dict:
+    """1단계: 청구 데이터 파싱 및 정규화 (fast path 사전 필터가 파싱한 record가 있으면 재사용)"""
     logger.info("Stage 1: Parsing claim data")
     try:
-        claim_data = state["claim"]
-        record = ClaimRecord.from_dict(claim_data)
-        
-        state["claim_record"] = {
-            "claim_id": record.claim_id,
-            "patient_id": record.patient_id,
-            "icd_codes": record.icd_codes,
-            "ndc_codes": record.ndc_codes,
-            "hcc_codes": record.hcc_codes,
-            "provider_id": record.provider_id,
-            "claim_date": record.claim_date,
-            "claim_amount": record.claim_amount,
-        }
-        state["stage"] = "parsed"
-        state["results"].append({
-            "rule_id": "PARSE-OK",
-            "rule_name": "Claim Parsing",
-            "severity": "INFO",
-            "message": f"Claim {record.claim_id} 파싱 완료. ICD: {len(record.icd_codes)}, NDC: {len(record.ndc_codes)}"
-        })
+        record = state.get("record")
+        if record is None:
+            record = ClaimRecord.from_dict(state["claim"])
+        return _with_findings({
+            "record": record,
+            "engine_state": get_validation_engine().state,
+            "stage": "parsed",
+        }, [_parse_ok(record)])
     except Exception as e:
-        state["stage"] = "parse_error"
-        state["results"].append({
-            "rule_id": "PARSE-ERR",
-            "rule_name": "Claim Parsing Error",
-            "severity": "CRITICAL",
-            "message": f"파싱 실패: {str(e)}"
-        })
-        state["should_escalate"] = True
-        state["escalation_reason"] = f"Parse error: {str(e)}"
-    
-    return state
+        return _with_findings({
+            "stage": "parse_error",
+            "should_escalate": True,
+            "escalation_reason": f"Parse error: {str(e)}",
+        }, [ValidationResult(
+            rule_id="PARSE-ERR",
+            rule_name="Claim Parsing Error",
+            severity=Severity.CRITICAL,
+            message=f"파싱 실패: {str(e)}"
+        )])
+
+def _engine_error(e: Exception) -> ValidationResult:
+    return ValidationResult(
+        rule_id="ENGINE-ERR",
+        rule_name="Rule Engine Error",
+        severity=Severity.CRITICAL,
+        message=f"규칙 엔진 오류: {str(e)}"
+    )
+
+def _rules_complete(findings: List[ValidationResult]) -> Dict:
+    """규칙 결과 추가 + CRITICAL 결과가 있으면 에스컬레이션 플래그"""
+    update = _with_findings({"stage": "rules_complete"}, findings)
+    critical_count = update["severity_counts"].get("CRITICAL", 0)
+    if critical_count > 0:
+        update["should_escalate"] = True
+        update["escalation_reason"] = f"{critical_count}개의 CRITICAL 위반 발견"
+    return update
 
-def run_rule_engine(state: ValidationState) -> ValidationState:
-    """2단계: 규칙 엔진 실행"""
+def run_rule_engine(state: ValidationState) -> Dict:
+    """2단계: 규칙 엔진 실행 (단일 노드. triage 모드와 순차 실행 경로)"""
     logger.info("Stage 2: Running rule engine")
     if state["stage"] == "parse_error":
-        return state
+        return {}
 
     try:
-        record = ClaimRecord.from_dict(state["claim_record"])
-        engine = RxHCCRuleEngine()
-        results = engine.validate(record)
-        
-        for r in results:
-            state["results"].append(r.to_dict())
-            
-        # CRITICAL 결과가 있으면 에스컬레이션 플래그
-        critical_count = sum(1 for r in results if r.severity == Severity.CRITICAL)
-        if critical_count > 0:
-            state["should_escalate"] = True
-            state["escalation_reason"] = f"{critical_count}개의 CRITICAL 위반 발견"
-            
-        state["stage"] = "rules_complete"
-        
+        mode = state.get("metadata", {}).get("mode", "full")
+        # triage 모드의 적응형 규칙 순서도 공유 엔진에 누적된 카운터 사용
+        findings = get_validation_engine().validate(state["record"], mode="triage" if mode == "triage" else "full")
+        return _rules_complete(findings)
     except Exception as e:
         logger.error("Rule engine error: %s", e)
-        state["results"].append({
-            "rule_id": "ENGINE-ERR",
-            "rule_name": "Rule Engine Error",
-            "severity": "CRITICAL",
-            "message": f"규칙 엔진 오류: {str(e)}"
-        })
-        state["should_escalate"] = True
-    
-    return state
+        return _with_findings({"should_escalate": True}, [_engine_error(e)])
 
-def risk_scoring(state: ValidationState) -> ValidationState:
-    """3단계: 리스크 스코어링"""
-    logger.info("Stage 3: Risk scoring")
+def route_rule_units(state: ValidationState):
+    """
+    parse 이후 분기.
+    parse 실패 → escalation, triage 모드 → 단일 rules 노드 (첫 CRITICAL에서 중단해야 하므로),
+    full 모드 → 청구에 해당하는 규칙 단위마다 rule_unit branch (해당 단위가 없으면 바로 merge_rules)
+    """
     if state["stage"] == "parse_error":
-        return state
+        return "escalation"
+    if state.get("metadata", {}).get("mode", "full") == "triage":
+        return "rules"
+    engine = get_validation_engine()
+    snapshot = state.get("engine_state") or engine.state
+    record = state["record"]
+    order = {u: i for i, u in enumerate(engine.rule_units(snapshot))}
+    sends = [
+        Send("rule_unit", {"unit": unit, "order": order[unit], "record": record, "engine_state": snapshot})
+        for unit in engine.relevant_units(record, snapshot)
+    ]
+    return sends or "merge_rules"
 
-    severity_scores = {
-        "CRITICAL": 10,
-        "WARNING": 5,
-        "INFO": 1,
-        "PASS": 0
-    }
-    
-    total_score = sum(
-        severity_scores.get(r.get("severity", "INFO"), 0)
-        for r in state["results"]
-    )
+def run_rule_unit(task: Dict) -> Dict:
+    """규칙 branch: 규칙 단위 1개 실행. 예외는 해당 branch의 ENGINE-ERR로만 기록"""
+    try:
+        found = get_validation_engine().run_unit(task["unit"], task["record"], task["engine_state"])
+    except Exception as e:
+        logger.error("Rule unit %s error: %s", task["unit"], e)
+        found = [_engine_error(e)]
+    return {"rule_findings": [(task["order"], task["unit"], found)]}
+
+def merge_rules(state: ValidationState) -> Dict:
+    """규칙 branch 결과를 full 모드와 같은 규칙 순서로 합치고, 결과가 없으면 PASS"""
+    findings = sorted(state.get("rule_findings", []), key=lambda f: f[0])
+    results = [r for _, _, unit_results in findings for r in unit_results]
+    if not results:
+        results = [RxHCCRuleEngine._pass_result(state["record"])]
+    update = _rules_complete(results)
+    update["metadata"] = {**state.get("metadata", {}), "rule_units": [unit for _, unit, _ in findings]}
+    update["rule_findings"] = None # findings로 옮겼으므로 branch 결과는 더 들고 다니지 않음
+    return update
+
+SEVERITY_SCORES = {
+    "CRITICAL": 10,
+    "WARNING": 5,
+    "INFO": 1,
+    "PASS": 0
+}
+
+def _risk_assessment(severity_counts: Dict[str, int]) -> Tuple[int, str]:
+    """severity별 결과 수로 종합 스코어와 리스크 등급 계산 (결과 목록 재순회 없음)"""
+    total_score = sum(SEVERITY_SCORES.get(severity, 0) * n for severity, n in severity_counts.items())
     
     # 리스크 등급 계산
     if total_score >= 20:
@@ -140,60 +274,71 @@ def risk_scoring(state: ValidationState) -> ValidationState:
         risk_level = "LOW"
     else:
         risk_level = "MINIMAL"
-        
-    if "metadata" not in state:
-        state["metadata"] = {}
-        
-    state["metadata"]["risk_score"] = total_score
-    state["metadata"]["risk_level"] = risk_level
-    state["stage"] = "scoring_complete"
-    
-    state["results"].append({
-        "rule_id": "RISK-SCORE",
-        "rule_name": "Risk Assessment",
-        "severity": "INFO",
-        "message": f"종합 리스크 스코어: {total_score} ({risk_level})"
-    })
-    
-    return state
+    return total_score, risk_level
+
+def _risk_result(total_score: int, risk_level: str) -> ValidationResult:
+    return ValidationResult(
+        rule_id="RISK-SCORE",
+        rule_name="Risk Assessment",
+        severity=Severity.INFO,
+        message=f"종합 리스크 스코어: {total_score} ({risk_level})"
+    )
 
-def escalation_check(state: ValidationState) -> ValidationState:
+def risk_scoring(state: ValidationState) -> Dict:
+    """3단계: 리스크 스코어링"""
+    logger.info("Stage 3: Risk scoring")
+    if state["stage"] == "parse_error":
+        return {}
+
+    total_score, risk_level = _risk_assessment(state["severity_counts"])
+    return _with_findings({
+        "metadata": {**state.get("metadata", {}), "risk_score": total_score, "risk_level": risk_level},
+        "stage": "scoring_complete",
+    }, [_risk_result(total_score, risk_level)])
+
+def escalation_check(state: ValidationState) -> Dict:
     """4단계: 에스컬레이션 결정"""
     logger.info("Stage 4: Escalation check")
     
     if state["should_escalate"]:
-        state["results"].append({
-            "rule_id": "ESCALATE",
-            "rule_name": "Escalation Required",
-            "severity": "CRITICAL",
-            "message": f"⚠️ 수동 검토 필요: {state['escalation_reason']}"
-        })
-        state["stage"] = "escalated"
+        final, stage = ValidationResult(
+            rule_id="ESCALATE",
+            rule_name="Escalation Required",
+            severity=Severity.CRITICAL,
+            message=f"⚠️ 수동 검토 필요: {state['escalation_reason']}"
+        ), "escalated"
     else:
-        state["results"].append({
-            "rule_id": "AUTO-APPROVE",
-            "rule_name": "Auto-Approved",
-            "severity": "PASS",
-            "message": "✅ 자동 승인: 모든 검증 통과"
-        })
-        state["stage"] = "approved"
-        
-    return state
+        final, stage = _auto_approve(), "approved"
+    return _with_findings({"stage": stage}, [final])
 
-# ============================================================
-# 라우터 함수
-# ============================================================
-def should_continue(state: ValidationState) -> str:
-    """parse 후 에러면 escalation으로 바로 이동"""
-    if state["stage"] == "parse_error":
-        return "escalation"
-    return "rules"
+def _auto_approve() -> ValidationResult:
+    return ValidationResult(
+        rule_id="AUTO-APPROVE",
+        rule_name="Auto-Approved",
+        severity=Severity.PASS,
+        message="✅ 자동 승인: 모든 검증 통과"
+    )
+
+def _serialize(findings: List[ValidationResult]) -> List[Dict]:
+    return [r.to_dict() for r in findings]
+
+def _finalize(state: ValidationState) -> ValidationState:
+    """
+    반환 상태 정리: findings는 results로, record는 claim_record로 한 번 직렬화하여 대체하고
+    branch 기록과 규칙 스냅샷(engine_state) 제거 → 로그/저장용으로 그대로 JSON 직렬화 가능
+    """
+    state["results"] = _serialize(state.pop("findings", []))
+    record = state.pop("record", None)
+    state["claim_record"] = record.to_dict() if record is not None else {}
+    state.pop("rule_findings", None)
+    state.pop("engine_state", None)
+    return state
 
 # ============================================================
 # 그래프 빌더
 # ============================================================
 def build_validation_graph():
-    """LangGraph StateGraph 생성"""
+    """LangGraph StateGraph 생성 (매번 새로 컴파일. 실행 경로는 get_validation_graph() 캐시 사용)"""
     if not LANGGRAPH_AVAILABLE:
         logger.warning("LangGraph not available, returning sequential executor")
         return None
@@ -203,21 +348,23 @@ def build_validation_graph():
     # 노드 추가
     workflow.add_node("parse", parse_claim)
     workflow.add_node("rules", run_rule_engine)
+    workflow.add_node("rule_unit", run_rule_unit)
+    workflow.add_node("merge_rules", merge_rules)
     workflow.add_node("scoring", risk_scoring)
     workflow.add_node("escalation", escalation_check)
     
     # 엣지 정의
     workflow.set_entry_point("parse")
     
+    # parse → 규칙 branch fan-out (Send) / triage 단일 노드 / escalation
     workflow.add_conditional_edges(
         "parse",
-        should_continue,
-        {
-            "rules": "rules",
-            "escalation": "escalation"
-        }
+        route_rule_units,
+        ["rule_unit", "merge_rules", "rules", "escalation"]
     )
     
+    workflow.add_edge("rule_unit", "merge_rules")
+    workflow.add_edge("merge_rules", "scoring")
     workflow.add_edge("rules", "scoring")
     workflow.add_edge("scoring", "escalation")
     workflow.add_edge("escalation", END)
@@ -227,43 +374,245 @@ def build_validation_graph():
 # ============================================================
 # Fallback: LangGraph 없이도 실행 가능
 # ============================================================
-def run_validation_sequential(claim_data: Dict) -> ValidationState:
-    """LangGraph 없이 순차 실행 (fallback)"""
-    state: ValidationState = {
+def _initial_state(claim_data: Dict, mode: str, record: Optional[ClaimRecord] = None) -> ValidationState:
+    return {
         "claim": claim_data,
-        "claim_record": {},
-        "results": [],
+        "record": record,
+        "findings": [],
+        "severity_counts": {},
+        "rule_findings": [],
+        "engine_state": None,
         "stage": "init",
         "should_escalate": False,
         "escalation_reason": "",
-        "metadata": {}
+        "metadata": {"mode": mode}
     }
+
+def run_validation_sequential(claim_data: Dict, mode: str = "full",
+                              record: Optional[ClaimRecord] = None) -> ValidationState:
+    """
+    LangGraph 없이 순차 실행 (fallback). 호출 내부에서만 쓰는 상태 하나를 제자리에서 갱신.
+    record: 이미 파싱된 청구 (fast path 사전 필터 결과 재사용)
+    """
+    state = _initial_state(claim_data, mode, record)
     
-    state = parse_claim(state)
-    state = run_rule_engine(state)
-    state = risk_scoring(state)
-    state = escalation_check(state)
+    for node in (parse_claim, run_rule_engine, risk_scoring, escalation_check):
+        _apply_update(state, node(state))
     
+    return _finalize(state)
+
+def _apply_update(state: ValidationState, update: Dict) -> ValidationState:
+    """노드 변경분 반영 (그래프 reducer와 동일: 누적 채널은 reducer로 합치고 나머지는 교체)"""
+    for key, value in update.items():
+        reducer = _REDUCERS.get(key)
+        state[key] = reducer(state[key], value) if reducer else value
     return state
 
-def run_validation(claim_data: Dict) -> ValidationState:
-    """메인 실행 함수. LangGraph 사용 가능하면 그래프, 아니면 순차 실행."""
+# ============================================================
+# Fast path: 규칙 어휘에 걸리는 코드가 없는 청구
+# ============================================================
+# 대부분의 청구는 어떤 규칙도 참조하지 않는 ICD/NDC/HCC 코드만 가지므로 결과가 항상
+# PARSE-OK → PASS → RISK-SCORE(1, MINIMAL) → AUTO-APPROVE. 그래프를 거치지 않고 같은 모양의 상태를 바로 만듦.
+_FAST_PATH_ENABLED = True
+_FAST_PATH_COUNTS = {"claims": 0, "fast_path": 0}
+_STATS_LOCK = threading.Lock()
+
+def set_fast_path_enabled(enabled: bool):
+    """fast path 사용 여부 (비활성화 시 모든 청구가 전체 파이프라인 경유)"""
+    global _FAST_PATH_ENABLED
+    _FAST_PATH_ENABLED = bool(enabled)
+
+def fast_path_stats() -> Dict:
+    """run_validation / 배치 API로 들어온 청구 중 fast path로 처리된 비율"""
+    with _STATS_LOCK:
+        claims, fast = _FAST_PATH_COUNTS["claims"], _FAST_PATH_COUNTS["fast_path"]
+    return {"claims": claims, "fast_path": fast, "fast_path_share": fast / claims if claims else 0.0}
+
+def reset_fast_path_stats():
+    with _STATS_LOCK:
+        _FAST_PATH_COUNTS["claims"] = 0
+        _FAST_PATH_COUNTS["fast_path"] = 0
+
+def _prefilter(claim_data: Dict, mode: str) -> Tuple[Optional[ValidationState], Optional[ClaimRecord]]:
+    """
+    (fast path 최종 상태 또는 None, 파싱된 record 또는 None).
+    규칙 결과가 PASS뿐인 청구면 전체 파이프라인과 같은 최종 상태를 만들고, 아니면 record를
+    전체 파이프라인 초기 상태로 넘겨 parse_claim이 다시 파싱하지 않게 함.
+    파싱 실패 청구는 PARSE-ERR 처리를 위해 record 없이 전체 파이프라인으로 보냄.
+    """
+    if not _FAST_PATH_ENABLED:
+        return None, None
+    engine = get_validation_engine()
+    snapshot = engine.state
+    record = None
+    try:
+        record = ClaimRecord.from_dict(claim_data)
+        fast = engine.is_fast_path(record, snapshot)
+    except Exception:
+        fast = False
+    with _STATS_LOCK:
+        _FAST_PATH_COUNTS["claims"] += 1
+        _FAST_PATH_COUNTS["fast_path"] += fast
+    if not fast:
+        return None, record
+
+    findings = [_parse_ok(record), RxHCCRuleEngine._pass_result(record)]
+    total_score, risk_level = _risk_assessment(_count_severities(findings))
+    findings += [_risk_result(total_score, risk_level), _auto_approve()]
+    metadata = {"mode": mode}
+    if LANGGRAPH_AVAILABLE and mode != "triage":
+        metadata["rule_units"] = [] # fan-out 경로의 merge_rules와 같은 키
+    metadata.update(risk_score=total_score, risk_level=risk_level)
+    return _finalize({
+        "claim": claim_data,
+        "record": record,
+        "findings": findings,
+        "severity_counts": _count_severities(findings),
+        "stage": "approved",
+        "should_escalate": False,
+        "escalation_reason": "",
+        "metadata": metadata,
+    }), record
+
+def _split_fast_path(claims: List[Dict], mode: str) -> Tuple[List[Optional[ValidationState]], List[Tuple[int, Optional[ClaimRecord]]]]:
+    """배치 사전 필터: (fast path 상태 또는 None 목록, 전체 파이프라인이 필요한 (청구 인덱스, record) 목록)"""
+    filtered = [_prefilter(c, mode) for c in claims]
+    states = [state for state, _ in filtered]
+    return states, [(i, record) for i, (state, record) in enumerate(filtered) if state is None]
+
+def run_validation(claim_data: Dict, mode: str = "full") -> ValidationState:
+    """
+    메인 실행 함수. LangGraph 사용 가능하면 그래프, 아니면 순차 실행.
+    mode="triage": 첫 CRITICAL 발견 시 규칙 실행 중단 (실시간 사전 심사)
+    규칙 어휘에 걸리는 코드가 없는 청구는 fast path로 바로 자동 승인 상태 반환.
+    """
+    state, record = _prefilter(claim_data, mode)
+    if state is not None:
+        return state
     if LANGGRAPH_AVAILABLE:
         try:
-            graph = build_validation_graph()
-            initial_state: ValidationState = {
-                "claim": claim_data,
-                "claim_record": {},
-                "results": [],
-                "stage": "init",
-                "should_escalate": False,
-                "escalation_reason": "",
-                "metadata": {}
-            }
-            result = graph.invoke(initial_state)
-            return result
+            graph = get_validation_graph()
+            return _finalize(graph.invoke(_initial_state(claim_data, mode, record)))
         except Exception as e:
             logger.error("LangGraph execution failed, falling back: %s", e)
-            return run_validation_sequential(claim_data)
+            return run_validation_sequential(claim_data, mode, record)
     else:
-        return run_validation_sequential(claim_data)
+        return run_validation_sequential(claim_data, mode, record)
+
+# ============================================================
+# 배치 / 비동기 실행
+# ============================================================
+DEFAULT_MAX_CONCURRENCY = 8
+
+def _error_state(claim_data: Dict, mode: str, error: Exception) -> ValidationState:
+    """청구 1건 실행 실패 결과 (배치의 다른 청구에는 영향 없음)"""
+    state = _initial_state(claim_data, mode)
+    findings = [ValidationResult(
+        rule_id="PIPELINE-ERR",
+        rule_name="Validation Pipeline Error",
+        severity=Severity.CRITICAL,
+        message=f"검증 파이프라인 오류: {str(error)}"
+    )]
+    _apply_update(state, _with_findings({
+        "stage": "error",
+        "should_escalate": True,
+        "escalation_reason": f"Pipeline error: {str(error)}",
+    }, findings))
+    return _finalize(state)
+
+def _run_isolated(claim_data: Dict, mode: str, record: Optional[ClaimRecord] = None) -> ValidationState:
+    """순차 실행 + 예외를 청구 단위 오류 상태로 변환"""
+    try:
+        return run_validation_sequential(claim_data, mode, record)
+    except Exception as e:
+        logger.error("Validation failed for claim %s: %s", _claim_id(claim_data), e)
+        return _error_state(claim_data, mode, e)
+
+def _claim_id(claim_data) -> str:
+    return claim_data.get("claim_id", "") if isinstance(claim_data, dict) else ""
+
+def _batch_graph():
+    """배치에 사용할 컴파일된 그래프 (없거나 컴파일 실패 시 None → executor 경로)"""
+    if not LANGGRAPH_AVAILABLE:
+        return None
+    try:
+        return get_validation_graph()
+    except Exception as e:
+        logger.error("LangGraph compile failed, using executor path: %s", e)
+        return None
+
+def _merge_outputs(claims: List[Dict], records: List[Optional[ClaimRecord]], outputs: List,
+                   mode: str) -> List[ValidationState]:
+    """그래프 batch 결과 중 예외인 청구만 run_validation()과 같이 순차 실행으로 대체"""
+    states = []
+    for claim_data, record, output in zip(claims, records, outputs):
+        if isinstance(output, Exception):
+            logger.error("LangGraph execution failed for claim %s, falling back: %s", _claim_id(claim_data), output)
+            output = _run_isolated(claim_data, mode, record)
+        else:
+            output = _finalize(output)
+        states.append(output)
+    return states
+
+def run_validation_batch(claims: Sequence[Dict], mode: str = "full",
+                         max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                         sequential: bool = False) -> List[ValidationState]:
+    """
+    여러 청구를 최대 max_concurrency개씩 동시에 검증. 결과는 입력 순서.
+    LangGraph가 있으면 컴파일된 그래프의 batch(), 없거나 sequential=True면 스레드 풀에서
+    run_validation_sequential 실행. 한 청구의 실패는 해당 청구의 오류 상태로만 반환.
+    fast path 대상 청구는 먼저 걸러내고 나머지만 그래프/executor로 보냄.
+    """
+    claims = list(claims)
+    states, pending = _split_fast_path(claims, mode)
+    if pending:
+        batch = [claims[i] for i, _ in pending]
+        for (i, _), state in zip(pending, _run_batch(batch, [r for _, r in pending], mode, max_concurrency, sequential)):
+            states[i] = state
+    return states
+
+def _run_batch(claims: List[Dict], records: List[Optional[ClaimRecord]], mode: str,
+               max_concurrency: int, sequential: bool) -> List[ValidationState]:
+    graph = None if sequential else _batch_graph()
+    if graph is not None:
+        outputs = graph.batch(
+            [_initial_state(c, mode, r) for c, r in zip(claims, records)],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        return _merge_outputs(claims, records, outputs, mode)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(claims)))) as pool:
+        return list(pool.map(lambda c, r: _run_isolated(c, mode, r), claims, records))
+
+async def arun_validation_batch(claims: Sequence[Dict], mode: str = "full",
+                                max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                                sequential: bool = False) -> List[ValidationState]:
+    """
+    run_validation_batch의 async 버전 (이벤트 루프를 막지 않음).
+    LangGraph가 있으면 그래프의 abatch(), 아니면 Semaphore로 동시 실행 수를 제한하고 스레드에서 순차 실행.
+    """
+    claims = list(claims)
+    states, pending = _split_fast_path(claims, mode)
+    if pending:
+        batch = [claims[i] for i, _ in pending]
+        results = await _arun_batch(batch, [r for _, r in pending], mode, max_concurrency, sequential)
+        for (i, _), state in zip(pending, results):
+            states[i] = state
+    return states
+
+async def _arun_batch(claims: List[Dict], records: List[Optional[ClaimRecord]], mode: str,
+                      max_concurrency: int, sequential: bool) -> List[ValidationState]:
+    graph = None if sequential else _batch_graph()
+    if graph is not None:
+        outputs = await graph.abatch(
+            [_initial_state(c, mode, r) for c, r in zip(claims, records)],
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True,
+        )
+        return await asyncio.to_thread(_merge_outputs, claims, records, outputs, mode)
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    async def run_one(claim_data: Dict, record: Optional[ClaimRecord]) -> ValidationState:
+        async with semaphore:
+            return await asyncio.to_thread(_run_isolated, claim_data, mode, record)
+    return list(await asyncio.gather(*(run_one(c, r) for c, r in zip(claims, records))))
@@ -0,0 +1,86 @@
+"""
+Finding Message Templates
+=========================
+ValidationResult는 메시지 문자열 대신 템플릿 ID + 파라미터 튜플을 보관하고,
+to_dict() 또는 UI에서 요청할 때만 렌더링 (배치 hot path에서 문자열 포맷 제거).
+한국어(ko)와 영어(en) 문구를 모두 제공.
+"""
+from typing import Dict, Optional, Tuple
+
+DEFAULT_LANG = "ko"
+SUPPORTED_LANGS = ("ko", "en")
+
+# 템플릿 ID → 언어별 문구. 파라미터는 위치 인덱스({0}, {1}, ...)로 참조
+MESSAGE_TEMPLATES: Dict[str, Dict[str, str]] = {
+    # (claim_id,)
+    "PASS-000": {
+        "ko": "Claim {0}: 모든 검증을 통과했습니다.",
+        "en": "Claim {0}: all checks passed.",
+    },
+    # (icd_code, diagnosis_description, ndc_code)
+    "NDC-MISMATCH-001": {
+        "ko": "진단 {0} ({1})에 대해 약물 {2}이(가) 허용 목록에 없습니다.",
+        "en": "Drug {2} is not on the allowed list for diagnosis {0} ({1}).",
+    },
+    "CONFLICT-001": {
+        "ko": "제1형 당뇨(E10)와 제2형 당뇨(E11)가 동시에 진단됨. 상호 배타적 진단입니다.",
+        "en": "Type 1 (E10) and type 2 (E11) diabetes diagnosed together. These diagnoses are mutually exclusive.",
+    },
+    "CONFLICT-002": {
+        "ko": "현재 당뇨 진단(E11)과 당뇨 과거력(Z86.39)이 동시 존재. 코딩 검토 필요.",
+        "en": "Active diabetes (E11) coded with a personal history of diabetes (Z86.39). Coding review required.",
+    },
+    "CONFLICT-003": {
+        "ko": "천식(J45)과 COPD(J44) 동시 진단. ACO(Asthma-COPD Overlap) 확인 필요.",
+        "en": "Asthma (J45) and COPD (J44) diagnosed together. Check for ACO (Asthma-COPD Overlap).",
+    },
+    "GLP1-001": {
+        "ko": "GLP-1 약물이 처방되었으나 적응증(E11: 제2형 당뇨, E66: 비만)이 없습니다. 오남용 가능성.",
+        "en": "GLP-1 drug prescribed without an indication (E11: type 2 diabetes, E66: obesity). Possible misuse.",
+    },
+    "GLP1-002": {
+        "ko": "제1형 당뇨(E10) 환자에게 GLP-1이 처방됨. GLP-1은 제1형 당뇨 적응증이 아닙니다.",
+        "en": "GLP-1 prescribed to a type 1 diabetes (E10) patient. Type 1 diabetes is not a GLP-1 indication.",
+    },
+    # (hcc_code, description, risk_score_impact)
+    "HCC-UPCODE-001": {
+        "ko": "HCC {0} ({1}) 매핑되었으나 뒷받침하는 ICD 코드가 부족합니다. Risk Score 영향: {2}",
+        "en": "HCC {0} ({1}) is coded without supporting ICD codes. Risk score impact: {2}",
+    },
+    # (original_claim_id,)
+    "DUPLICATE-001": {
+        "ko": "중복 청구 의심: 동일한 환자/제공자/일자/코드/금액의 청구 {0}이(가) 이미 접수되었습니다.",
+        "en": "Possible duplicate: claim {0} with the same patient/provider/date/codes/amount was already received.",
+    },
+    # Bloom filter 모드 (원 청구 ID 없음)
+    "DUPLICATE-001-PROBABLE": {
+        "ko": "중복 청구 의심: 동일한 환자/제공자/일자/코드/금액의 청구가 최근 접수되었습니다.",
+        "en": "Possible duplicate: a claim with the same patient/provider/date/codes/amount was recently received.",
+    },
+    # (days_between, window_days)
+    "OPIOID-REFILL-001": {
+        "ko": "오피오이드가 이전 처방 후 {0}일 만에 다시 청구됨 (기준: {1}일 이내 재처방).",
+        "en": "Opioid billed again {0} days after a previous prescription (threshold: refill within {1} days).",
+    },
+    # (invalid_codes,)
+    "CODE-INVALID": {
+        "ko": "참조 사전에 없는 코드(무효 또는 폐기 코드): {0}",
+        "en": "Codes not found in the reference dictionaries (invalid or retired): {0}",
+    },
+}
+
+def render_message(template_id: str, params: Tuple = (), lang: str = DEFAULT_LANG) -> str:
+    """템플릿 렌더링. 요청 언어가 없으면 기본 언어(ko)로 대체"""
+    texts = MESSAGE_TEMPLATES[template_id]
+    text = texts.get(lang) or texts[DEFAULT_LANG]
+    return text.format(*params) if params else text
+
+def template_for_text(template_id: str, text: str) -> Optional[str]:
+    """
+    규칙 테이블의 고정 메시지가 내장 템플릿의 한국어 문구와 같으면 템플릿 ID 반환.
+    외부 규칙 파일에서 문구를 바꾼 경우 None (원문 그대로 사용).
+    """
+    texts = MESSAGE_TEMPLATES.get(template_id)
+    if texts is not None and texts[DEFAULT_LANG] == text:
+        return template_id
+    return None
@@ -0,0 +1,118 @@
+"""
+Parallel Batch Validation
+=========================
+영속 프로세스 풀 기반 배치 검증. 각 워커는 초기화 시 RxHCCRuleEngine을 한 번 생성해 재사용하고,
+청구는 chunk 단위로 전송하며 결과는 입력 순서대로 병합.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import logging
+import os
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, EngineState, ValidationResult
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# 워커 프로세스 측
+# ============================================================
+_WORKER_ENGINE: Optional[RxHCCRuleEngine] = None
+
+def _init_worker(ruleset_data: Dict, source: Optional[str], custom_rules: List[Callable], cache_size: int):
+    """워커당 한 번: 부모 엔진과 같은 규칙 세트/커스텀 규칙으로 엔진 생성"""
+    global _WORKER_ENGINE
+    from engine.ruleset import RuleSet
+    engine = RxHCCRuleEngine(ruleset=RuleSet.from_dict(ruleset_data, source=source), cache_size=cache_size)
+    for rule_fn in custom_rules:
+        engine.add_custom_rule(rule_fn)
+    _WORKER_ENGINE = engine
+
+def _validate_chunk(claims: List[ClaimRecord]) -> List[List[ValidationResult]]:
+    return _WORKER_ENGINE.validate_many(claims)
+
+def _validate_rows_chunk(rows: List[Dict]) -> Tuple[List, List, List]:
+    from engine.sagemaker_replication import validate_rows
+    results_json, max_severity, flagged, _ = validate_rows(_WORKER_ENGINE, rows)
+    return results_json, max_severity, flagged
+
+# ============================================================
+# 부모 프로세스 측
+# ============================================================
+class ParallelBatchValidator:
+    """
+    RxHCCRuleEngine의 규칙 세트/커스텀 규칙을 복제한 워커 풀로 배치를 sharding.
+    풀은 첫 호출 시 생성되어 close()까지 재사용되며, 엔진 규칙 상태(EngineState 스냅샷: 규칙 세트 교체,
+    커스텀 규칙 추가 등)가 바뀌면 다음 호출에서 재생성.
+    커스텀 규칙은 워커로 전달되므로 spawn 방식 플랫폼에서는 pickle 가능한 모듈 수준 함수여야 함.
+    """
+    def __init__(self, engine: RxHCCRuleEngine = None, workers: int = None, chunk_size: int = 2000):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        self.engine = engine or RxHCCRuleEngine()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_state: Optional[EngineState] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self._pool_state = None
+
+    def _executor(self) -> ProcessPoolExecutor:
+        # 스냅샷을 한 번만 읽어 워커 초기화 인자와 재생성 판단에 같이 사용 (규칙 세트/커스텀 규칙 불일치 방지)
+        snapshot = self.engine.state
+        if self._pool is not None and self._pool_state is not snapshot:
+            logger.info("Rule state changed (RuleSet %s -> %s), restarting worker pool",
+                        self._pool_state.ruleset.version, snapshot.ruleset.version)
+            self.close()
+        if self._pool is None:
+            ruleset = snapshot.ruleset
+            cache = self.engine._cache
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(ruleset.to_dict(), ruleset.source, list(snapshot.custom_rules),
+                          cache.maxsize if cache is not None else 0),
+            )
+            self._pool_state = snapshot
+            logger.info("Worker pool started: %d workers, chunk size %d", self.workers, self.chunk_size)
+        return self._pool
+
+    def _chunks(self, items: Sequence) -> List[Sequence]:
+        return [items[i:i + self.chunk_size] for i in range(0, len(items), self.chunk_size)]
+
+    def validate_many(self, claims: Sequence[ClaimRecord]) -> List[List[ValidationResult]]:
+        """입력 순서대로 청구별 검증 결과 (RxHCCRuleEngine.validate_many와 동일)"""
+        if self.workers <= 1 or len(claims) <= self.chunk_size:
+            return self.engine.validate_many(list(claims))
+        merged = []
+        for part in self._executor().map(_validate_chunk, self._chunks(list(claims))):
+            merged.extend(part)
+        return merged
+
+    def validate_batch(self, claims: Sequence[ClaimRecord]) -> Dict[str, List[ValidationResult]]:
+        """claim_id → 결과 (RxHCCRuleEngine.validate_batch와 동일)"""
+        return {claim.claim_id: results for claim, results in zip(claims, self.validate_many(claims))}
+
+    def validate_rows(self, rows: Sequence[Dict]) -> Tuple[List, List, List]:
+        """
+        원본 행(dict) 단위 검증. 파싱과 JSON 직렬화까지 워커에서 수행.
+        Returns: (validation_results JSON, max_severity, is_flagged) 리스트
+        """
+        from engine.sagemaker_replication import validate_rows
+        if self.workers <= 1 or len(rows) <= self.chunk_size:
+            return validate_rows(self.engine, list(rows))[:3]
+        results_json, max_severity, flagged = [], [], []
+        for part_json, part_sev, part_flag in self._executor().map(_validate_rows_chunk, self._chunks(list(rows))):
+            results_json.extend(part_json)
+            max_severity.extend(part_sev)
+            flagged.extend(part_flag)
+        return results_json, max_severity, flagged
@@ -0,0 +1,69 @@
+"""
+Prefix Index
+============
+NDC/ICD prefix 매칭용 문자 trie.
+규칙 세트당 한 번 빌드하고, 코드 하나가 속한 규칙 그룹을 코드 길이에 비례하는 시간에 조회.
+"""
+from typing import Dict, FrozenSet, Hashable, Iterable
+
+_GROUPS = None # trie 노드 내 그룹 저장 키 (문자와 충돌하지 않음)
+_EMPTY: FrozenSet = frozenset()
+
+class PrefixIndex:
+    """
+    prefix → 그룹 집합 trie.
+    match(code)는 code.startswith(prefix)가 참인 모든 prefix의 그룹 합집합을 반환.
+    """
+    __slots__ = ("_root", "_size")
+
+    def __init__(self):
+        self._root: Dict = {}
+        self._size = 0
+
+    @classmethod
+    def from_groups(cls, groups: Dict[Hashable, Iterable[str]]) -> 'PrefixIndex':
+        """{그룹: [prefix, ...]} 형태에서 인덱스 생성"""
+        index = cls()
+        for group, prefixes in groups.items():
+            for prefix in prefixes:
+                index.add(prefix, group)
+        return index
+
+    def add(self, prefix: str, group: Hashable):
+        """prefix에 그룹 태그 추가"""
+        node = self._root
+        for ch in prefix:
+            node = node.setdefault(ch, {})
+        existing = node.get(_GROUPS, _EMPTY)
+        if not existing:
+            self._size += 1
+        node[_GROUPS] = existing | {group}
+
+    def match(self, code: str) -> FrozenSet:
+        """code의 모든 prefix에 걸린 그룹 합집합"""
+        node = self._root
+        found = node.get(_GROUPS, _EMPTY)
+        for ch in code:
+            node = node.get(ch)
+            if node is None:
+                break
+            groups = node.get(_GROUPS)
+            if groups:
+                found = found | groups if found else groups
+        return found
+
+    def matches(self, code: str, group: Hashable) -> bool:
+        """code가 group에 속하는 prefix로 시작하는지 여부"""
+        node = self._root
+        if group in node.get(_GROUPS, _EMPTY):
+            return True
+        for ch in code:
+            node = node.get(ch)
+            if node is None:
+                return False
+            if group in node.get(_GROUPS, _EMPTY):
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return self._size
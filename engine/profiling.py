@@ -0,0 +1,116 @@
+"""
+Rule Profiler
+=============
+규칙 단위(내장 규칙군 + 커스텀 규칙)별 호출 수, hit 수, finding 수, 예외 수, 누적/백분위 지연 시간 수집.
+RxHCCRuleEngine.enable_profiling()으로 켤 때만 동작 (비활성 시 엔진은 속성 체크 한 번만 수행).
+"""
+from collections import deque
+from typing import Deque, Dict, List
+import threading
+
+# 스냅샷/Prometheus에 노출할 지연 시간 백분위
+PERCENTILES = (50, 90, 99)
+
+class _UnitStats:
+    __slots__ = ("calls", "hits", "findings", "exceptions", "total_ns", "samples")
+
+    def __init__(self, sample_size: int):
+        self.calls = 0
+        self.hits = 0
+        self.findings = 0
+        self.exceptions = 0
+        self.total_ns = 0
+        self.samples: Deque[int] = deque(maxlen=sample_size)
+
+def _percentile(sorted_samples: List[int], pct: int) -> int:
+    """nearest-rank 백분위"""
+    if not sorted_samples:
+        return 0
+    rank = max(int(round(pct / 100 * len(sorted_samples))) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+class RuleProfiler:
+    """
+    규칙 단위 계측. 백분위는 규칙당 최근 sample_size개 지연 시간 표본으로 계산.
+    """
+    def __init__(self, sample_size: int = 1024):
+        if sample_size <= 0:
+            raise ValueError("sample_size must be positive")
+        self.sample_size = sample_size
+        self._units: Dict[str, _UnitStats] = {}
+        self._lock = threading.Lock()
+
+    def _unit(self, unit: str) -> _UnitStats:
+        stats = self._units.get(unit)
+        if stats is None:
+            stats = self._units.setdefault(unit, _UnitStats(self.sample_size))
+        return stats
+
+    def record(self, unit: str, elapsed_ns: int, n_findings: int):
+        with self._lock:
+            stats = self._unit(unit)
+            stats.calls += 1
+            stats.total_ns += elapsed_ns
+            stats.samples.append(elapsed_ns)
+            if n_findings:
+                stats.hits += 1
+                stats.findings += n_findings
+
+    def record_exception(self, unit: str, elapsed_ns: int):
+        with self._lock:
+            stats = self._unit(unit)
+            stats.calls += 1
+            stats.exceptions += 1
+            stats.total_ns += elapsed_ns
+            stats.samples.append(elapsed_ns)
+
+    def reset(self):
+        with self._lock:
+            self._units.clear()
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """규칙 단위 → 통계 dict (지연 시간 단위: µs)"""
+        with self._lock:
+            units = [(unit, s.calls, s.hits, s.findings, s.exceptions, s.total_ns, sorted(s.samples))
+                     for unit, s in self._units.items()]
+        snapshot = {}
+        for unit, calls, hits, findings, exceptions, total_ns, samples in units:
+            entry = {
+                "calls": calls,
+                "hits": hits,
+                "hit_rate": round(hits / calls, 4) if calls else 0.0,
+                "findings": findings,
+                "exceptions": exceptions,
+                "total_ms": round(total_ns / 1e6, 3),
+                "mean_us": round(total_ns / calls / 1e3, 3) if calls else 0.0,
+            }
+            for pct in PERCENTILES:
+                entry[f"p{pct}_us"] = round(_percentile(samples, pct) / 1e3, 3)
+            snapshot[unit] = entry
+        return snapshot
+
+    def to_prometheus(self, prefix: str = "rxhcc_rule") -> str:
+        """Prometheus text exposition format (counter + summary)"""
+        snapshot = self.snapshot()
+        lines = []
+
+        def counter(name: str, help_text: str, key: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for unit, entry in snapshot.items():
+                lines.append(f'{prefix}_{name}{{rule="{unit}"}} {entry[key]}')
+
+        counter("calls_total", "Rule evaluations.", "calls")
+        counter("hits_total", "Rule evaluations that produced at least one finding.", "hits")
+        counter("findings_total", "Findings produced.", "findings")
+        counter("exceptions_total", "Rule evaluations that raised.", "exceptions")
+
+        lines.append(f"# HELP {prefix}_latency_seconds Rule evaluation latency.")
+        lines.append(f"# TYPE {prefix}_latency_seconds summary")
+        for unit, entry in snapshot.items():
+            for pct in PERCENTILES:
+                lines.append(f'{prefix}_latency_seconds{{rule="{unit}",quantile="{pct / 100}"}} '
+                             f'{entry[f"p{pct}_us"] / 1e6:.9f}')
+            lines.append(f'{prefix}_latency_seconds_sum{{rule="{unit}"}} {entry["total_ms"] / 1e3:.9f}')
+            lines.append(f'{prefix}_latency_seconds_count{{rule="{unit}"}} {entry["calls"]}')
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,223 @@
+"""
+Reference Code Dictionaries
+===========================
+ICD-10-CM 코드 목록(CMS icd10cm_codes_YYYY.txt)과 NDC Directory(FDA package.txt)를 로컬 파일에서 로드.
+원본은 한 번만 파싱해 정렬된 고정폭 바이너리(.bin)로 변환하고, 이후에는 np.memmap으로 열어
+binary search(searchsorted)로 존재/prefix 조회. 파싱이 없으므로 시작이 빠르고,
+여러 워커 프로세스가 같은 파일을 열면 OS 페이지 캐시를 공유 (pickle 시 경로만 전달).
+CodeValidityRule은 RxHCCRuleEngine.add_custom_rule()에 등록하는 CODE-INVALID 규칙.
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+import logging
+import os
+import struct
+
+import numpy as np
+
+from engine.rules import ClaimRecord, ValidationResult, Severity
+from engine.codegen import ensure_private_dir, user_cache_dir
+
+logger = logging.getLogger(__name__)
+
+REFERENCE_DIR_ENV = "RXHCC_REFERENCE_DIR"
+REFERENCE_CACHE_ENV = "RXHCC_REFERENCE_CACHE"
+DEFAULT_REFERENCE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'reference'))
+ICD_SOURCE_FILE = "icd10cm_codes.txt"
+NDC_SOURCE_FILE = "ndc_package.txt"
+
+# .bin 헤더: magic, 포맷 버전, 레코드 폭(bytes), 레코드 수
+_MAGIC = b"RXHCCREF"
+_FORMAT_VERSION = 1
+_HEADER = struct.Struct("<8sIIQ")
+
+# ============================================================
+# 코드 정규화 (사전 키)
+# ============================================================
+def normalize_icd(code: str) -> str:
+    """E11.65 → E1165"""
+    return code.strip().replace(".", "").upper()
+
+def normalize_ndc(code: str) -> str:
+    """하이픈 표기(4-4-2/5-3-2/5-4-1/5-4-2)를 11자리 5-4-2 숫자열로 (0002-1433-80 → 00002143380)"""
+    parts = code.strip().split("-")
+    if len(parts) == 3:
+        return parts[0].zfill(5) + parts[1].zfill(4) + parts[2].zfill(2)
+    return "".join(parts)
+
+def normalize_ndc_prefix(prefix: str) -> str:
+    """prefix는 마지막 구간을 그대로 두고 앞 구간만 자리수 보정 (00002-1433 → 000021433)"""
+    parts = prefix.strip().split("-")
+    if len(parts) == 3:
+        return normalize_ndc(prefix)
+    return "".join(p.zfill(w) for p, w in zip(parts[:-1], (5, 4))) + parts[-1]
+
+_NORMALIZERS: Dict[str, Callable[[str], str]] = {"icd": normalize_icd, "ndc": normalize_ndc}
+_PREFIX_NORMALIZERS: Dict[str, Callable[[str], str]] = {"icd": normalize_icd, "ndc": normalize_ndc_prefix}
+
+# ============================================================
+# 원본 파일 파싱
+# ============================================================
+def parse_icd10cm_codes(path: str) -> List[str]:
+    """CMS 코드 파일: 줄마다 '코드 설명' (코드는 점 없음)"""
+    with open(path, encoding="latin-1") as f:
+        return [line.split(None, 1)[0] for line in f if line.strip()]
+
+def parse_ndc_packages(path: str) -> List[str]:
+    """FDA NDC Directory package 파일 (tab 구분, NDCPACKAGECODE 컬럼)"""
+    with open(path, encoding="latin-1") as f:
+        header = f.readline().rstrip("\r\n").split("\t")
+        col = header.index("NDCPACKAGECODE")
+        return [row.split("\t")[col] for row in f if row.strip()]
+
+_PARSERS: Dict[str, Callable[[str], List[str]]] = {"icd": parse_icd10cm_codes, "ndc": parse_ndc_packages}
+
+def build_reference_file(codes: Iterable[str], path: str, kind: str) -> int:
+    """코드를 정규화/정렬/중복 제거하여 고정폭 바이너리로 저장 (원자적 교체). 레코드 수 반환"""
+    normalize = _NORMALIZERS[kind]
+    keys = np.unique(np.array([normalize(c).encode("ascii", "replace") for c in codes], dtype=bytes))
+    width = max(keys.dtype.itemsize, 1)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, _FORMAT_VERSION, width, len(keys)))
+        f.write(keys.astype(f"S{width}").tobytes())
+    os.replace(tmp, path)
+    return len(keys)
+
+# ============================================================
+# memory-mapped 사전
+# ============================================================
+class ReferenceDictionary:
+    """
+    정렬된 고정폭 코드 배열 (읽기 전용 memmap).
+    조회 결과는 코드 문자열별로 memo (청구 코드는 반복이 많음).
+    """
+    MEMO_LIMIT = 65536
+
+    def __init__(self, path: str, kind: str):
+        if kind not in _NORMALIZERS:
+            raise ValueError(f"Unknown reference kind: {kind}")
+        self.path = path
+        self.kind = kind
+        self._normalize = _NORMALIZERS[kind]
+        with open(path, "rb") as f:
+            magic, version, width, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _FORMAT_VERSION:
+            raise ValueError(f"Not a reference dictionary file (v{_FORMAT_VERSION}): {path}")
+        self.width = width
+        self.codes = (
+            np.memmap(path, dtype=f"S{width}", mode="r", offset=_HEADER.size, shape=(count,))
+            if count else np.empty(0, dtype=f"S{width}")
+        )
+        self._memo: Dict[str, bool] = {}
+
+    def __reduce__(self):
+        # 워커 프로세스에는 경로만 전달하고 각자 memmap (페이지 공유)
+        return (ReferenceDictionary, (self.path, self.kind))
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _key(self, code: str) -> bytes:
+        return self._normalize(code).encode("ascii", "replace")
+
+    def __contains__(self, code: str) -> bool:
+        found = self._memo.get(code)
+        if found is None:
+            key = self._key(code)
+            i = int(np.searchsorted(self.codes, key))
+            found = bool(i < len(self.codes) and self.codes[i] == key)
+            if len(self._memo) >= self.MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[code] = found
+        return found
+
+    def contains_many(self, codes: Iterable[str]) -> np.ndarray:
+        """코드 배열 일괄 조회 (벡터화 searchsorted). 레코드 폭보다 긴 코드는 잘리지 않도록 조회 전에 False"""
+        raw = [self._key(c) for c in codes]
+        fits = np.array([len(k) <= self.width for k in raw], dtype=bool)
+        found = np.zeros(len(raw), dtype=bool)
+        if len(self.codes) == 0 or not fits.any():
+            return found
+        keys = np.array([k for k, ok in zip(raw, fits) if ok], dtype=f"S{self.width}")
+        idx = np.minimum(np.searchsorted(self.codes, keys), len(self.codes) - 1)
+        found[fits] = self.codes[idx] == keys
+        return found
+
+    def _prefix_range(self, prefix: str):
+        key = _PREFIX_NORMALIZERS[self.kind](prefix).encode("ascii", "replace")
+        lo = int(np.searchsorted(self.codes, key, side="left"))
+        hi = int(np.searchsorted(self.codes, key + b"\xff", side="left"))
+        return lo, hi
+
+    def count_prefix(self, prefix: str) -> int:
+        lo, hi = self._prefix_range(prefix)
+        return hi - lo
+
+    def with_prefix(self, prefix: str, limit: int = None) -> List[str]:
+        """prefix로 시작하는 정규화 코드 (정렬 순)"""
+        lo, hi = self._prefix_range(prefix)
+        if limit is not None:
+            hi = min(hi, lo + limit)
+        return [c.decode("ascii") for c in self.codes[lo:hi]]
+
+def compile_reference(source: str, kind: str, cache_dir: str = None) -> str:
+    """
+    원본 파일 → .bin 경로. 파일명에 원본 크기/수정 시각을 넣어 원본이 바뀌면 자동 재변환,
+    그대로면 파싱 없이 기존 파일 재사용.
+    cache_dir 기본값: $RXHCC_REFERENCE_CACHE 또는 사용자 전용 ~/.cache/rxhcc/reference (0o700, codegen 캐시와 같은 검사)
+    """
+    cache_dir = cache_dir or os.environ.get(REFERENCE_CACHE_ENV) or user_cache_dir("reference")
+    ensure_private_dir(cache_dir)
+    st = os.stat(source)
+    name = os.path.splitext(os.path.basename(source))[0]
+    path = os.path.join(cache_dir, f"{kind}_{name}_{st.st_size}_{st.st_mtime_ns}_v{_FORMAT_VERSION}.bin")
+    if not os.path.exists(path):
+        count = build_reference_file(_PARSERS[kind](source), path, kind)
+        logger.info("Compiled %s reference %s: %s codes -> %s", kind, source, count, path)
+    return path
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """ICD-10-CM + NDC 참조 사전 묶음"""
+    icd: ReferenceDictionary
+    ndc: ReferenceDictionary
+
+    @classmethod
+    def load(cls, source_dir: str = None, cache_dir: str = None) -> 'ReferenceData':
+        """source_dir(기본: $RXHCC_REFERENCE_DIR 또는 data/reference)의 원본 파일을 변환/재사용하여 memmap"""
+        source_dir = source_dir or os.environ.get(REFERENCE_DIR_ENV) or DEFAULT_REFERENCE_DIR
+        return cls(
+            icd=ReferenceDictionary(compile_reference(os.path.join(source_dir, ICD_SOURCE_FILE), "icd", cache_dir), "icd"),
+            ndc=ReferenceDictionary(compile_reference(os.path.join(source_dir, NDC_SOURCE_FILE), "ndc", cache_dir), "ndc"),
+        )
+
+# ============================================================
+# CODE-INVALID 규칙
+# ============================================================
+class CodeValidityRule:
+    """
+    참조 사전에 없는 ICD/NDC 코드(오타, 비청구 카테고리 코드, 폐기 코드)를 CODE-INVALID로 표시.
+    custom rule 형식이므로 engine.add_custom_rule(CodeValidityRule(reference))로 등록.
+    """
+    __name__ = "code_validity_rule"
+
+    def __init__(self, reference: ReferenceData = None, severity: Severity = Severity.WARNING):
+        self.reference = reference or ReferenceData.load()
+        self.severity = severity
+
+    def __call__(self, claim: ClaimRecord) -> Optional[ValidationResult]:
+        icd, ndc = self.reference.icd, self.reference.ndc
+        invalid_icds = [c for c in claim.icd_codes if c not in icd]
+        invalid_ndcs = [c for c in claim.ndc_codes if c not in ndc]
+        if not invalid_icds and not invalid_ndcs:
+            return None
+        return ValidationResult(
+            rule_id="CODE-INVALID",
+            rule_name="Invalid or Retired Code",
+            severity=self.severity,
+            details={"claim_id": claim.claim_id, "invalid_icd_codes": invalid_icds, "invalid_ndc_codes": invalid_ndcs},
+            template_id="CODE-INVALID",
+            params=(", ".join(invalid_icds + invalid_ndcs),)
+        )
@@ -0,0 +1,286 @@
+"""
+CMS-HCC Risk Adjustment
+=======================
+ICD-10 → HCC crosswalk, HCC hierarchy(상위 HCC가 하위 HCC를 대체), HCC 계수로 환자별 RAF(risk adjustment factor) 계산.
+HCC_HIGH_RISK_MAPPINGS(3개 HCC, 고정 risk_score_impact)의 전체 crosswalk 버전.
+
+- 로컬 CSV(data/cms_hcc/ 형식 또는 CMS 공개 매핑 파일 컬럼명)를 정렬된 numpy 배열로 로드
+- 데이터셋 ICD는 EncodedClaims vocab 단위로 한 번만 매핑하고, (환자, HCC) 키 배열로 groupby 집계
+- 청구의 HCC 코드 중 같은 청구 ICD의 crosswalk가 뒷받침하지 않는 항목을 표시
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from engine.vocab import EncodedClaims
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'cms_hcc'))
+CROSSWALK_FILE = "icd_hcc_crosswalk.csv"
+COEFFICIENTS_FILE = "hcc_coefficients.csv"
+HIERARCHY_FILE = "hcc_hierarchy.csv"
+
+# 컬럼 별칭 (우선순위 순). CMS 매핑 파일은 "Diagnosis Code" / "CMS-HCC Model Category V24" 형식
+CROSSWALK_ICD_COLUMNS = ("icd_code", "Diagnosis Code")
+CROSSWALK_HCC_COLUMNS = ("hcc_code", "CMS-HCC Model Category V24", "CMS-HCC Model Category V28")
+
+def normalize_icd(code: str) -> str:
+    """crosswalk 조회 키: 점 제거 + 대문자 (E11.65 → E1165)"""
+    return str(code).strip().replace(".", "").upper()
+
+def normalize_hcc(code) -> str:
+    """HCC 라벨 정규화: 숫자만 있으면 HCC 접두어 추가 (18 → HCC18)"""
+    text = str(code).strip().upper()
+    if text.replace(".", "").isdigit():
+        return f"HCC{int(float(text))}"
+    return text
+
+def _pick_column(df: pd.DataFrame, names: Sequence[str]) -> str:
+    for name in names:
+        if name in df.columns:
+            return name
+    raise ValueError(f"Missing column, expected one of {list(names)}")
+
+def _expand(ids: np.ndarray, offsets: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """ids[i]의 CSR 구간을 펼침 → (ids 위치, 값)"""
+    counts = offsets[ids + 1] - offsets[ids]
+    positions = np.repeat(np.arange(len(ids), dtype=np.int64), counts)
+    within = np.arange(len(positions), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+    return positions, values[np.repeat(offsets[ids], counts) + within]
+
+def _sorted_member(sorted_keys: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """keys 각각이 정렬된 sorted_keys에 있는지"""
+    if len(sorted_keys) == 0:
+        return np.zeros(len(keys), dtype=bool)
+    idx = np.minimum(np.searchsorted(sorted_keys, keys), len(sorted_keys) - 1)
+    return sorted_keys[idx] == keys
+
+# ============================================================
+# HCC 모델 (crosswalk + 계수 + hierarchy)
+# ============================================================
+@dataclass(frozen=True, eq=False)
+class HCCModel:
+    """
+    compact lookup 배열로 컴파일된 CMS-HCC 모델 (불변).
+    HCC는 계수 테이블 순서의 int 인덱스로 다루고, ICD 키는 정렬 배열 + searchsorted로 조회.
+    """
+    hcc_codes: Tuple[str, ...]
+    descriptions: Tuple[str, ...]
+    coefficients: np.ndarray # float64, HCC 인덱스별 계수
+    icd_keys: np.ndarray # 정렬된 정규화 ICD (한 ICD가 여러 HCC에 매핑되면 중복)
+    icd_hcc: np.ndarray # int32, icd_keys와 같은 순서의 HCC 인덱스
+    dominator_offsets: np.ndarray # int64, HCC k를 대체하는 상위 HCC의 CSR offsets
+    dominators: np.ndarray # int32
+    source: Optional[str] = None
+
+    @classmethod
+    def from_dir(cls, path: str = None) -> 'HCCModel':
+        """crosswalk/계수/hierarchy CSV 3개가 있는 디렉토리에서 로드 (기본: data/cms_hcc)"""
+        path = path or DEFAULT_MODEL_DIR
+        hierarchy_path = os.path.join(path, HIERARCHY_FILE)
+        return cls.from_frames(
+            pd.read_csv(os.path.join(path, CROSSWALK_FILE), dtype=str),
+            pd.read_csv(os.path.join(path, COEFFICIENTS_FILE), dtype={"hcc_code": str}),
+            pd.read_csv(hierarchy_path, dtype=str) if os.path.exists(hierarchy_path) else None,
+            source=path,
+        )
+
+    @classmethod
+    def from_frames(cls, crosswalk: pd.DataFrame, coefficients: pd.DataFrame,
+                    hierarchy: pd.DataFrame = None, source: str = None) -> 'HCCModel':
+        """
+        crosswalk: ICD, HCC 컬럼 / coefficients: hcc_code, coefficient (description 선택)
+        hierarchy: hcc_code, dropped_hcc (hcc_code가 있으면 dropped_hcc 제외)
+        계수 테이블에 없는 HCC로 가는 crosswalk 행은 모델 밖 HCC이므로 무시.
+        """
+        hcc_codes = tuple(normalize_hcc(c) for c in coefficients["hcc_code"])
+        if len(set(hcc_codes)) != len(hcc_codes):
+            raise ValueError("Duplicate HCC codes in coefficient table")
+        position = {c: k for k, c in enumerate(hcc_codes)}
+        descriptions = tuple(
+            str(d) for d in (coefficients["description"] if "description" in coefficients.columns else hcc_codes)
+        )
+
+        icd_col = _pick_column(crosswalk, CROSSWALK_ICD_COLUMNS)
+        hcc_col = _pick_column(crosswalk, CROSSWALK_HCC_COLUMNS)
+        pairs = crosswalk[[icd_col, hcc_col]].dropna()
+        icds = np.array([normalize_icd(c) for c in pairs[icd_col]], dtype=str)
+        hccs = np.array([position.get(normalize_hcc(c), -1) for c in pairs[hcc_col]], dtype=np.int32)
+        known = hccs >= 0
+        if not known.all():
+            logger.info("Crosswalk rows without coefficient: %s", int((~known).sum()))
+        icds, hccs = icds[known], hccs[known]
+        order = np.lexsort((hccs, icds))
+        icds, hccs = icds[order], hccs[order]
+        if len(icds):
+            keep = np.ones(len(icds), dtype=bool)
+            keep[1:] = (icds[1:] != icds[:-1]) | (hccs[1:] != hccs[:-1])
+            icds, hccs = icds[keep], hccs[keep]
+
+        # hierarchy: 하위 HCC → 상위 HCC 목록 (CSR)
+        dropped, dominant = [], []
+        if hierarchy is not None:
+            for top, low in zip(hierarchy["hcc_code"], hierarchy["dropped_hcc"]):
+                top_k, low_k = position.get(normalize_hcc(top)), position.get(normalize_hcc(low))
+                if top_k is None or low_k is None:
+                    continue
+                dropped.append(low_k)
+                dominant.append(top_k)
+        dropped = np.array(dropped, dtype=np.int64)
+        order = np.argsort(dropped, kind="stable")
+        offsets = np.zeros(len(hcc_codes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(dropped, minlength=len(hcc_codes)), out=offsets[1:])
+
+        return cls(
+            hcc_codes=hcc_codes,
+            descriptions=descriptions,
+            coefficients=coefficients["coefficient"].to_numpy(dtype=np.float64),
+            icd_keys=icds,
+            icd_hcc=hccs,
+            dominator_offsets=offsets,
+            dominators=np.array(dominant, dtype=np.int32)[order],
+            source=source,
+        )
+
+    @property
+    def n_hccs(self) -> int:
+        return len(self.hcc_codes)
+
+    def hcc_index(self, hcc_code: str) -> Optional[int]:
+        try:
+            return self.hcc_codes.index(normalize_hcc(hcc_code))
+        except ValueError:
+            return None
+
+    def map_icds(self, icd_keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """정규화 ICD 배열 → (입력 위치, HCC 인덱스) 쌍. 위치 오름차순."""
+        icd_keys = np.asarray(icd_keys, dtype=str)
+        left = np.searchsorted(self.icd_keys, icd_keys, side="left")
+        right = np.searchsorted(self.icd_keys, icd_keys, side="right")
+        counts = right - left
+        positions = np.repeat(np.arange(len(icd_keys), dtype=np.int64), counts)
+        within = np.arange(len(positions), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        return positions, self.icd_hcc[np.repeat(left, counts) + within]
+
+    def hccs_for_icds(self, icd_codes: Iterable[str]) -> List[str]:
+        """ICD 목록이 뒷받침하는 HCC (hierarchy 적용 전, 계수 테이블 순서)"""
+        _, hccs = self.map_icds(np.array([normalize_icd(c) for c in icd_codes], dtype=str))
+        return [self.hcc_codes[k] for k in sorted(set(hccs.tolist()))]
+
+    def apply_hierarchy(self, hcc_codes: Iterable[str]) -> List[str]:
+        """상위 HCC가 함께 있으면 하위 HCC 제외"""
+        present = {k for k in (self.hcc_index(c) for c in hcc_codes) if k is not None}
+        kept = [
+            k for k in present
+            if not present.intersection(self.dominators[self.dominator_offsets[k]:self.dominator_offsets[k + 1]].tolist())
+        ]
+        return [self.hcc_codes[k] for k in sorted(kept)]
+
+    def raf_score(self, icd_codes: Iterable[str]) -> float:
+        """ICD 목록의 질병 RAF (hierarchy 적용 후 계수 합, 인구통계 계수 제외)"""
+        kept = self.apply_hierarchy(self.hccs_for_icds(icd_codes))
+        return float(sum(self.coefficients[self.hcc_index(c)] for c in kept))
+
+# ============================================================
+# 데이터셋 단위 벡터화 계산
+# ============================================================
+@dataclass
+class RiskAdjustmentResult:
+    """
+    patients: 환자별 patient_id, n_hccs, raf_score (HCC 없는 환자는 0)
+    patient_hccs: (환자, HCC) 행 단위 patient_id, hcc_code, coefficient, trumped (hierarchy로 제외 여부)
+    unsupported_hccs: 청구 ICD crosswalk가 뒷받침하지 않는 청구 HCC 코드 (row, claim_id, patient_id, hcc_code, coefficient)
+    """
+    patients: pd.DataFrame
+    patient_hccs: pd.DataFrame
+    unsupported_hccs: pd.DataFrame
+
+    def summary(self) -> Dict:
+        return {
+            "patients": len(self.patients),
+            "patients_with_hcc": int((self.patients["n_hccs"] > 0).sum()),
+            "mean_raf": round(float(self.patients["raf_score"].mean()), 4) if len(self.patients) else 0.0,
+            "trumped_hccs": int(self.patient_hccs["trumped"].sum()),
+            "unsupported_hccs": len(self.unsupported_hccs),
+        }
+
+def _column(df: pd.DataFrame, key: str) -> np.ndarray:
+    if key not in df.columns:
+        return np.full(len(df), "", dtype=object)
+    return df[key].fillna("").astype(str).to_numpy(dtype=object)
+
+def compute_risk_adjustment(df: pd.DataFrame, model: HCCModel = None,
+                            encoded: EncodedClaims = None) -> RiskAdjustmentResult:
+    """
+    청구 DataFrame → 환자별 HCC 집합/RAF + 뒷받침 없는 청구 HCC.
+    encoded: 같은 df의 EncodedClaims (columnar 검증 등에서 이미 인코딩했다면 재사용)
+    """
+    model = model or HCCModel.from_dir()
+    enc = encoded if encoded is not None else EncodedClaims.from_dataframe(df)
+    n_hccs = model.n_hccs
+
+    # 1) ICD vocab → HCC 인덱스 (고유 코드당 1회 조회)
+    vocab_keys = np.array([normalize_icd(c) for c in enc.icd.vocab.codes], dtype=str)
+    vocab_pos, vocab_hcc = model.map_icds(vocab_keys)
+    vocab_offsets = np.zeros(len(vocab_keys) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(vocab_pos, minlength=len(vocab_keys)), out=vocab_offsets[1:])
+
+    # 2) 청구별 ICD 항목 → (청구, HCC) 고유 키
+    entry_pos, entry_hcc = _expand(enc.icd.ids.astype(np.int64), vocab_offsets, vocab_hcc.astype(np.int64))
+    claim_keys = np.unique(enc.icd.rows[entry_pos].astype(np.int64) * n_hccs + entry_hcc)
+
+    # 3) 환자 groupby: (환자, HCC) 고유 키
+    patient_codes, patient_ids = pd.factorize(_column(df, "patient_id"))
+    patient_codes = np.asarray(patient_codes, dtype=np.int64)
+    n_patients = len(patient_ids)
+    patient_keys = np.unique(patient_codes[claim_keys // n_hccs] * n_hccs + claim_keys % n_hccs)
+    key_patient, key_hcc = np.divmod(patient_keys, n_hccs)
+
+    # 4) hierarchy: 같은 환자에게 상위 HCC가 있으면 trumped
+    trumped = np.zeros(len(patient_keys), dtype=bool)
+    dom_pos, dom_hcc = _expand(key_hcc, model.dominator_offsets, model.dominators.astype(np.int64))
+    if len(dom_pos):
+        hit = _sorted_member(patient_keys, key_patient[dom_pos] * n_hccs + dom_hcc)
+        trumped[dom_pos[hit]] = True
+
+    kept = ~trumped
+    coefficient = model.coefficients[key_hcc]
+    raf = np.bincount(key_patient[kept], weights=coefficient[kept], minlength=n_patients)
+    counts = np.bincount(key_patient[kept], minlength=n_patients)
+
+    hcc_labels = np.asarray(model.hcc_codes, dtype=object)
+    patient_ids = np.asarray(patient_ids, dtype=object)
+    patients = pd.DataFrame({
+        "patient_id": patient_ids,
+        "n_hccs": counts.astype(np.int64),
+        "raf_score": raf.round(6),
+    })
+    patient_hccs = pd.DataFrame({
+        "patient_id": patient_ids[key_patient],
+        "hcc_code": hcc_labels[key_hcc],
+        "coefficient": coefficient,
+        "trumped": trumped,
+    })
+
+    # 5) 청구 HCC 중 청구 ICD가 뒷받침하지 않는 항목 (모델에 없는 HCC 포함)
+    position = {c: k for k, c in enumerate(model.hcc_codes)}
+    vocab_model = np.array([position.get(normalize_hcc(c), -1) for c in enc.hcc.vocab.codes], dtype=np.int64)
+    hcc_entry = vocab_model[enc.hcc.ids] if enc.hcc.n_entries else np.empty(0, dtype=np.int64)
+    supported = (hcc_entry >= 0) & _sorted_member(
+        claim_keys, enc.hcc.rows.astype(np.int64) * n_hccs + np.maximum(hcc_entry, 0)
+    )
+    missing = np.flatnonzero(~supported)
+    rows = enc.hcc.rows[missing]
+    unsupported_hccs = pd.DataFrame({
+        "row": rows.astype(np.int64),
+        "claim_id": _column(df, "claim_id")[rows],
+        "patient_id": patient_ids[patient_codes[rows]] if n_patients else np.empty(0, dtype=object),
+        "hcc_code": enc.hcc.vocab.decode(enc.hcc.ids[missing]),
+        "coefficient": np.where(hcc_entry[missing] >= 0, model.coefficients[np.maximum(hcc_entry[missing], 0)], np.nan),
+    })
+    return RiskAdjustmentResult(patients=patients, patient_hccs=patient_hccs, unsupported_hccs=unsupported_hccs)
@@ -4,11 +4,26 @@ RxHCC Validation Rules Engine
 모든 검증 규칙을 중앙 집중 관리.
 새 규칙 추가 시 이 파일만 수정하면 됨.
 """
-from dataclasses import dataclass, field
-from enum import Enum
-from typing import List, Dict, Optional, Callable
+from dataclasses import dataclass, replace
+from datetime import date
+from enum import Enum, IntFlag
+from sys import intern
+from typing import List, Dict, Mapping, Optional, Callable, Tuple, Union, TYPE_CHECKING
+from time import perf_counter_ns
 import json
 import logging
+import threading
+
+from engine.cache import SignatureCache
+from engine.profiling import RuleProfiler
+from engine.triage import TriageScheduler
+from engine.messages import DEFAULT_LANG, render_message
+
+if TYPE_CHECKING:
+    from engine.vocab import EncodedClaims
+    from engine.batch import BatchPlan
+    from engine.ruleset import RuleSet, DeclarativeRule
+    from engine.codegen import RuleCompiler
 
 logger = logging.getLogger(__name__)
 
@@ -18,34 +33,127 @@ class Severity(Enum):
     CRITICAL = "CRITICAL"
     INFO = "INFO"
 
-@dataclass
+# 최고 심각도 비교용 순위 (PandasBatchValidator와 동일한 순서)
+SEVERITY_RANK = {"CRITICAL": 4, "WARNING": 3, "INFO": 2, "PASS": 1}
+
+class RuleFlag(IntFlag):
+    """청구별 위반 규칙군 비트 플래그 (columnar 경로의 flags 컬럼)"""
+    NONE = 0
+    NDC_MISMATCH = 1
+    ICD_CONFLICT = 2
+    GLP1 = 4
+    HCC_UPCODING = 8
+    CUSTOM = 16
+
 class ValidationResult:
-    rule_id: str
-    rule_name: str
-    severity: Severity
-    message: str
-    details: Dict = field(default_factory=dict)
+    """
+    규칙 위반/통과 결과.
+    details: 청구 고유 값(코드, claim_id 등)만 보관
+    rule_meta: 규칙 메타데이터(허용 prefix 목록, 설명 등) — RuleSet의 규칙별 공유 읽기 전용 mapping (결과마다 복사하지 않음)
+    template_id/params: 메시지 템플릿(engine.messages). message 문자열은 처음 읽을 때 렌더링.
+    커스텀 규칙처럼 message 문자열을 직접 넘기면 그대로 사용.
+    """
+    __slots__ = ("rule_id", "rule_name", "severity", "_message", "details", "rule_meta", "template_id", "params")
+
+    def __init__(self, rule_id: str, rule_name: str, severity: Severity, message: Optional[str] = None,
+                 details: Optional[Dict] = None, rule_meta: Optional[Mapping] = None,
+                 template_id: Optional[str] = None, params: Tuple = ()):
+        self.rule_id = rule_id
+        self.rule_name = rule_name
+        self.severity = severity
+        self._message = message
+        self.details = {} if details is None else details
+        self.rule_meta = rule_meta
+        self.template_id = template_id
+        self.params = params
+
+    @property
+    def message(self) -> str:
+        """기본 언어(ko) 메시지 (lazy 렌더링 후 보관)"""
+        if self._message is None:
+            self._message = render_message(self.template_id, self.params) if self.template_id else ""
+        return self._message
+
+    def render_message(self, lang: str = DEFAULT_LANG) -> str:
+        """요청 언어로 메시지 렌더링. 템플릿이 없는 결과는 원문 반환"""
+        if self.template_id is None or lang == DEFAULT_LANG:
+            return self.message
+        return render_message(self.template_id, self.params, lang)
+
+    def all_details(self) -> Dict:
+        """청구 details + 규칙 메타데이터"""
+        if not self.rule_meta:
+            return self.details
+        merged = dict(self.details)
+        merged.update(self.rule_meta)
+        return merged
 
-    def to_dict(self):
+    def to_dict(self, lang: str = DEFAULT_LANG):
         return {
             "rule_id": self.rule_id,
             "rule_name": self.rule_name,
             "severity": self.severity.value,
-            "message": self.message,
-            "details": self.details
+            "message": self.render_message(lang),
+            "details": self.all_details()
         }
 
-@dataclass
+    def _key(self) -> Tuple:
+        return (self.rule_id, self.rule_name, self.severity, self.message, self.details, self.rule_meta)
+
+    def __eq__(self, other):
+        if not isinstance(other, ValidationResult):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __getstate__(self):
+        # 프로세스 간 전송 시 공유 rule_meta(MappingProxyType)는 dict로 복사
+        meta = dict(self.rule_meta) if self.rule_meta is not None else None
+        return (self.rule_id, self.rule_name, self.severity, self._message, self.details,
+                meta, self.template_id, self.params)
+
+    def __setstate__(self, state):
+        (self.rule_id, self.rule_name, self.severity, self._message, self.details,
+         self.rule_meta, self.template_id, self.params) = state
+
+    def __repr__(self):
+        return (f"ValidationResult(rule_id={self.rule_id!r}, rule_name={self.rule_name!r}, "
+                f"severity={self.severity!r}, message={self.message!r}, details={self.details!r})")
+
 class ClaimRecord:
-    """표준화된 청구 레코드"""
-    claim_id: str
-    patient_id: str
-    icd_codes: List[str]
-    ndc_codes: List[str]
-    hcc_codes: List[str] = field(default_factory=list)
-    provider_id: str = ""
-    claim_date: str = ""
-    claim_amount: float = 0.0
+    """
+    표준화된 청구 레코드 (코드 문자열은 intern되어 청구 간 공유).
+    __slots__는 직접 선언 (dataclass(slots=True)는 Python 3.10+ 전용).
+    """
+    __slots__ = ("claim_id", "patient_id", "icd_codes", "ndc_codes", "hcc_codes",
+                 "provider_id", "claim_date", "claim_amount")
+
+    def __init__(self, claim_id: str, patient_id: str, icd_codes: List[str], ndc_codes: List[str],
+                 hcc_codes: Optional[List[str]] = None, provider_id: str = "",
+                 claim_date: str = "", claim_amount: float = 0.0):
+        self.claim_id = claim_id
+        self.patient_id = patient_id
+        self.icd_codes = icd_codes
+        self.ndc_codes = ndc_codes
+        self.hcc_codes = [] if hcc_codes is None else hcc_codes
+        self.provider_id = provider_id
+        self.claim_date = claim_date
+        self.claim_amount = claim_amount
+
+    def _key(self) -> Tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, ClaimRecord):
+            return NotImplemented
+        return self._key() == other._key()
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields_repr = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"ClaimRecord({fields_repr})"
 
     @classmethod
     def from_dict(cls, data: dict) -> 'ClaimRecord':
@@ -59,20 +167,65 @@ class ClaimRecord:
             if isinstance(val, list):
                 return val
             if isinstance(val, str):
-                return [v.strip() for v in val.split(',') if v.strip()]
+                return [intern(v.strip()) for v in val.split(',') if v.strip()]
             return []
 
         return cls(
             claim_id=str(data.get('claim_id', 'UNKNOWN')),
-            patient_id=str(data.get('patient_id', 'UNKNOWN')),
+            patient_id=intern(str(data.get('patient_id', 'UNKNOWN'))),
             icd_codes=to_list(icd_raw),
             ndc_codes=to_list(ndc_raw),
             hcc_codes=to_list(hcc_raw),
-            provider_id=str(data.get('provider_id', '')),
-            claim_date=str(data.get('claim_date', '')),
+            provider_id=intern(str(data.get('provider_id', ''))),
+            claim_date=intern(str(data.get('claim_date', ''))),
             claim_amount=float(data.get('claim_amount', 0.0))
         )
 
+    def to_dict(self) -> Dict:
+        """필드 dict (from_dict 입력 형식, 코드 목록은 사본)"""
+        return {
+            "claim_id": self.claim_id,
+            "patient_id": self.patient_id,
+            "icd_codes": list(self.icd_codes),
+            "ndc_codes": list(self.ndc_codes),
+            "hcc_codes": list(self.hcc_codes),
+            "provider_id": self.provider_id,
+            "claim_date": self.claim_date,
+            "claim_amount": self.claim_amount,
+        }
+
+def claim_signature(claim: ClaimRecord) -> Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]:
+    """
+    내장 규칙 결과를 결정하는 코드 시그니처.
+    메시지에 원본 코드가 그대로 들어가므로 코드 순서와 표기를 보존.
+    """
+    return (tuple(claim.icd_codes), tuple(claim.ndc_codes), tuple(claim.hcc_codes))
+
+def claim_day(claim: ClaimRecord) -> Optional[int]:
+    """claim_date(YYYY-MM-DD...) → 일 단위 ordinal. 파싱 실패 시 None"""
+    try:
+        return date.fromisoformat(claim.claim_date[:10]).toordinal()
+    except ValueError:
+        return None
+
+# 캐시된 결과 재사용 시 현재 청구 값으로 다시 바인딩할 details 키 → ClaimRecord 속성
+CLAIM_BOUND_DETAIL_KEYS = {
+    "claim_id": "claim_id",
+    "icd_codes": "icd_codes",
+    "ndc_codes": "ndc_codes",
+    "actual_icds": "icd_codes",
+}
+
+# triage 모드 규칙 단위 → 검사 메서드 (full 모드 실행 순서)
+BUILTIN_UNITS = {
+    "icd_ndc_mapping": "_check_icd_ndc_mapping",
+    "icd_conflicts": "_check_icd_conflicts",
+    "glp1": "_check_glp1_rules",
+    "hcc_upcoding": "_check_hcc_upcoding",
+    "declarative": "_check_declarative_rules",
+}
+CUSTOM_UNIT_PREFIX = "custom:"
+
 # ============================================================
 # ICD-NDC 매핑 테이블 (확장 가능)
 # ============================================================
@@ -196,152 +349,557 @@ HCC_HIGH_RISK_MAPPINGS = {
     },
 }
 
+# ============================================================
+# 선언형 커스텀 규칙 (확장 가능)
+# ============================================================
+# 조건 키: {field}_any (해당 코드 중 하나라도 prefix로 시작) / {field}_none (어떤 코드도 시작하지 않음),
+# field는 DECLARATIVE_FIELDS 중 하나. 지정된 조건을 모두 만족하면 finding. _any 조건이 하나 이상 필요.
+# 예: {"rule_id": "CUSTOM-001", "name": "Insulin without Diabetes", "severity": "WARNING",
+#      "message": "인슐린 처방에 당뇨 진단이 없습니다.",
+#      "ndc_any": ["00088-2500"], "icd_none": ["E10", "E11"]}
+DECLARATIVE_RULES: List[Dict] = []
+DECLARATIVE_FIELDS = ("icd", "ndc", "hcc")
+
+# ============================================================
+# Prefix 인덱스 그룹 태그
+# ============================================================
+# NDC 인덱스: 매핑 검증은 ICD 카테고리 문자열(예: "E11") 자체를 그룹으로 사용
+GLP1_DRUG_GROUP = ("GLP1", "drug")
+GLP1_INDICATION_GROUP = ("GLP1", "indication")
+TYPE1_DIABETES_GROUP = ("E10", "type1")
+# 충돌 규칙 역인덱스: ICD prefix → (CONFLICT_SIDE_A|B, 규칙 순번)
+CONFLICT_SIDE_A = "conflict_a"
+CONFLICT_SIDE_B = "conflict_b"
+
+# ============================================================
+# 엔진 규칙 상태 스냅샷
+# ============================================================
+@dataclass(frozen=True)
+class EngineState:
+    """
+    검증 1회가 처음부터 끝까지 사용하는 규칙 상태 (불변).
+    규칙 변경은 새 스냅샷을 만들어 참조를 한 번에 교체하므로 검증 스레드는 잠금 없이 읽기만 함.
+    """
+    ruleset: 'RuleSet'
+    custom_rules: Tuple[Callable, ...] = ()
+
 # ============================================================
 # 메인 규칙 엔진 클래스
 # ============================================================
 class RxHCCRuleEngine:
-    """ 중앙 규칙 엔진. 모든 검증 로직을 실행하고 결과를 반환. """
-    def __init__(self, custom_mappings: Dict = None, custom_conflicts: List = None):
-        self.icd_ndc_mappings = custom_mappings or ICD_NDC_VALID_MAPPINGS
-        self.conflict_rules = custom_conflicts or ICD_CONFLICT_RULES
-        self._custom_rules: List[Callable] = []
-        logger.info("RxHCC Rule Engine initialized with %d ICD mappings, %d conflict rules", len(self.icd_ndc_mappings), len(self.conflict_rules))
+    """
+    중앙 규칙 엔진. 모든 검증 로직을 실행하고 결과를 반환.
+    규칙 상태는 EngineState 스냅샷으로 보관하여 여러 스레드가 하나의 엔진을 공유해 validate()를 동시에 호출 가능.
+    규칙 변경(swap_ruleset, add_custom_rule 등)끼리만 _write_lock으로 직렬화.
+    """
+    def __init__(self, custom_mappings: Dict = None, custom_conflicts: List = None, cache_size: int = 0,
+                 ruleset: 'RuleSet' = None):
+        from engine.ruleset import RuleSet
+        if ruleset is None:
+            ruleset = RuleSet.from_tables(
+                icd_ndc_mappings=custom_mappings or ICD_NDC_VALID_MAPPINGS,
+                conflict_rules=custom_conflicts or ICD_CONFLICT_RULES,
+            )
+        self._state = EngineState(ruleset)
+        self._write_lock = threading.Lock()
+        self._cache: Optional[SignatureCache] = SignatureCache(cache_size) if cache_size > 0 else None
+        self._triage: Optional[TriageScheduler] = None
+        self._profiler: Optional[RuleProfiler] = None
+        self._codegen: Optional['RuleCompiler'] = None
+        self.last_batch_plan = None
+        logger.info("RxHCC Rule Engine initialized with %d ICD mappings, %d conflict rules (ruleset %s)",
+                    len(ruleset.mappings), len(ruleset.conflicts), ruleset.version)
+
+    # --- 규칙 세트 ---
+    @property
+    def state(self) -> EngineState:
+        """현재 규칙 상태 스냅샷"""
+        return self._state
+
+    @property
+    def ruleset(self) -> 'RuleSet':
+        """현재 규칙 세트 스냅샷"""
+        return self._state.ruleset
+
+    @property
+    def rules_version(self) -> str:
+        """규칙 테이블 내용 해시 (캐시 키에 포함)"""
+        return self._state.ruleset.version
+
+    @property
+    def icd_ndc_mappings(self) -> Dict:
+        """현재 규칙 세트의 ICD-NDC 매핑 (원본 dict 형식 사본)"""
+        return self._state.ruleset.raw_mappings()
+
+    @property
+    def conflict_rules(self) -> List[Dict]:
+        """현재 규칙 세트의 충돌 규칙 (원본 dict 형식 사본)"""
+        return self._state.ruleset.raw_conflicts()
+
+    def swap_ruleset(self, ruleset: 'RuleSet'):
+        """
+        새 규칙 세트로 원자적 교체 (재시작 불필요).
+        검증 중인 청구는 시작 시점의 스냅샷으로 끝까지 실행되고, 캐시는 버전 키로 자연 분리됨.
+        """
+        with self._write_lock:
+            previous = self._state.ruleset
+            self._state = replace(self._state, ruleset=ruleset)
+        logger.info("RuleSet swapped: %s -> %s", previous.version, ruleset.version)
+
+    def load_rules(self, path: str) -> 'RuleSet':
+        """외부 JSON/YAML 규칙 파일을 로드하여 swap"""
+        from engine.ruleset import RuleSet
+        ruleset = RuleSet.from_file(path)
+        self.swap_ruleset(ruleset)
+        return ruleset
+
+    def enable_cache(self, maxsize: int = 4096):
+        """시그니처 단위 결과 캐시 활성화 (opt-in)"""
+        self._cache = SignatureCache(maxsize)
+
+    def disable_cache(self):
+        self._cache = None
+
+    def cache_stats(self) -> Optional[Dict]:
+        """캐시 hit/miss/eviction 통계. 캐시 비활성화 시 None"""
+        cache = self._cache
+        return cache.stats() if cache is not None else None
+
+    def enable_profiling(self, sample_size: int = 1024):
+        """
+        규칙 단위 계측 활성화 (opt-in).
+        시그니처 캐시/배치 dedup으로 재사용된 결과는 실제 실행이 아니므로 집계되지 않음.
+        """
+        self._profiler = RuleProfiler(sample_size)
+
+    def disable_profiling(self):
+        self._profiler = None
+
+    def profile_snapshot(self) -> Optional[Dict]:
+        """규칙 단위별 호출/hit/예외/지연 시간 통계. 프로파일링 비활성화 시 None"""
+        profiler = self._profiler
+        return profiler.snapshot() if profiler is not None else None
+
+    def profile_prometheus(self) -> str:
+        """Prometheus text format 통계. 프로파일링 비활성화 시 빈 문자열"""
+        profiler = self._profiler
+        return profiler.to_prometheus() if profiler is not None else ""
+
+    def enable_codegen(self, cache_dir: str = None):
+        """
+        규칙 세트 특화 검증 함수 사용 (opt-in, engine.codegen).
+        생성 소스는 규칙 세트 버전별로 cache_dir(기본: RXHCC_CODEGEN_DIR 또는 ~/.cache/rxhcc/codegen)에 캐시.
+        프로파일링/triage 모드는 규칙 단위 실행이 필요하므로 기존 경로 사용.
+        """
+        from engine.codegen import RuleCompiler
+        compiler = RuleCompiler(cache_dir)
+        compiler.function(self._state.ruleset)
+        self._codegen = compiler
+
+    def disable_codegen(self):
+        self._codegen = None
+
+    @staticmethod
+    def _icd_groups(claim: ClaimRecord, rs: 'RuleSet') -> frozenset:
+        """청구의 모든 ICD 코드가 속한 규칙 그룹 합집합"""
+        groups = frozenset()
+        for icd in claim.icd_codes:
+            groups |= rs.icd_index.match(icd)
+        return groups
 
     def add_custom_rule(self, rule_fn: Callable):
-        """커스텀 규칙 함수 등록. rule_fn(claim: ClaimRecord) -> Optional[ValidationResult]"""
-        self._custom_rules.append(rule_fn)
+        """
+        커스텀 규칙 등록.
+        rule_fn(claim: ClaimRecord) -> Optional[ValidationResult] callable은 청구 단위로 실행 (slow path).
+        청구를 관측해 상태를 쌓는 규칙은 stateful = True 속성을 두면 triage 모드에서도 항상 실행.
+        선언형 규칙(dict 또는 engine.ruleset.DeclarativeRule)은 add_declarative_rule()로 위임.
+        """
+        if not callable(rule_fn):
+            self.add_declarative_rule(rule_fn)
+            return
+        with self._write_lock:
+            state = self._state
+            self._state = replace(state, custom_rules=state.custom_rules + (rule_fn,))
+            if self._triage is not None:
+                self._triage.add_unit(f"{CUSTOM_UNIT_PREFIX}{len(state.custom_rules)}")
+
+    def add_declarative_rule(self, rule: Union[Dict, 'DeclarativeRule']) -> 'RuleSet':
+        """
+        선언형 규칙을 규칙 세트에 추가하고 swap.
+        내장 규칙과 같은 prefix 인덱스/시그니처 캐시/배치 dedup/컬럼 경로로 실행되고, 규칙 파일로 저장/로드 가능.
+        """
+        with self._write_lock:
+            previous = self._state.ruleset
+            ruleset = previous.with_declarative_rules([rule])
+            self._state = replace(self._state, ruleset=ruleset)
+        logger.info("RuleSet swapped: %s -> %s", previous.version, ruleset.version)
+        return ruleset
+
+    @property
+    def custom_rules(self) -> Tuple[Callable, ...]:
+        """등록된 커스텀 규칙 callable (현재 스냅샷)"""
+        return self._state.custom_rules
+
+    @property
+    def has_custom_rules(self) -> bool:
+        return bool(self._state.custom_rules)
+
+    def validate(self, claim: ClaimRecord, mode: str = "full") -> List[ValidationResult]:
+        """
+        모든 규칙을 실행하여 검증 결과 리스트 반환.
+        mode="triage": 첫 CRITICAL 발견 시 중단 (실시간 사전 심사용, 적응형 규칙 순서)
+        """
+        state = self._state
+        if mode == "full":
+            return self._finalize(claim, self._run_builtin_checks(claim, state.ruleset), state)
+        if mode == "triage":
+            return self._validate_triage(claim, state)
+        raise ValueError(f"Unknown validation mode: {mode}")
+
+    def _finalize(self, claim: ClaimRecord, results: List[ValidationResult], state: EngineState) -> List[ValidationResult]:
+        """내장 규칙 결과에 커스텀 규칙 결과를 더하고, 결과가 없으면 PASS 추가"""
+        # 6) 커스텀 규칙 callable 실행 (청구 전체 필드에 의존하므로 캐시하지 않음)
+        for k, rule_fn in enumerate(state.custom_rules):
+            result = self._run_custom_rule(k, rule_fn, claim)
+            if result:
+                results.append(result)
+
+        # 결과 없으면 PASS
+        if not results:
+            results.append(self._pass_result(claim))
+
+        return results
+
+    def _run_custom_rule(self, k: int, rule_fn: Callable, claim: ClaimRecord) -> Optional[ValidationResult]:
+        """k번째 커스텀 규칙 실행. 예외는 로그 후 무시 (프로파일링 시 예외 수 집계)"""
+        profiler = self._profiler
+        if profiler is None:
+            try:
+                return rule_fn(claim)
+            except Exception as e:
+                logger.error("Custom rule error: %s", e)
+                return None
+
+        unit = f"{CUSTOM_UNIT_PREFIX}{k}"
+        start = perf_counter_ns()
+        try:
+            result = rule_fn(claim)
+        except Exception as e:
+            profiler.record_exception(unit, perf_counter_ns() - start)
+            logger.error("Custom rule error: %s", e)
+            return None
+        profiler.record(unit, perf_counter_ns() - start, 1 if result else 0)
+        return result
+
+    def _run_check(self, unit: str, claim: ClaimRecord, rs: 'RuleSet') -> List[ValidationResult]:
+        """내장 규칙군 1개 실행 (프로파일링 시 계측)"""
+        check = getattr(self, BUILTIN_UNITS[unit])
+        profiler = self._profiler
+        if profiler is None:
+            return check(claim, rs)
+        start = perf_counter_ns()
+        try:
+            results = check(claim, rs)
+        except Exception:
+            profiler.record_exception(unit, perf_counter_ns() - start)
+            raise
+        profiler.record(unit, perf_counter_ns() - start, len(results))
+        return results
+
+    @staticmethod
+    def _pass_result(claim: ClaimRecord) -> ValidationResult:
+        return ValidationResult(
+            rule_id="PASS-000",
+            rule_name="All Checks Passed",
+            severity=Severity.PASS,
+            details={"claim_id": claim.claim_id},
+            template_id="PASS-000",
+            params=(claim.claim_id,)
+        )
+
+    # --- Triage 모드 ---
+    def _triage_scheduler(self) -> TriageScheduler:
+        scheduler = self._triage
+        if scheduler is None:
+            with self._write_lock:
+                if self._triage is None:
+                    units = list(BUILTIN_UNITS) + [
+                        f"{CUSTOM_UNIT_PREFIX}{k}" for k in range(len(self._state.custom_rules))
+                    ]
+                    self._triage = TriageScheduler(units)
+                scheduler = self._triage
+        return scheduler
+
+    @staticmethod
+    def _is_stateful_unit(unit: str, state: EngineState) -> bool:
+        """청구를 관측하여 내부 상태를 갱신하는 커스텀 규칙 (rule_fn.stateful)"""
+        if unit in BUILTIN_UNITS:
+            return False
+        k = int(unit[len(CUSTOM_UNIT_PREFIX):])
+        return k < len(state.custom_rules) and getattr(state.custom_rules[k], "stateful", False)
+
+    def _run_unit(self, unit: str, claim: ClaimRecord, state: EngineState) -> List[ValidationResult]:
+        """규칙 단위(내장 규칙군 또는 커스텀 규칙 1개) 실행"""
+        if unit in BUILTIN_UNITS:
+            return self._run_check(unit, claim, state.ruleset)
+        k = int(unit[len(CUSTOM_UNIT_PREFIX):])
+        if k >= len(state.custom_rules):
+            return [] # 이 스냅샷 이후에 등록된 규칙
+        result = self._run_custom_rule(k, state.custom_rules[k], claim)
+        return [result] if result else []
+
+    # --- 규칙 단위 fan-out (LangGraph branch) ---
+    def rule_units(self, state: EngineState = None) -> List[str]:
+        """full 모드 결과 순서의 규칙 단위 (내장 규칙군 → 커스텀 규칙)"""
+        state = state or self._state
+        return list(BUILTIN_UNITS) + [f"{CUSTOM_UNIT_PREFIX}{k}" for k in range(len(state.custom_rules))]
+
+    def relevant_units(self, claim: ClaimRecord, state: EngineState = None) -> List[str]:
+        """
+        청구 코드 구성상 결과가 나올 수 없는 내장 규칙군을 뺀 규칙 단위 (full 모드 순서).
+        커스텀 규칙은 청구 전체 필드에 의존하므로 항상 포함.
+        """
+        state = state or self._state
+        icd, ndc, hcc = bool(claim.icd_codes), bool(claim.ndc_codes), bool(claim.hcc_codes)
+        relevant = {
+            "icd_ndc_mapping": icd and ndc,
+            "icd_conflicts": icd,
+            "glp1": ndc,
+            "hcc_upcoding": hcc,
+            "declarative": bool(state.ruleset.declarative) and (icd or ndc or hcc),
+        }
+        return [u for u in self.rule_units(state) if relevant.get(u, True)]
+
+    def is_fast_path(self, claim: ClaimRecord, state: EngineState = None) -> bool:
+        """
+        규칙 어휘(RuleSet.vocabulary)에 걸리는 코드가 없어 결과가 PASS뿐인 청구인지 여부.
+        커스텀 규칙은 임의 필드를 보므로 하나라도 등록돼 있으면 항상 False.
+        """
+        state = state or self._state
+        if state.custom_rules:
+            return False
+        return not state.ruleset.vocabulary.is_relevant(claim.icd_codes, claim.ndc_codes, claim.hcc_codes)
+
+    def run_unit(self, unit: str, claim: ClaimRecord, state: EngineState = None) -> List[ValidationResult]:
+        """규칙 단위 1개 실행 (PASS 미포함). 여러 단위를 나눠 실행할 때는 같은 state 스냅샷을 전달"""
+        return self._run_unit(unit, claim, state or self._state)
+
+    def _validate_triage(self, claim: ClaimRecord, state: EngineState) -> List[ValidationResult]:
+        """
+        관측된 CRITICAL 발생률/비용 순서로 규칙 단위를 실행하고 첫 CRITICAL에서 중단.
+        단, 상태를 갖는 커스텀 규칙(stateful=True: 중복 탐지, 종단 규칙 등)은 중단 후에도 실행하여
+        full 모드와 같은 청구 스트림을 관측 (결과도 포함).
+        반환 결과는 full 모드와 같은 규칙 순서로 정렬 (중단 시 나머지 규칙 결과는 없음).
+        """
+        scheduler = self._triage_scheduler()
+        found = []
+        stopped = False
+        for unit in scheduler.order():
+            if stopped and not self._is_stateful_unit(unit, state):
+                continue
+            start = perf_counter_ns()
+            results = self._run_unit(unit, claim, state)
+            critical = any(r.severity == Severity.CRITICAL for r in results)
+            scheduler.record(unit, perf_counter_ns() - start, critical)
+            if results:
+                found.append((scheduler.units.index(unit), results))
+            stopped = stopped or critical
+        scheduler.finish_claim()
+
+        found.sort(key=lambda item: item[0])
+        results = [r for _, unit_results in found for r in unit_results]
+        return results or [self._pass_result(claim)]
+
+    def triage_stats(self) -> Optional[Dict]:
+        """triage 모드 규칙 단위별 호출/CRITICAL/평균 비용 통계. triage 미사용 시 None"""
+        triage = self._triage
+        return triage.stats() if triage is not None else None
+
+    def _run_builtin_checks(self, claim: ClaimRecord, rs: 'RuleSet') -> List[ValidationResult]:
+        """내장 규칙 1~4 실행. 캐시가 켜져 있으면 시그니처 단위로 재사용."""
+        if self._cache is None:
+            return self._evaluate_builtin(claim, rs)
+
+        return [self._rebind(r, bound_keys, claim) for r, bound_keys in self._builtin_templates(claim, rs)]
+
+    def _builtin_templates(self, claim: ClaimRecord, rs: 'RuleSet') -> Tuple:
+        """
+        시그니처 단위로 재사용 가능한 내장 규칙 결과.
+        (결과, 재바인딩할 details 키) 튜플의 튜플. 캐시가 켜져 있으면 캐시 경유.
+        """
+        # disable_cache()가 동시에 호출되어도 이번 호출은 처음 읽은 캐시 객체를 끝까지 사용
+        cache = self._cache
+        key = None
+        if cache is not None:
+            key = (rs.version, claim_signature(claim))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        templates = tuple(
+            (r, tuple(k for k in CLAIM_BOUND_DETAIL_KEYS if k in r.details))
+            for r in self._evaluate_builtin(claim, rs)
+        )
+        if cache is not None:
+            cache.put(key, templates)
+        return templates
+
+    def _evaluate_builtin(self, claim: ClaimRecord, rs: 'RuleSet') -> List[ValidationResult]:
+        if self._profiler is not None:
+            return [r for unit in BUILTIN_UNITS for r in self._run_check(unit, claim, rs)]
+        codegen = self._codegen
+        if codegen is not None:
+            return codegen.function(rs)(claim)
 
-    def validate(self, claim: ClaimRecord) -> List[ValidationResult]:
-        """모든 규칙을 실행하여 검증 결과 리스트 반환"""
         results = []
         
         # 1) ICD-NDC 매핑 검증
-        results.extend(self._check_icd_ndc_mapping(claim))
+        results.extend(self._check_icd_ndc_mapping(claim, rs))
         
         # 2) ICD 충돌 검증
-        results.extend(self._check_icd_conflicts(claim))
+        results.extend(self._check_icd_conflicts(claim, rs))
         
         # 3) GLP-1 특별 검증
-        results.extend(self._check_glp1_rules(claim))
+        results.extend(self._check_glp1_rules(claim, rs))
         
         # 4) HCC Upcoding 검증
-        results.extend(self._check_hcc_upcoding(claim))
-        
-        # 5) 커스텀 규칙 실행
-        for rule_fn in self._custom_rules:
-            try:
-                result = rule_fn(claim)
-                if result:
-                    results.append(result)
-            except Exception as e:
-                logger.error("Custom rule error: %s", e)
-
-        # 결과 없으면 PASS
-        if not results:
-            results.append(ValidationResult(
-                rule_id="PASS-000",
-                rule_name="All Checks Passed",
-                severity=Severity.PASS,
-                message=f"Claim {claim.claim_id}: 모든 검증을 통과했습니다.",
-                details={"claim_id": claim.claim_id}
-            ))
+        results.extend(self._check_hcc_upcoding(claim, rs))
 
+        # 5) 선언형 커스텀 규칙
+        results.extend(self._check_declarative_rules(claim, rs))
         return results
 
+    @staticmethod
+    def _rebind(result: ValidationResult, bound_keys: Tuple[str, ...], claim: ClaimRecord) -> ValidationResult:
+        """캐시된 결과를 복사하고 청구 고유 필드(claim_id, 코드 리스트)를 현재 청구로 교체"""
+        details = dict(result.details)
+        for key in bound_keys:
+            details[key] = getattr(claim, CLAIM_BOUND_DETAIL_KEYS[key])
+        return ValidationResult(result.rule_id, result.rule_name, result.severity, result._message, details,
+                                result.rule_meta, result.template_id, result.params)
+
     def validate_batch(self, claims: List[ClaimRecord]) -> Dict[str, List[ValidationResult]]:
         """배치 검증"""
-        return {claim.claim_id: self.validate(claim) for claim in claims}
+        return {claim.claim_id: results for claim, results in zip(claims, self.validate_many(claims))}
+
+    def validate_many(self, claims: List[ClaimRecord], plan: 'BatchPlan' = None) -> List[List[ValidationResult]]:
+        """
+        입력 순서대로 청구별 검증 결과 반환.
+        코드 시그니처로 factorize하여 고유 조합당 내장 규칙을 한 번만 실행하고 모든 청구로 broadcast.
+        실행 계획(dedup ratio 포함)은 self.last_batch_plan에 기록 (여러 스레드가 공유하면 마지막 배치 기준).
+        """
+        from engine.batch import plan_batch
+        if plan is None:
+            plan = plan_batch(claims)
+        self.last_batch_plan = plan
+        logger.info("Batch plan: %d claims, %d unique signatures (dedup ratio %.2f)",
+                    plan.n_claims, plan.n_unique, plan.dedup_ratio)
+
+        state = self._state
+        templates = [self._builtin_templates(claims[i], state.ruleset) for i in plan.representatives]
+        return [
+            self._finalize(claim, [self._rebind(r, bound_keys, claim) for r, bound_keys in templates[sig]], state)
+            for claim, sig in zip(claims, plan.inverse)
+        ]
+
+    def validate_columnar(self, df, encoded: 'EncodedClaims' = None) -> 'ColumnarResult':
+        """
+        DataFrame 전체를 컬럼 단위(NumPy/pandas 벡터 연산)로 검증.
+        validate()와 동일한 결과를 청구별 최고 심각도, 플래그 비트, long-format findings 테이블로 반환.
+        encoded: engine.vocab.EncodedClaims.from_dataframe(df) 결과 (재사용 시)
+        """
+        from engine.columnar import validate_columnar
+        return validate_columnar(self, df, encoded=encoded)
 
     # --- 내부 검증 메서드 ---
-    def _check_icd_ndc_mapping(self, claim: ClaimRecord) -> List[ValidationResult]:
+    def _check_icd_ndc_mapping(self, claim: ClaimRecord, rs: 'RuleSet' = None) -> List[ValidationResult]:
+        rs = rs or self._state.ruleset
         results = []
+        ndc_groups = None
         for icd in claim.icd_codes:
             icd_prefix = self._get_icd_prefix(icd)
-            if icd_prefix not in self.icd_ndc_mappings:
+            mapping = rs.mappings.get(icd_prefix)
+            if mapping is None:
                 continue # 매핑 테이블에 없는 ICD는 스킵
             
-            valid_ndcs = self.icd_ndc_mappings[icd_prefix]["valid_ndc_prefixes"]
-            desc = self.icd_ndc_mappings[icd_prefix]["description"]
+            if ndc_groups is None:
+                # NDC별 허용 ICD 카테고리는 청구당 한 번만 조회
+                ndc_groups = [rs.ndc_index.match(ndc.strip()) for ndc in claim.ndc_codes]
             
-            for ndc in claim.ndc_codes:
-                ndc_clean = ndc.strip()
-                is_valid = any(ndc_clean.startswith(v) for v in valid_ndcs)
+            for ndc, valid_for in zip(claim.ndc_codes, ndc_groups):
+                is_valid = icd_prefix in valid_for
                 if not is_valid:
                     results.append(ValidationResult(
                         rule_id="NDC-MISMATCH-001",
                         rule_name="ICD-NDC Mapping Mismatch",
                         severity=Severity.WARNING,
-                        message=f"진단 {icd} ({desc})에 대해 약물 {ndc}이(가) 허용 목록에 없습니다.",
                         details={
                             "icd_code": icd,
                             "ndc_code": ndc,
-                            "expected_ndc_prefixes": valid_ndcs,
-                            "diagnosis_description": desc
-                        }
+                        },
+                        rule_meta=mapping.meta,
+                        template_id="NDC-MISMATCH-001",
+                        params=(icd, mapping.description, ndc)
                     ))
         return results
 
-    def _check_icd_conflicts(self, claim: ClaimRecord) -> List[ValidationResult]:
+    def _check_icd_conflicts(self, claim: ClaimRecord, rs: 'RuleSet' = None) -> List[ValidationResult]:
+        rs = rs or self._state.ruleset
         results = []
-        for rule in self.conflict_rules:
-            has_a = any(
-                any(icd.startswith(code) for code in rule["codes_a"]) 
-                for icd in claim.icd_codes
-            )
-            has_b = any(
-                any(icd.startswith(code) for code in rule["codes_b"])
-                for icd in claim.icd_codes
-            )
-            
-            if has_a and has_b:
-                results.append(ValidationResult(
-                    rule_id=rule["rule_id"],
-                    rule_name=rule["name"],
-                    severity=rule["severity"],
-                    message=rule["message"],
-                    details={
-                        "icd_codes": claim.icd_codes,
-                        "conflicting_groups": [rule["codes_a"], rule["codes_b"]]
-                    }
-                ))
+        side_a, side_b = set(), set()
+        for icd in claim.icd_codes:
+            for side, k in rs.conflict_index.match(icd):
+                (side_a if side == CONFLICT_SIDE_A else side_b).add(k)
+        
+        # 양쪽 그룹이 모두 매칭된 후보 규칙만 테이블 순서대로 평가
+        for k in sorted(side_a & side_b):
+            rule = rs.conflicts[k]
+            results.append(ValidationResult(
+                rule_id=rule.rule_id,
+                rule_name=rule.name,
+                severity=rule.severity,
+                message=None if rule.template_id else rule.message,
+                details={"icd_codes": claim.icd_codes},
+                rule_meta=rule.meta,
+                template_id=rule.template_id
+            ))
         return results
 
-    def _check_glp1_rules(self, claim: ClaimRecord) -> List[ValidationResult]:
+    def _check_glp1_rules(self, claim: ClaimRecord, rs: 'RuleSet' = None) -> List[ValidationResult]:
+        rs = rs or self._state.ruleset
         results = []
         has_glp1 = any(
-            any(ndc.startswith(prefix) for prefix in GLP1_NDC_PREFIXES)
+            rs.ndc_index.matches(ndc, GLP1_DRUG_GROUP)
             for ndc in claim.ndc_codes
         )
         
         if not has_glp1:
             return results
 
-        has_valid_diagnosis = any(
-            any(icd.startswith(prefix) for prefix in GLP1_VALID_ICD_PREFIXES)
-            for icd in claim.icd_codes
-        )
+        icd_groups = self._icd_groups(claim, rs)
+        has_valid_diagnosis = GLP1_INDICATION_GROUP in icd_groups
         
         if not has_valid_diagnosis:
             results.append(ValidationResult(
                 rule_id="GLP1-001",
                 rule_name="GLP-1 Off-Label Use Detection",
                 severity=Severity.CRITICAL,
-                message="GLP-1 약물이 처방되었으나 적응증(E11: 제2형 당뇨, E66: 비만)이 없습니다. 오남용 가능성.",
+                template_id="GLP1-001",
                 details={
                     "ndc_codes": claim.ndc_codes,
                     "icd_codes": claim.icd_codes,
-                    "required_icd_prefixes": GLP1_VALID_ICD_PREFIXES
-                }
+                },
+                rule_meta=rs.glp1_meta
             ))
 
         # E10(1형 당뇨)에 GLP-1 처방 체크
-        has_type1 = any(icd.startswith("E10") for icd in claim.icd_codes)
+        has_type1 = TYPE1_DIABETES_GROUP in icd_groups
         if has_type1:
             results.append(ValidationResult(
                 rule_id="GLP1-002",
                 rule_name="GLP-1 for Type 1 Diabetes",
                 severity=Severity.CRITICAL,
-                message="제1형 당뇨(E10) 환자에게 GLP-1이 처방됨. GLP-1은 제1형 당뇨 적응증이 아닙니다.",
+                template_id="GLP1-002",
                 details={
                     "ndc_codes": claim.ndc_codes,
                     "icd_codes": claim.icd_codes
@@ -350,14 +908,15 @@ class RxHCCRuleEngine:
         
         return results
 
-    def _check_hcc_upcoding(self, claim: ClaimRecord) -> List[ValidationResult]:
+    def _check_hcc_upcoding(self, claim: ClaimRecord, rs: 'RuleSet' = None) -> List[ValidationResult]:
+        rs = rs or self._state.ruleset
         results = []
         for hcc in claim.hcc_codes:
             hcc_upper = hcc.upper()
-            if hcc_upper in HCC_HIGH_RISK_MAPPINGS:
-                mapping = HCC_HIGH_RISK_MAPPINGS[hcc_upper]
+            mapping = rs.hcc.get(hcc_upper)
+            if mapping is not None:
                 has_supporting_icd = any(
-                    icd in mapping["expected_icds"] for icd in claim.icd_codes
+                    icd in mapping.expected_icd_set for icd in claim.icd_codes
                 )
                 
                 if not has_supporting_icd:
@@ -365,17 +924,49 @@ class RxHCCRuleEngine:
                         rule_id="HCC-UPCODE-001",
                         rule_name="Potential HCC Upcoding",
                         severity=Severity.CRITICAL,
-                        message=f"HCC {hcc_upper} ({mapping['description']}) 매핑되었으나 "
-                                f"뒷받침하는 ICD 코드가 부족합니다. Risk Score 영향: {mapping['risk_score_impact']}",
-                        details={
-                            "hcc_code": hcc_upper,
-                            "expected_icds": mapping["expected_icds"],
-                            "actual_icds": claim.icd_codes,
-                            "risk_score_impact": mapping["risk_score_impact"]
-                        }
+                        details={"actual_icds": claim.icd_codes},
+                        rule_meta=mapping.meta,
+                        template_id="HCC-UPCODE-001",
+                        params=(hcc_upper, mapping.description, mapping.risk_score_impact)
                     ))
         return results
 
+    def _check_declarative_rules(self, claim: ClaimRecord, rs: 'RuleSet' = None) -> List[ValidationResult]:
+        rs = rs or self._state.ruleset
+        if not rs.declarative:
+            return []
+        # 필드별 매칭 그룹: (규칙 순번, _any 조건 여부)
+        hits = {}
+        candidates = set()
+        for field_name, codes in (("icd", claim.icd_codes), ("ndc", claim.ndc_codes), ("hcc", claim.hcc_codes)):
+            index = rs.declarative_index[field_name]
+            groups = frozenset()
+            if len(index):
+                for code in codes:
+                    groups |= index.match(code.strip().upper())
+                candidates.update(k for k, is_any in groups if is_any)
+            hits[field_name] = groups
+        if not candidates:
+            return []
+
+        # _any 조건이 하나라도 매칭된 규칙만 테이블 순서대로 평가
+        results = []
+        for k in sorted(candidates):
+            rule = rs.declarative[k]
+            if not all((k, True) in hits[f] for f in rule.any_fields):
+                continue
+            if any((k, False) in hits[f] for f in rule.none_fields):
+                continue
+            results.append(ValidationResult(
+                rule_id=rule.rule_id,
+                rule_name=rule.name,
+                severity=rule.severity,
+                message=rule.message,
+                details={"icd_codes": claim.icd_codes, "ndc_codes": claim.ndc_codes},
+                rule_meta=rule.meta
+            ))
+        return results
+
     @staticmethod
     def _get_icd_prefix(icd_code: str) -> str:
         """ICD 코드에서 카테고리 prefix 추출 (예: E11.65 -> E11)"""
@@ -0,0 +1,459 @@
+"""
+Compiled RuleSet
+================
+engine/rules.py의 매핑/충돌/GLP-1/HCC/선언형 규칙 테이블을 불변 lookup 구조(tuple, frozenset, prefix 인덱스)로 컴파일한 스냅샷.
+내용 해시를 버전으로 가지며, 외부 JSON/YAML 파일에서 로드해 실행 중인 엔진에 원자적으로 교체(swap) 가능.
+"""
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+
+from engine.messages import template_for_text
+from engine.prefix_index import PrefixIndex
+from engine.rules import (
+    RxHCCRuleEngine,
+    Severity,
+    ICD_NDC_VALID_MAPPINGS,
+    ICD_CONFLICT_RULES,
+    GLP1_NDC_PREFIXES,
+    GLP1_VALID_ICD_PREFIXES,
+    HCC_HIGH_RISK_MAPPINGS,
+    DECLARATIVE_RULES,
+    DECLARATIVE_FIELDS,
+    GLP1_DRUG_GROUP,
+    GLP1_INDICATION_GROUP,
+    TYPE1_DIABETES_GROUP,
+    CONFLICT_SIDE_A,
+    CONFLICT_SIDE_B,
+)
+
+logger = logging.getLogger(__name__)
+
+# YAML 지원 (옵션)
+try:
+    import yaml
+    YAML_AVAILABLE = True
+except ImportError:
+    YAML_AVAILABLE = False
+
+# ============================================================
+# 컴파일된 규칙 항목
+# ============================================================
+@dataclass(frozen=True)
+class MappingRule:
+    """ICD 카테고리별 허용 NDC prefix"""
+    icd_prefix: str
+    valid_ndc_prefixes: Tuple[str, ...]
+    description: str
+    meta: Mapping = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        # finding들이 공유하는 규칙 메타데이터 (ValidationResult.rule_meta)
+        object.__setattr__(self, "meta", MappingProxyType({
+            "expected_ndc_prefixes": self.valid_ndc_prefixes,
+            "diagnosis_description": self.description,
+        }))
+
+@dataclass(frozen=True)
+class ConflictRule:
+    """상호 배타적 ICD 진단 규칙"""
+    rule_id: str
+    name: str
+    codes_a: Tuple[str, ...]
+    codes_b: Tuple[str, ...]
+    severity: Severity
+    message: str
+    meta: Mapping = field(init=False, repr=False, compare=False)
+    template_id: Optional[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        _check_rule_id(self.rule_id)
+        object.__setattr__(self, "meta", MappingProxyType({
+            "conflicting_groups": (self.codes_a, self.codes_b),
+        }))
+        # 기본 문구 그대로면 다국어 템플릿 사용, 아니면 규칙 파일 문구를 원문으로 사용
+        object.__setattr__(self, "template_id", template_for_text(self.rule_id, self.message))
+
+@dataclass(frozen=True)
+class HccRule:
+    """HCC별 뒷받침 ICD 목록"""
+    hcc_code: str
+    expected_icds: Tuple[str, ...]
+    expected_icd_set: FrozenSet[str]
+    description: str
+    risk_score_impact: float
+    meta: Mapping = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "meta", MappingProxyType({
+            "hcc_code": self.hcc_code,
+            "expected_icds": self.expected_icds,
+            "risk_score_impact": self.risk_score_impact,
+        }))
+
+@dataclass(frozen=True)
+class DeclarativeRule:
+    """
+    선언형 커스텀 규칙 (rules.DECLARATIVE_RULES 형식).
+    {field}_any / {field}_none prefix 조건을 모두 만족하면 finding. prefix와 코드는 대문자로 비교.
+    """
+    rule_id: str
+    name: str
+    severity: Severity
+    message: str
+    icd_any: Tuple[str, ...] = ()
+    icd_none: Tuple[str, ...] = ()
+    ndc_any: Tuple[str, ...] = ()
+    ndc_none: Tuple[str, ...] = ()
+    hcc_any: Tuple[str, ...] = ()
+    hcc_none: Tuple[str, ...] = ()
+    any_fields: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    none_fields: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    meta: Mapping = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        _check_rule_id(self.rule_id)
+        for name in _CONDITION_KEYS:
+            object.__setattr__(self, name, tuple(p.strip().upper() for p in getattr(self, name)))
+        object.__setattr__(self, "any_fields", tuple(f for f in DECLARATIVE_FIELDS if getattr(self, f"{f}_any")))
+        object.__setattr__(self, "none_fields", tuple(f for f in DECLARATIVE_FIELDS if getattr(self, f"{f}_none")))
+        if not self.any_fields:
+            # _none 조건만 있으면 관련 없는 모든 청구에서 발동 → 인덱스로 후보를 좁힐 수 없음
+            raise ValueError(f"Declarative rule {self.rule_id} needs at least one *_any condition")
+        object.__setattr__(self, "meta", MappingProxyType({"conditions": self.conditions()}))
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DeclarativeRule':
+        unknown = set(data) - {"rule_id", "name", "severity", "message", *_CONDITION_KEYS}
+        if unknown:
+            raise ValueError(f"Unknown declarative rule keys: {sorted(unknown)}")
+        return cls(
+            rule_id=data["rule_id"],
+            name=data.get("name", data["rule_id"]),
+            severity=_to_severity(data.get("severity", Severity.WARNING)),
+            message=data["message"],
+            **{name: tuple(data.get(name) or ()) for name in _CONDITION_KEYS},
+        )
+
+    def conditions(self) -> Dict[str, Tuple[str, ...]]:
+        return {name: getattr(self, name) for name in _CONDITION_KEYS if getattr(self, name)}
+
+    def to_dict(self) -> Dict:
+        data = {"rule_id": self.rule_id, "name": self.name, "severity": self.severity.value, "message": self.message}
+        data.update({name: list(prefixes) for name, prefixes in self.conditions().items()})
+        return data
+
+_CONDITION_KEYS = tuple(f"{f}_{q}" for f in DECLARATIVE_FIELDS for q in ("any", "none"))
+
+_RELEVANT = True # RuleVocabulary 인덱스의 단일 그룹 태그
+
+@dataclass(frozen=True)
+class RuleVocabulary:
+    """
+    내장 규칙이 참조하는 코드 어휘 (fast path 사전 필터).
+    청구의 어떤 코드도 여기에 걸리지 않으면 내장 규칙 결과는 PASS뿐이므로 규칙 실행을 생략할 수 있음.
+    코드는 strip/대문자로 비교 (원본 코드로 비교하는 규칙보다 넓게 잡히는 쪽으로만 오차).
+    """
+    icd_index: PrefixIndex # 충돌 규칙 코드 + 선언형 icd_any
+    icd_categories: FrozenSet[str] # ICD-NDC 매핑 카테고리 (NDC가 하나라도 있으면 결과 발생)
+    ndc_index: PrefixIndex # GLP-1 약물 + 선언형 ndc_any (적응증 ICD는 GLP-1 NDC가 있을 때만 의미)
+    hcc_codes: FrozenSet[str] # HCC 업코딩 대상
+    hcc_index: PrefixIndex # 선언형 hcc_any
+
+    @classmethod
+    def from_ruleset(cls, rs: 'RuleSet') -> 'RuleVocabulary':
+        icd_prefixes = [c for rule in rs.conflicts for c in rule.codes_a + rule.codes_b]
+        icd_prefixes += [p for rule in rs.declarative for p in rule.icd_any]
+        ndc_prefixes = list(rs.glp1_ndc_prefixes) + [p for rule in rs.declarative for p in rule.ndc_any]
+        return cls(
+            icd_index=PrefixIndex.from_groups({_RELEVANT: [p.strip().upper() for p in icd_prefixes]}),
+            icd_categories=frozenset(rs.mappings),
+            ndc_index=PrefixIndex.from_groups({_RELEVANT: [p.strip().upper() for p in ndc_prefixes]}),
+            hcc_codes=frozenset(rs.hcc),
+            hcc_index=PrefixIndex.from_groups({_RELEVANT: [p for rule in rs.declarative for p in rule.hcc_any]}),
+        )
+
+    def is_relevant(self, icd_codes: List[str], ndc_codes: List[str], hcc_codes: List[str]) -> bool:
+        """코드 중 하나라도 내장 규칙 결과를 만들 수 있으면 True"""
+        for ndc in ndc_codes:
+            if self.ndc_index.matches(ndc.strip().upper(), _RELEVANT):
+                return True
+        for icd in icd_codes:
+            code = icd.strip().upper()
+            if self.icd_index.matches(code, _RELEVANT):
+                return True
+            if ndc_codes and RxHCCRuleEngine._get_icd_prefix(code) in self.icd_categories:
+                return True
+        for hcc in hcc_codes:
+            code = hcc.strip().upper()
+            if code in self.hcc_codes or self.hcc_index.matches(code, _RELEVANT):
+                return True
+        return False
+
+# ============================================================
+# RuleSet
+# ============================================================
+@dataclass(frozen=True)
+class RuleSet:
+    """
+    불변 규칙 세트 스냅샷.
+    청구 단위 검증은 이 객체의 컴파일된 구조만 사용하고 원본 dict 형태는 참조하지 않음.
+    """
+    mappings: Mapping[str, MappingRule]
+    conflicts: Tuple[ConflictRule, ...]
+    glp1_ndc_prefixes: Tuple[str, ...]
+    glp1_valid_icd_prefixes: Tuple[str, ...]
+    hcc: Mapping[str, HccRule]
+    declarative: Tuple[DeclarativeRule, ...]
+    version: str
+    ndc_index: PrefixIndex = field(repr=False, compare=False)
+    icd_index: PrefixIndex = field(repr=False, compare=False)
+    conflict_index: PrefixIndex = field(repr=False, compare=False)
+    declarative_index: Mapping[str, PrefixIndex] = field(repr=False, compare=False)
+    source: Optional[str] = field(default=None, compare=False)
+    glp1_meta: Mapping = field(init=False, repr=False, compare=False)
+    vocabulary: RuleVocabulary = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        object.__setattr__(self, "glp1_meta", MappingProxyType({
+            "required_icd_prefixes": self.glp1_valid_icd_prefixes,
+        }))
+        object.__setattr__(self, "vocabulary", RuleVocabulary.from_ruleset(self))
+
+    @classmethod
+    def default(cls) -> 'RuleSet':
+        """engine/rules.py 모듈 테이블로 구성된 기본 규칙 세트"""
+        return cls.from_tables()
+
+    @classmethod
+    def from_tables(cls, icd_ndc_mappings: Dict = None, conflict_rules: List = None,
+                    glp1_ndc_prefixes: List = None, glp1_valid_icd_prefixes: List = None,
+                    hcc_high_risk_mappings: Dict = None, declarative_rules: List = None,
+                    source: str = None) -> 'RuleSet':
+        """원본 dict/list 테이블을 컴파일. 생략된 테이블은 모듈 기본값 사용."""
+        icd_ndc_mappings = ICD_NDC_VALID_MAPPINGS if icd_ndc_mappings is None else icd_ndc_mappings
+        conflict_rules = ICD_CONFLICT_RULES if conflict_rules is None else conflict_rules
+        glp1_ndc_prefixes = GLP1_NDC_PREFIXES if glp1_ndc_prefixes is None else glp1_ndc_prefixes
+        glp1_valid_icd_prefixes = GLP1_VALID_ICD_PREFIXES if glp1_valid_icd_prefixes is None else glp1_valid_icd_prefixes
+        hcc_high_risk_mappings = HCC_HIGH_RISK_MAPPINGS if hcc_high_risk_mappings is None else hcc_high_risk_mappings
+        declarative_rules = DECLARATIVE_RULES if declarative_rules is None else declarative_rules
+
+        mappings = {
+            icd_prefix: MappingRule(
+                icd_prefix=icd_prefix,
+                valid_ndc_prefixes=tuple(m["valid_ndc_prefixes"]),
+                description=m["description"],
+            )
+            for icd_prefix, m in icd_ndc_mappings.items()
+        }
+        conflicts = tuple(
+            ConflictRule(
+                rule_id=r["rule_id"],
+                name=r["name"],
+                codes_a=tuple(r["codes_a"]),
+                codes_b=tuple(r["codes_b"]),
+                severity=_to_severity(r["severity"]),
+                message=r["message"],
+            )
+            for r in conflict_rules
+        )
+        hcc = {
+            hcc_code: HccRule(
+                hcc_code=hcc_code,
+                expected_icds=tuple(m["expected_icds"]),
+                expected_icd_set=frozenset(m["expected_icds"]),
+                description=m["description"],
+                risk_score_impact=m["risk_score_impact"],
+            )
+            for hcc_code, m in hcc_high_risk_mappings.items()
+        }
+        declarative = tuple(
+            r if isinstance(r, DeclarativeRule) else DeclarativeRule.from_dict(r)
+            for r in declarative_rules
+        )
+        glp1_ndc_prefixes = tuple(glp1_ndc_prefixes)
+        glp1_valid_icd_prefixes = tuple(glp1_valid_icd_prefixes)
+
+        # NDC 인덱스: 매핑 검증은 ICD 카테고리 문자열을, GLP-1은 GLP1_DRUG_GROUP을 그룹으로 사용
+        ndc_groups = {p: m.valid_ndc_prefixes for p, m in mappings.items()}
+        ndc_groups[GLP1_DRUG_GROUP] = glp1_ndc_prefixes
+        icd_index = PrefixIndex.from_groups({
+            GLP1_INDICATION_GROUP: glp1_valid_icd_prefixes,
+            TYPE1_DIABETES_GROUP: ("E10",),
+        })
+        # 청구의 ICD 코드가 건드릴 수 있는 충돌 규칙만 평가하기 위한 역인덱스
+        conflict_groups = {}
+        for k, rule in enumerate(conflicts):
+            conflict_groups[(CONFLICT_SIDE_A, k)] = rule.codes_a
+            conflict_groups[(CONFLICT_SIDE_B, k)] = rule.codes_b
+        # 선언형 규칙: 필드별 prefix → (규칙 순번, _any 조건 여부)
+        declarative_index = {f: PrefixIndex() for f in DECLARATIVE_FIELDS}
+        for k, rule in enumerate(declarative):
+            for f in DECLARATIVE_FIELDS:
+                for prefix in getattr(rule, f"{f}_any"):
+                    declarative_index[f].add(prefix, (k, True))
+                for prefix in getattr(rule, f"{f}_none"):
+                    declarative_index[f].add(prefix, (k, False))
+
+        ruleset = cls(
+            mappings=MappingProxyType(mappings),
+            conflicts=conflicts,
+            glp1_ndc_prefixes=glp1_ndc_prefixes,
+            glp1_valid_icd_prefixes=glp1_valid_icd_prefixes,
+            hcc=MappingProxyType(hcc),
+            declarative=declarative,
+            version="",
+            ndc_index=PrefixIndex.from_groups(ndc_groups),
+            icd_index=icd_index,
+            conflict_index=PrefixIndex.from_groups(conflict_groups),
+            declarative_index=MappingProxyType(declarative_index),
+            source=source,
+        )
+        payload = json.dumps(ruleset.to_dict(), sort_keys=True, ensure_ascii=False)
+        object.__setattr__(ruleset, "version", hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16])
+        return ruleset
+
+    @classmethod
+    def from_dict(cls, data: Dict, source: str = None) -> 'RuleSet':
+        """to_dict() 형식(JSON/YAML 호환)에서 컴파일"""
+        return cls.from_tables(
+            icd_ndc_mappings=data.get("icd_ndc_mappings"),
+            conflict_rules=data.get("conflict_rules"),
+            glp1_ndc_prefixes=data.get("glp1_ndc_prefixes"),
+            glp1_valid_icd_prefixes=data.get("glp1_valid_icd_prefixes"),
+            hcc_high_risk_mappings=data.get("hcc_high_risk_mappings"),
+            declarative_rules=data.get("declarative_rules"),
+            source=source,
+        )
+
+    @classmethod
+    def from_file(cls, path: str) -> 'RuleSet':
+        """외부 규칙 파일(.json, .yaml/.yml) 로드"""
+        with open(path, encoding="utf-8") as f:
+            if _is_yaml(path):
+                if not YAML_AVAILABLE:
+                    raise ImportError("PyYAML is required to load YAML rule files")
+                data = yaml.safe_load(f)
+            else:
+                data = json.load(f)
+        ruleset = cls.from_dict(data or {}, source=os.path.abspath(path))
+        logger.info("RuleSet %s loaded from %s", ruleset.version, path)
+        return ruleset
+
+    def to_dict(self) -> Dict:
+        """직렬화 가능한 원본 테이블 형태 (파일 export 및 버전 해시용)"""
+        return {
+            "icd_ndc_mappings": {
+                p: {"valid_ndc_prefixes": list(m.valid_ndc_prefixes), "description": m.description}
+                for p, m in self.mappings.items()
+            },
+            "conflict_rules": [
+                {
+                    "rule_id": r.rule_id,
+                    "name": r.name,
+                    "codes_a": list(r.codes_a),
+                    "codes_b": list(r.codes_b),
+                    "severity": r.severity.value,
+                    "message": r.message,
+                }
+                for r in self.conflicts
+            ],
+            "glp1_ndc_prefixes": list(self.glp1_ndc_prefixes),
+            "glp1_valid_icd_prefixes": list(self.glp1_valid_icd_prefixes),
+            "hcc_high_risk_mappings": {
+                h: {
+                    "expected_icds": list(m.expected_icds),
+                    "description": m.description,
+                    "risk_score_impact": m.risk_score_impact,
+                }
+                for h, m in self.hcc.items()
+            },
+            "declarative_rules": [r.to_dict() for r in self.declarative],
+        }
+
+    def with_declarative_rules(self, rules: List) -> 'RuleSet':
+        """선언형 규칙(dict 또는 DeclarativeRule)을 뒤에 추가한 새 규칙 세트"""
+        data = self.to_dict()
+        data["declarative_rules"] = list(self.declarative) + list(rules)
+        return RuleSet.from_dict(data, source=self.source)
+
+    def to_file(self, path: str):
+        """규칙 세트를 JSON/YAML 파일로 저장"""
+        data = self.to_dict()
+        with open(path, "w", encoding="utf-8") as f:
+            if _is_yaml(path):
+                if not YAML_AVAILABLE:
+                    raise ImportError("PyYAML is required to write YAML rule files")
+                yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+            else:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def raw_mappings(self) -> Dict:
+        """기존 ICD_NDC_VALID_MAPPINGS 형식 사본 (표시/호환용)"""
+        return self.to_dict()["icd_ndc_mappings"]
+
+    def raw_conflicts(self) -> List[Dict]:
+        """기존 ICD_CONFLICT_RULES 형식 사본 (severity는 Severity enum)"""
+        return [
+            {
+                "rule_id": r.rule_id,
+                "name": r.name,
+                "codes_a": list(r.codes_a),
+                "codes_b": list(r.codes_b),
+                "severity": r.severity,
+                "message": r.message,
+            }
+            for r in self.conflicts
+        ]
+
+# ============================================================
+# Hot reload
+# ============================================================
+class RuleSetReloader:
+    """
+    규칙 파일 변경 감지 후 엔진에 새 RuleSet을 원자적으로 교체.
+    poll()을 주기적으로 호출 (배치 시작 시, Streamlit rerun 시 등).
+    """
+    def __init__(self, engine: 'RxHCCRuleEngine', path: str):
+        self.engine = engine
+        self.path = path
+        self._mtime: Optional[float] = None
+
+    def poll(self) -> bool:
+        """파일이 바뀌었으면 다시 로드하여 swap. 교체 여부 반환"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            logger.warning("Rule file unavailable (%s): %s", self.path, e)
+            return False
+        if mtime == self._mtime:
+            return False
+
+        try:
+            ruleset = RuleSet.from_file(self.path)
+        except Exception as e:
+            # 잘못된 파일은 기존 규칙 세트를 유지
+            logger.error("Rule file reload failed, keeping %s: %s", self.engine.rules_version, e)
+            return False
+
+        self._mtime = mtime
+        if ruleset.version == self.engine.rules_version:
+            return False
+        self.engine.swap_ruleset(ruleset)
+        return True
+
+def _to_severity(value) -> Severity:
+    return value if isinstance(value, Severity) else Severity(value)
+
+def _is_yaml(path: str) -> bool:
+    return path.lower().endswith((".yaml", ".yml"))
+
+def _check_rule_id(rule_id: str):
+    """외부 규칙 파일의 rule_id에 제어 문자/줄 구분자가 있으면 거부 (로그, 생성 소스 주석에 그대로 들어감)"""
+    if not isinstance(rule_id, str) or any(unicodedata.category(ch) in ("Cc", "Zl", "Zp") for ch in rule_id):
+        raise ValueError(f"Invalid rule_id {rule_id!r}: control characters are not allowed")
@@ -208,57 +208,105 @@ class SyntheticClaimGenerator:
 # ============================================================
 # Pandas 기반 배치 검증기
 # ============================================================
+def validate_rows(engine, rows: List[Dict]) -> tuple:
+    """
+    행(dict) 목록을 검증하여 (validation_results JSON, max_severity, is_flagged) 리스트와 실행 계획 반환.
+    코드 시그니처로 dedup하여 고유 조합당 한 번만 검증 후 모든 행으로 broadcast.
+    PandasBatchValidator와 병렬 워커(engine.parallel)가 공유.
+    """
+    from engine.rules import ClaimRecord
+    from engine.batch import plan_batch
+
+    n = len(rows)
+    results_list = [None] * n
+    max_severity_list = ["CRITICAL"] * n
+    flagged_list = [True] * n
+
+    severity_order = {"CRITICAL": 4, "WARNING": 3, "INFO": 2, "PASS": 1}
+
+    def error_json(e: Exception) -> str:
+        return json.dumps([{
+            "rule_id": "ERROR", 
+            "severity": "CRITICAL", 
+            "message": str(e)
+        }])
+
+    def summarize(results) -> tuple:
+        # 결과 직렬화 + 최고 심각도
+        results_json = json.dumps([r.to_dict() for r in results], ensure_ascii=False)
+        max_sev = max(
+            (r.severity.value for r in results),
+            key=lambda s: severity_order.get(s, 0),
+            default="PASS"
+        )
+        return results_json, max_sev, max_sev in ("CRITICAL", "WARNING")
+
+    positions, records = [], []
+    for pos, row in enumerate(rows):
+        try:
+            records.append(ClaimRecord.from_dict(row))
+            positions.append(pos)
+        except Exception as e:
+            results_list[pos] = error_json(e)
+
+    plan = plan_batch(records)
+    try:
+        per_claim = engine.validate_many(records, plan=plan)
+    except Exception:
+        # 시그니처 단위 실행 실패 시 행 단위로 오류 격리
+        per_claim = []
+        for record in records:
+            try:
+                per_claim.append(engine.validate(record))
+            except Exception as e:
+                per_claim.append(e)
+
+    # 커스텀 규칙이 없으면 PASS가 아닌 결과는 시그니처별로 동일 → 직렬화도 한 번만
+    shared = {} if not engine.has_custom_rules else None
+    for pos, sig, results in zip(positions, plan.inverse, per_claim):
+        if isinstance(results, Exception):
+            results_list[pos] = error_json(results)
+            continue
+        if shared is not None and results and results[0].rule_id != "PASS-000":
+            summary = shared.get(sig)
+            if summary is None:
+                summary = shared[sig] = summarize(results)
+        else:
+            summary = summarize(results)
+        results_list[pos], max_severity_list[pos], flagged_list[pos] = summary
+    return results_list, max_severity_list, flagged_list, plan
+
 class PandasBatchValidator:
     """
     Pandas DataFrame 기반 대용량 배치 검증.
     SageMaker Processing Job의 로컬 대체.
+    workers > 1이면 사전 초기화된 엔진을 가진 영속 프로세스 풀(engine.parallel)로 chunk 단위 병렬 검증.
     """
-    def __init__(self):
+    def __init__(self, workers: int = 1, chunk_size: int = 5000):
         from engine.rules import RxHCCRuleEngine
         self.engine = RxHCCRuleEngine()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.last_plan = None
+        self.last_revalidation = None
+        self._parallel = None
         
     def validate_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         DataFrame의 각 행을 검증하고 결과 컬럼 추가.
         Returns: 원본 DataFrame에 validation_results, max_severity, is_flagged 컬럼 추가
         """
-        from engine.rules import ClaimRecord
-        
-        results_list = []
-        max_severity_list = []
-        flagged_list = []
-        
-        severity_order = {"CRITICAL": 4, "WARNING": 3, "INFO": 2, "PASS": 1}
-        
-        for idx, row in df.iterrows():
-            try:
-                record = ClaimRecord.from_dict(row.to_dict())
-                results = self.engine.validate(record)
-                
-                # 결과 직렬화
-                results_json = json.dumps([r.to_dict() for r in results], ensure_ascii=False)
-                
-                # 최고 심각도
-                max_sev = max(
-                    (r.severity.value for r in results),
-                    key=lambda s: severity_order.get(s, 0),
-                    default="PASS"
-                )
-                
-                is_flagged = max_sev in ("CRITICAL", "WARNING")
-                
-            except Exception as e:
-                results_json = json.dumps([{
-                    "rule_id": "ERROR", 
-                    "severity": "CRITICAL", 
-                    "message": str(e)
-                }])
-                max_sev = "CRITICAL"
-                is_flagged = True
-                
-            results_list.append(results_json)
-            max_severity_list.append(max_sev)
-            flagged_list.append(is_flagged)
+        rows = df.to_dict("records")
+        if self.workers > 1:
+            if self._parallel is None:
+                from engine.parallel import ParallelBatchValidator
+                self._parallel = ParallelBatchValidator(self.engine, workers=self.workers, chunk_size=self.chunk_size)
+            results_list, max_severity_list, flagged_list = self._parallel.validate_rows(rows)
+            self.last_plan = None # 실행 계획은 워커 chunk별로 생성됨
+        else:
+            results_list, max_severity_list, flagged_list, plan = validate_rows(self.engine, rows)
+            self.last_plan = plan
+            logger.info("Batch plan: %s", plan.summary())
             
         df = df.copy()
         df["validation_results"] = results_list
@@ -266,6 +314,46 @@ class PandasBatchValidator:
         df["is_flagged"] = flagged_list
         return df
 
+    def revalidate_dataframe(self, validated_df: pd.DataFrame, ruleset, index=None) -> pd.DataFrame:
+        """
+        규칙 세트 변경분만 재검증 (validate_dataframe() 결과에 대한 delta job).
+        바뀐 규칙이 건드릴 수 있는 행만 다시 검증하여 결과 컬럼을 patch하고, 엔진 규칙 세트를 교체.
+        index: engine.incremental.DependencyIndex.from_dataframe(validated_df) (반복 적용 시 재사용)
+        실행 보고서는 self.last_revalidation에 기록.
+        """
+        from engine.incremental import DependencyIndex, RevalidationReport, diff_rulesets
+        import time
+
+        t0 = time.perf_counter()
+        diff = diff_rulesets(self.engine.ruleset, ruleset)
+        self.engine.swap_ruleset(ruleset)
+        if index is None:
+            index = DependencyIndex.from_dataframe(validated_df)
+        affected = sorted(index.affected_by(diff))
+
+        df = validated_df.copy()
+        n_changed = 0
+        if affected:
+            rows = validated_df.iloc[affected].to_dict("records")
+            results_list, max_severity_list, flagged_list, _ = validate_rows(self.engine, rows)
+            columns = [df.columns.get_loc(c) for c in ("validation_results", "max_severity", "is_flagged")]
+            n_changed = sum(
+                old != new for old, new in zip(validated_df["validation_results"].iloc[affected], results_list)
+            )
+            df.iloc[affected, columns[0]] = results_list
+            df.iloc[affected, columns[1]] = max_severity_list
+            df.iloc[affected, columns[2]] = flagged_list
+
+        self.last_revalidation = RevalidationReport(diff, len(df), len(affected), n_changed, time.perf_counter() - t0)
+        logger.info("Revalidation: %s", self.last_revalidation.summary())
+        return df
+
+    def close(self):
+        """병렬 워커 풀 종료"""
+        if self._parallel is not None:
+            self._parallel.close()
+            self._parallel = None
+
     def get_summary(self, validated_df: pd.DataFrame) -> Dict:
         """검증 결과 요약 통계"""
         total = len(validated_df)
@@ -0,0 +1,191 @@
+"""
+Patient Longitudinal Timeline
+=============================
+환자별 청구 이력 인덱스. 청구 일자를 정렬된 array로 보관하고 각 이벤트는 NDC/ICD 코드(intern 문자열)와
+NDC 약물 분류를 참조. 청구 스트림에 따라 증분 갱신되며 "N일 이내 같은 약물 분류" 같은 구간 질의를 bisect로 처리.
+LongitudinalRule로 감싸면 RxHCCRuleEngine.add_custom_rule()에 그대로 등록 가능.
+"""
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+import threading
+
+from engine.prefix_index import PrefixIndex
+from engine.rules import ClaimRecord, ValidationResult, Severity, GLP1_NDC_PREFIXES, claim_day
+
+# NDC 약물 분류 → NDC prefix (타임라인 이벤트에 분류 태그로 저장)
+NDC_CLASS_PREFIXES = {
+    "opioid": [
+        "68382-0087", # Hydrocodone (fwa_data_generator EXCESSIVE_OPIOID 패턴)
+    ],
+    "glp1": GLP1_NDC_PREFIXES,
+}
+
+@dataclass(frozen=True)
+class TimelineEvent:
+    """타임라인 이벤트 1건 (청구 1건)"""
+    claim_id: str
+    day: int
+    ndc_codes: Tuple[str, ...]
+    icd_codes: Tuple[str, ...]
+    ndc_classes: FrozenSet[str]
+
+class PatientTimeline:
+    """한 환자의 청구 이력. days는 정렬된 int array, events는 같은 순서의 이벤트 목록"""
+    __slots__ = ("days", "events")
+
+    def __init__(self):
+        self.days = array("l")
+        self.events: List[TimelineEvent] = []
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def insert(self, event: TimelineEvent) -> bool:
+        """일자 순서를 유지하며 삽입 (대부분 스트림 순서대로 들어오므로 append). 같은 청구 재삽입은 무시"""
+        lo = bisect_left(self.days, event.day)
+        hi = bisect_right(self.days, event.day, lo)
+        if any(self.events[i].claim_id == event.claim_id for i in range(lo, hi)):
+            return False
+        if hi == len(self.days):
+            self.days.append(event.day)
+            self.events.append(event)
+        else:
+            self.days.insert(hi, event.day)
+            self.events.insert(hi, event)
+        return True
+
+    def between(self, start_day: int, end_day: int) -> List[TimelineEvent]:
+        """start_day <= day <= end_day 구간 이벤트"""
+        return self.events[bisect_left(self.days, start_day):bisect_right(self.days, end_day)]
+
+    def prune_before(self, day: int) -> int:
+        """day 이전 이벤트 제거. 제거 건수 반환"""
+        cut = bisect_left(self.days, day)
+        if cut:
+            del self.days[:cut]
+            del self.events[:cut]
+        return cut
+
+class TimelineStore:
+    """
+    환자 ID → PatientTimeline.
+    ndc_classes: 분류명 → NDC prefix 목록 (PrefixIndex로 이벤트당 한 번 분류)
+    horizon_days: 환자별 최신 청구 기준 보관 기간 (초과 이벤트는 삽입 시 제거, None이면 무제한)
+    """
+    def __init__(self, ndc_classes: Dict[str, Sequence[str]] = None, horizon_days: Optional[int] = 365):
+        self.ndc_classes = PrefixIndex.from_groups(NDC_CLASS_PREFIXES if ndc_classes is None else ndc_classes)
+        self.horizon_days = horizon_days
+        self._patients: Dict[str, PatientTimeline] = {}
+        self._lock = threading.Lock()
+        self.n_events = 0
+
+    def __len__(self) -> int:
+        return len(self._patients)
+
+    def classify(self, ndc_codes: Sequence[str]) -> FrozenSet[str]:
+        classes = frozenset()
+        for ndc in ndc_codes:
+            classes |= self.ndc_classes.match(ndc.strip())
+        return classes
+
+    def add(self, claim: ClaimRecord) -> Optional[TimelineEvent]:
+        """청구를 환자 타임라인에 추가 (일자 파싱 실패 시 무시). 추가된 이벤트 반환"""
+        day = claim_day(claim)
+        if day is None:
+            return None
+        event = TimelineEvent(
+            claim_id=claim.claim_id,
+            day=day,
+            ndc_codes=tuple(claim.ndc_codes),
+            icd_codes=tuple(claim.icd_codes),
+            ndc_classes=self.classify(claim.ndc_codes),
+        )
+        with self._lock:
+            timeline = self._patients.get(claim.patient_id)
+            if timeline is None:
+                timeline = self._patients[claim.patient_id] = PatientTimeline()
+            if not timeline.insert(event):
+                return None
+            self.n_events += 1
+            if self.horizon_days is not None:
+                self.n_events -= timeline.prune_before(timeline.days[-1] - self.horizon_days)
+        return event
+
+    def timeline(self, patient_id: str) -> Optional[PatientTimeline]:
+        return self._patients.get(patient_id)
+
+    def window(self, patient_id: str, day: int, days_before: int, days_after: int = 0) -> List[TimelineEvent]:
+        """[day - days_before, day + days_after] 구간의 환자 이벤트"""
+        timeline = self._patients.get(patient_id)
+        if timeline is None:
+            return []
+        with self._lock:
+            return timeline.between(day - days_before, day + days_after)
+
+    def find_ndc_class_within(self, claim: ClaimRecord, ndc_class: str, within_days: int) -> List[TimelineEvent]:
+        """청구 일자 기준 within_days 이내(전후)에 같은 NDC 분류를 가진 다른 청구"""
+        day = claim_day(claim)
+        if day is None:
+            return []
+        return [
+            e for e in self.window(claim.patient_id, day, within_days, within_days)
+            if ndc_class in e.ndc_classes and e.claim_id != claim.claim_id
+        ]
+
+    def find_icd_within(self, claim: ClaimRecord, icd_prefixes: Tuple[str, ...], within_days: int) -> List[TimelineEvent]:
+        """청구 일자 기준 within_days 이내(전후)에 icd_prefixes 진단이 있는 다른 청구"""
+        day = claim_day(claim)
+        if day is None:
+            return []
+        return [
+            e for e in self.window(claim.patient_id, day, within_days, within_days)
+            if e.claim_id != claim.claim_id and any(icd.startswith(icd_prefixes) for icd in e.icd_codes)
+        ]
+
+# ============================================================
+# 종단(longitudinal) 규칙
+# ============================================================
+class LongitudinalRule:
+    """
+    타임라인 기반 규칙을 custom rule 형식(rule(claim) -> Optional[ValidationResult])으로 감싸기.
+    check_fn(claim, store)로 이력을 조회한 뒤 현재 청구를 타임라인에 추가.
+    같은 store를 공유하는 여러 규칙을 등록해도 청구는 한 번만 추가되고, 조회 시 자기 자신은 제외됨.
+    stateful: triage 모드에서 CRITICAL 중단 후에도 실행되어 타임라인이 모드와 무관하게 같게 유지됨
+    """
+    stateful = True
+
+    def __init__(self, store: TimelineStore, check_fn: Callable[[ClaimRecord, TimelineStore], Optional[ValidationResult]]):
+        self.store = store
+        self.check_fn = check_fn
+        self.__name__ = getattr(check_fn, "__name__", type(self).__name__)
+
+    def __call__(self, claim: ClaimRecord) -> Optional[ValidationResult]:
+        try:
+            return self.check_fn(claim, self.store)
+        finally:
+            self.store.add(claim)
+
+def opioid_refill_rule(store: TimelineStore, within_days: int = 15,
+                       severity: Severity = Severity.WARNING) -> LongitudinalRule:
+    """같은 환자의 오피오이드 청구가 within_days 이내에 반복되면 OPIOID-REFILL-001"""
+    def check(claim: ClaimRecord, store: TimelineStore) -> Optional[ValidationResult]:
+        if "opioid" not in store.classify(claim.ndc_codes):
+            return None
+        previous = store.find_ndc_class_within(claim, "opioid", within_days)
+        if not previous:
+            return None
+        day = claim_day(claim)
+        gap = min(abs(day - e.day) for e in previous)
+        return ValidationResult(
+            rule_id="OPIOID-REFILL-001",
+            rule_name="Early Opioid Refill",
+            severity=severity,
+            details={"claim_id": claim.claim_id, "previous_claim_ids": [e.claim_id for e in previous],
+                     "days_between": gap, "window_days": within_days},
+            template_id="OPIOID-REFILL-001",
+            params=(gap, within_days)
+        )
+    check.__name__ = "opioid_refill_rule"
+    return LongitudinalRule(store, check)
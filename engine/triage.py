@@ -0,0 +1,76 @@
+"""
+Triage Rule Scheduler
+=====================
+실시간 사전 심사(triage)용 규칙 실행 순서 관리.
+규칙 단위(내장 규칙군 + 커스텀 규칙)별 호출 수, CRITICAL 발생 수, 누적 실행 시간을 런타임에 수집하고
+"CRITICAL 발생 확률 / 평균 비용"이 높은 순으로 재정렬하여 첫 CRITICAL까지의 기대 비용을 최소화.
+"""
+from typing import Dict, List, Sequence
+import threading
+
+class TriageScheduler:
+    """
+    규칙 단위 카운터와 적응형 실행 순서.
+    카운터 갱신은 잠금 없이 수행 (멀티스레드에서는 근사치이며 순서 결정에만 사용).
+    규칙 단위 추가와 재정렬만 _lock으로 직렬화하고, 실행 순서 목록은 새 리스트로 교체하여 읽기는 잠금 없음.
+    """
+    def __init__(self, units: Sequence[str], reorder_every: int = 256):
+        self.units: List[str] = list(units)
+        self.reorder_every = reorder_every
+        self.calls: Dict[str, int] = {u: 0 for u in self.units}
+        self.criticals: Dict[str, int] = {u: 0 for u in self.units}
+        self.elapsed_ns: Dict[str, int] = {u: 0 for u in self.units}
+        self._order: List[str] = list(self.units)
+        self._since_reorder = 0
+        self._lock = threading.Lock()
+
+    def add_unit(self, unit: str):
+        """커스텀 규칙 등록 시 규칙 단위 추가 (관측 전에는 맨 뒤). 카운터를 먼저 만든 뒤 단위 목록에 공개"""
+        with self._lock:
+            if unit in self.calls:
+                return
+            self.calls[unit] = 0
+            self.criticals[unit] = 0
+            self.elapsed_ns[unit] = 0
+            self.units.append(unit)
+            self._order = self._order + [unit]
+
+    def order(self) -> List[str]:
+        """현재 실행 순서. reorder_every 회 관측마다 점수 기준으로 재정렬"""
+        if self._since_reorder >= self.reorder_every:
+            with self._lock:
+                if self._since_reorder >= self.reorder_every:
+                    self._since_reorder = 0
+                    self._order = sorted(self.units, key=self.score, reverse=True)
+        return self._order
+
+    def record(self, unit: str, elapsed_ns: int, critical: bool):
+        self.calls[unit] += 1
+        self.elapsed_ns[unit] += elapsed_ns
+        if critical:
+            self.criticals[unit] += 1
+
+    def finish_claim(self):
+        self._since_reorder += 1
+
+    def score(self, unit: str) -> float:
+        """CRITICAL 발생률 / 평균 실행 시간(ns). 관측이 없는 규칙은 우선 실행 (탐색)"""
+        calls = self.calls[unit]
+        if calls == 0:
+            return float("inf")
+        # Laplace smoothing: 한 번도 CRITICAL이 없던 규칙도 0점으로 고정되지 않도록
+        hit_rate = (self.criticals[unit] + 1) / (calls + 2)
+        mean_cost = self.elapsed_ns[unit] / calls
+        return hit_rate / max(mean_cost, 1.0)
+
+    def stats(self) -> Dict[str, Dict]:
+        """규칙 단위별 관측 통계 (현재 순서대로)"""
+        return {
+            unit: {
+                "calls": self.calls[unit],
+                "critical_hits": self.criticals[unit],
+                "hit_rate": round(self.criticals[unit] / self.calls[unit], 4) if self.calls[unit] else 0.0,
+                "mean_cost_us": round(self.elapsed_ns[unit] / self.calls[unit] / 1000, 3) if self.calls[unit] else 0.0,
+            }
+            for unit in self._order
+        }
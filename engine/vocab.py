@@ -0,0 +1,163 @@
+"""
+Code Vocabulary Encoding
+========================
+배치 데이터셋의 ICD/NDC/HCC 코드를 데이터셋당 한 번 int32 ID로 사전 인코딩.
+콤마 문자열은 고유 원본 값당 한 번만 분리하고, 청구별 코드는 CSR(offsets + ids) 배열로 보관.
+"""
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# ClaimRecord.from_dict와 동일한 키 별칭 (우선순위 순)
+ICD_KEYS = ("icd_codes", "icd_code", "diagnosis_code")
+NDC_KEYS = ("ndc_codes", "ndc_code", "drug_code")
+HCC_KEYS = ("hcc_codes", "hcc_code")
+
+class CodeVocabulary:
+    """고유 코드 문자열 ↔ int32 ID"""
+    __slots__ = ("codes", "_ids")
+
+    def __init__(self, codes: Iterable[str] = ()):
+        self.codes: List[str] = []
+        self._ids: Dict[str, int] = {}
+        for code in codes:
+            self.add(code)
+
+    def add(self, code: str) -> int:
+        idx = self._ids.get(code)
+        if idx is None:
+            idx = len(self.codes)
+            self._ids[code] = idx
+            self.codes.append(code)
+        return idx
+
+    def encode(self, codes: Iterable[str]) -> np.ndarray:
+        return np.fromiter((self.add(c) for c in codes), dtype=np.int32)
+
+    def id_of(self, code: str) -> Optional[int]:
+        return self._ids.get(code)
+
+    def decode(self, ids: np.ndarray) -> np.ndarray:
+        return np.asarray(self.codes, dtype=object)[ids] if len(ids) else np.empty(0, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+@dataclass
+class EncodedCodeColumn:
+    """
+    청구별 코드 ID의 CSR 표현.
+    row i의 코드 = ids[offsets[i]:offsets[i+1]] (청구 내 순서 보존)
+    """
+    vocab: CodeVocabulary
+    ids: np.ndarray # int32, 코드 항목별 vocab ID
+    rows: np.ndarray # int32, 코드 항목별 청구 위치
+    offsets: np.ndarray # int64, 길이 n_rows + 1
+
+    @property
+    def n_entries(self) -> int:
+        return len(self.ids)
+
+    def codes_for(self, row: int) -> List[str]:
+        return [self.vocab.codes[i] for i in self.ids[self.offsets[row]:self.offsets[row + 1]]]
+
+    @property
+    def nbytes(self) -> int:
+        return self.ids.nbytes + self.rows.nbytes + self.offsets.nbytes
+
+@dataclass
+class EncodedClaims:
+    """데이터셋 단위로 인코딩된 ICD/NDC/HCC 코드 컬럼"""
+    n_rows: int
+    icd: EncodedCodeColumn
+    ndc: EncodedCodeColumn
+    hcc: EncodedCodeColumn
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'EncodedClaims':
+        return cls(
+            n_rows=len(df),
+            icd=encode_code_column(resolve_code_column(df, ICD_KEYS)),
+            ndc=encode_code_column(resolve_code_column(df, NDC_KEYS)),
+            hcc=encode_code_column(resolve_code_column(df, HCC_KEYS)),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        """인코딩 배열 + vocab 문자열 메모리 (추정)"""
+        vocab_bytes = sum(
+            sum(len(c) + 49 for c in col.vocab.codes) for col in (self.icd, self.ndc, self.hcc)
+        )
+        return self.icd.nbytes + self.ndc.nbytes + self.hcc.nbytes + vocab_bytes
+
+# ============================================================
+# 인코딩
+# ============================================================
+class _ListValue:
+    """리스트 입력을 factorize 가능한 키로 감싸기 (튜플 입력과 구분)"""
+    __slots__ = ("items",)
+
+    def __init__(self, items: list):
+        self.items = tuple(items)
+
+    def __hash__(self):
+        return hash((_ListValue, self.items))
+
+    def __eq__(self, other):
+        return isinstance(other, _ListValue) and other.items == self.items
+
+def resolve_code_column(df: pd.DataFrame, keys: Sequence[str]) -> pd.Series:
+    """from_dict의 `a or b or c` 키 fallback을 컬럼 단위로 재현"""
+    resolved = None
+    for key in keys:
+        if key not in df.columns:
+            continue
+        col = pd.Series(df[key].to_numpy(dtype=object), dtype=object)
+        if resolved is None:
+            resolved = col
+        else:
+            resolved = resolved.where(resolved.astype(bool), col)
+    if resolved is None:
+        return pd.Series([""] * len(df), dtype=object)
+    return resolved
+
+def _parse_raw(value) -> List[str]:
+    """ClaimRecord.from_dict의 to_list와 동일한 분리 규칙"""
+    if isinstance(value, _ListValue):
+        return list(value.items)
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    return []
+
+def encode_code_column(col: pd.Series, vocab: CodeVocabulary = None) -> EncodedCodeColumn:
+    """
+    원본 코드 컬럼을 고유 값 단위로 factorize → 고유 값당 한 번 분리/인코딩 → 청구별 CSR로 확장.
+    """
+    vocab = vocab if vocab is not None else CodeVocabulary()
+    try:
+        raw_ids, uniques = pd.factorize(col, use_na_sentinel=True)
+    except TypeError:
+        # 리스트 값은 unhashable → 래핑 후 factorize
+        wrapped = col.map(lambda v: _ListValue(v) if isinstance(v, list) else v)
+        raw_ids, uniques = pd.factorize(wrapped, use_na_sentinel=True)
+
+    # 고유 원본 값별 코드 ID 목록 (CSR)
+    parsed = [vocab.encode(_parse_raw(v)) for v in uniques]
+    u_len = np.fromiter((len(p) for p in parsed), dtype=np.int64, count=len(parsed))
+    u_offsets = np.zeros(len(parsed) + 1, dtype=np.int64)
+    np.cumsum(u_len, out=u_offsets[1:])
+    u_ids = np.concatenate(parsed) if parsed else np.empty(0, dtype=np.int32)
+
+    # 청구별 확장 (NA → 빈 목록)
+    raw_ids = np.asarray(raw_ids, dtype=np.int64)
+    valid = raw_ids >= 0
+    lengths = np.where(valid, u_len[np.where(valid, raw_ids, 0)] if len(u_len) else 0, 0)
+    offsets = np.zeros(len(raw_ids) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    rows = np.repeat(np.arange(len(raw_ids), dtype=np.int32), lengths)
+    within = np.arange(offsets[-1], dtype=np.int64) - offsets[rows]
+    ids = u_ids[u_offsets[raw_ids[rows]] + within].astype(np.int32, copy=False) if len(rows) else np.empty(0, dtype=np.int32)
+    return EncodedCodeColumn(vocab=vocab, ids=ids, rows=rows, offsets=offsets)
@@ -23,7 +23,7 @@ from engine.rules import (
     GLP1_NDC_PREFIXES,
     GLP1_VALID_ICD_PREFIXES
 )
-from engine.langgraph_integrity import run_validation
+from engine.langgraph_integrity import run_validation, run_validation_batch
 from engine.sagemaker_replication import SyntheticClaimGenerator, PandasBatchValidator
 
 # ============================================================
@@ -304,10 +304,10 @@ if page == "🔍 실시간 검사 (Real-time Scan)":
                 with m1: st.metric("리스크 등급", risk_level)
                 with m2: st.metric("리스크 스코어", risk_score)
                 with m3:
-                    critical_count = sum(1 for r in result["results"] if r.get("severity") == "CRITICAL")
+                    critical_count = result.get("severity_counts", {}).get("CRITICAL", 0)
                     st.metric("🔴 Critical", critical_count)
                 with m4:
-                    warning_count = sum(1 for r in result["results"] if r.get("severity") == "WARNING")
+                    warning_count = result.get("severity_counts", {}).get("WARNING", 0)
                     st.metric("🟡 Warning", warning_count)
                     
                 st.divider()
@@ -378,12 +378,12 @@ elif page == "📋 배치 데모 (Batch Demo)":
             progress = st.progress(0)
             all_results = []
             
-            for i, (name, scenario) in enumerate(scenarios.items()):
-                result = run_validation(scenario)
+            batch_states = run_validation_batch(list(scenarios.values()))
+            for i, ((name, scenario), result) in enumerate(zip(scenarios.items(), batch_states)):
                 risk_level = result.get("metadata", {}).get("risk_level", "UNKNOWN")
                 risk_score = result.get("metadata", {}).get("risk_score", 0)
-                critical_count = sum(1 for r in result["results"] if r.get("severity") == "CRITICAL")
-                warning_count = sum(1 for r in result["results"] if r.get("severity") == "WARNING")
+                critical_count = result.get("severity_counts", {}).get("CRITICAL", 0)
+                warning_count = result.get("severity_counts", {}).get("WARNING", 0)
                 
                 all_results.append({
                     "시나리오": name,
@@ -0,0 +1,106 @@
+"""
+Batch Planner Tests
+시그니처 dedup 후 broadcast 결과가 청구별 validate()와 동일한지 검증
+"""
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, ValidationResult, Severity
+from engine.batch import plan_batch
+
+def make_claims():
+    codes = [
+        (["E11.9"], ["00002-1433-80"], []),
+        (["E10.9", "E11.65"], ["00088-2500-33"], ["HCC18"]),
+        (["I10"], ["00169-4060-12"], []),
+    ]
+    return [
+        ClaimRecord(claim_id=f"B-{i}", patient_id="P", icd_codes=list(icd), ndc_codes=list(ndc), hcc_codes=list(hcc))
+        for i, (icd, ndc, hcc) in enumerate(codes * 4)
+    ]
+
+def flag_b0(claim):
+    """워커로 전달되는 커스텀 규칙 (pickle 가능한 모듈 수준 함수)"""
+    if claim.claim_id == "B-0":
+        return ValidationResult(rule_id="X-1", rule_name="Custom", severity=Severity.WARNING, message="custom")
+    return None
+
+class TestBatchPlan:
+    def test_plan_factorizes_signatures(self):
+        plan = plan_batch(make_claims())
+        assert plan.n_claims == 12
+        assert plan.n_unique == 3
+        assert plan.dedup_ratio == 4.0
+        assert plan.representatives == [0, 1, 2]
+        assert plan.inverse[:6] == [0, 1, 2, 0, 1, 2]
+
+    def test_validate_many_matches_validate(self):
+        engine = RxHCCRuleEngine()
+        claims = make_claims()
+        batched = engine.validate_many(claims)
+        expected = [engine.validate(c) for c in claims]
+        assert [[r.to_dict() for r in rs] for rs in batched] == [[r.to_dict() for r in rs] for rs in expected]
+        assert engine.last_batch_plan.n_unique == 3
+
+    def test_validate_batch_rebinds_claim_fields(self):
+        engine = RxHCCRuleEngine()
+        claims = make_claims()
+        results = engine.validate_batch(claims)
+        assert "B-9" in results["B-9"][0].message
+        conflict = next(r for r in results["B-10"] if r.rule_id == "CONFLICT-001")
+        assert conflict.details["icd_codes"] is claims[10].icd_codes
+
+class TestPandasBatchDedup:
+    def test_validate_dataframe_matches_row_by_row(self):
+        pytest.importorskip("pandas")
+        from engine.sagemaker_replication import SyntheticClaimGenerator, PandasBatchValidator
+
+        df = SyntheticClaimGenerator(seed=3).generate(500, anomaly_rate=0.4)
+        validator = PandasBatchValidator()
+        validated = validator.validate_dataframe(df)
+
+        engine = RxHCCRuleEngine()
+        for row, results_json in zip(df.to_dict("records"), validated["validation_results"]):
+            expected = [r.to_dict() for r in engine.validate(ClaimRecord.from_dict(row))]
+            assert json.loads(results_json) == json.loads(json.dumps(expected, ensure_ascii=False))
+        assert validator.last_plan.n_claims == 500
+        assert validator.last_plan.dedup_ratio > 1.0
+
+class TestParallelBatch:
+    def test_parallel_matches_serial_in_input_order(self):
+        from engine.parallel import ParallelBatchValidator
+        engine = RxHCCRuleEngine()
+        claims = make_claims() * 5
+        with ParallelBatchValidator(engine, workers=2, chunk_size=7) as parallel:
+            results = parallel.validate_many(claims)
+            assert results == engine.validate_many(claims)
+            # 규칙 세트 교체 시 풀 재생성
+            first_pool = parallel._pool
+            data = engine.ruleset.to_dict()
+            data["glp1_valid_icd_prefixes"].append("I10")
+            from engine.ruleset import RuleSet
+            engine.swap_ruleset(RuleSet.from_dict(data))
+            swapped = parallel.validate_many(claims)
+            assert parallel._pool is not first_pool
+            assert not any(r.rule_id == "GLP1-001" for rs in swapped for r in rs)
+            # 풀 시작 후 추가한 커스텀 규칙도 워커에 반영
+            engine.add_custom_rule(flag_b0)
+            custom = parallel.validate_many(claims)
+            assert custom == engine.validate_many(claims)
+            assert "X-1" in [r.rule_id for r in custom[0]]
+
+    def test_pandas_validator_workers(self):
+        pytest.importorskip("pandas")
+        from engine.sagemaker_replication import SyntheticClaimGenerator, PandasBatchValidator
+
+        df = SyntheticClaimGenerator(seed=4).generate(300, anomaly_rate=0.4)
+        parallel = PandasBatchValidator(workers=2, chunk_size=64)
+        try:
+            validated = parallel.validate_dataframe(df)
+        finally:
+            parallel.close()
+        assert validated.equals(PandasBatchValidator().validate_dataframe(df))
@@ -0,0 +1,124 @@
+"""
+Rule Code Generation Tests
+규칙 세트 특화 함수(engine.codegen)가 인터프리터 엔진과 같은 결과를 내는지 검증
+(tests/test_rules.py의 TestRuleEngine 케이스를 codegen 엔진으로 재실행)
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, ICD_CONFLICT_RULES
+from engine.ruleset import RuleSet
+from engine import codegen
+from engine.codegen import RuleCompiler, generate_source
+from tests import test_rules
+
+@pytest.fixture(autouse=True)
+def codegen_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("RXHCC_CODEGEN_DIR", str(tmp_path))
+    return tmp_path
+
+class TestCompiledRuleEngine(test_rules.TestRuleEngine):
+    """TestRuleEngine 전체를 codegen 경로로 실행"""
+    def setup_method(self):
+        self.engine = RxHCCRuleEngine()
+        self.engine.enable_codegen()
+
+def custom_ruleset():
+    conflicts = [dict(r) for r in ICD_CONFLICT_RULES]
+    conflicts[2]["message"] = "천식/COPD 동시 진단 (사내 문구)"
+    return RuleSet.from_tables(conflict_rules=conflicts, declarative_rules=[{
+        "rule_id": "DECL-001", "message": "인슐린 처방에 당뇨 진단이 없습니다.",
+        "ndc_any": ["00088-2500", "00169-7501"], "icd_none": ["E10", "E11"],
+    }])
+
+class TestCodegen:
+    def test_parity_with_interpreted_engine(self):
+        pytest.importorskip("pandas")
+        from engine.sagemaker_replication import SyntheticClaimGenerator
+        df = SyntheticClaimGenerator(seed=21).generate(3000, anomaly_rate=0.5)
+        claims = [ClaimRecord.from_dict(row) for row in df.to_dict("records")]
+        claims.append(ClaimRecord(claim_id="X", patient_id="P", icd_codes=["J45.20", " j44.9"],
+                                  ndc_codes=[" 00173-0717-20"], hcc_codes=["hcc85"]))
+
+        for ruleset in (RuleSet.default(), custom_ruleset()):
+            interpreted = RxHCCRuleEngine(ruleset=ruleset)
+            compiled = RxHCCRuleEngine(ruleset=ruleset)
+            compiled.enable_codegen()
+            expected = [interpreted.validate(c) for c in claims]
+            assert [compiled.validate(c) for c in claims] == expected
+            assert compiled.validate_many(claims) == expected
+
+    def test_disk_cache_by_ruleset_hash(self, codegen_dir, monkeypatch):
+        rs = custom_ruleset()
+        first = RuleCompiler()
+        first.function(rs)
+        path = first.path_for(rs)
+        assert os.path.dirname(path) == str(codegen_dir)
+        assert rs.version in os.path.basename(path)
+        assert first.stats()["generated"] == 1
+        with open(path, encoding="utf-8") as f:
+            header, _, body = f.read().partition("\n")
+        assert body == generate_source(rs)
+        assert f"ruleset={rs.version}" in header and "sha256=" in header
+
+        # 검증된 파일은 소스 생성 없이 로드
+        monkeypatch.setattr(codegen, "generate_source", lambda rs: pytest.fail("source regenerated"))
+        second = RuleCompiler()
+        claim = ClaimRecord(claim_id="S", patient_id="P", icd_codes=["I10"], ndc_codes=["00088-2500-33"])
+        assert [r.rule_id for r in second.function(rs)(claim)] == ["NDC-MISMATCH-001", "DECL-001"]
+        assert second.stats() == {"cache_dir": str(codegen_dir), "generated": 0, "loaded_from_disk": 1, "modules": 1}
+
+    @pytest.mark.parametrize("tamper", ["planted", "body_edited", "group_writable"])
+    def test_tampered_cache_file_regenerated(self, codegen_dir, tamper):
+        if tamper == "group_writable" and os.name != "posix":
+            pytest.skip("POSIX permissions")
+        rs = custom_ruleset()
+        RuleCompiler().function(rs)
+        path = RuleCompiler().path_for(rs)
+        with open(path, encoding="utf-8") as f:
+            header, _, body = f.read().partition("\n")
+        planted = "raise RuntimeError('planted')\n"
+        if tamper == "planted":
+            content = planted
+        elif tamper == "body_edited":
+            content = f"{header}\n{planted}{body}"
+        else:
+            # 헤더/해시는 맞지만 다른 사용자가 쓸 수 있는 파일
+            content = RuleCompiler()._header(rs, planted) + planted
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        if tamper == "group_writable":
+            os.chmod(path, 0o664)
+        compiler = RuleCompiler()
+        compiler.function(rs)
+        assert compiler.stats()["generated"] == 1
+        with open(path, encoding="utf-8") as f:
+            assert f.read().partition("\n")[2] == generate_source(rs)
+        assert os.stat(path).st_mode & 0o777 == 0o600
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+    def test_private_cache_dir(self, codegen_dir, monkeypatch, tmp_path):
+        monkeypatch.delenv("RXHCC_CODEGEN_DIR")
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        compiler = RuleCompiler()
+        compiler.function(RuleSet.default())
+        assert compiler.cache_dir == str(tmp_path / "xdg" / "rxhcc" / "codegen")
+        assert os.stat(compiler.cache_dir).st_mode & 0o777 == 0o700
+
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o777)
+        with pytest.raises(PermissionError):
+            RuleCompiler(str(shared)).function(RuleSet.default())
+
+    def test_swap_ruleset_switches_function(self):
+        engine = RxHCCRuleEngine()
+        engine.enable_codegen()
+        claim = ClaimRecord(claim_id="S", patient_id="P", icd_codes=["I10"], ndc_codes=["00088-2500-33"])
+        assert engine.validate(claim)[0].rule_id == "NDC-MISMATCH-001"
+        engine.swap_ruleset(custom_ruleset())
+        assert [r.rule_id for r in engine.validate(claim)] == ["NDC-MISMATCH-001", "DECL-001"]
+        assert engine.validate(claim)[1].rule_meta is engine.ruleset.declarative[0].meta
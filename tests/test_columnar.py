@@ -0,0 +1,136 @@
+"""
+Columnar Validation Tests
+스칼라 엔진(validate)과 validate_columnar 결과 일치 검증
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pd = pytest.importorskip("pandas")
+
+from engine.rules import (
+    RxHCCRuleEngine,
+    ClaimRecord,
+    ValidationResult,
+    Severity,
+    RuleFlag,
+)
+from engine.sagemaker_replication import SyntheticClaimGenerator
+
+SAMPLE_CSV = os.path.join(os.path.dirname(__file__), '..', 'data', 'sample_claims.csv')
+
+def scalar_findings(engine, df):
+    """validate()를 행 단위로 실행한 기대값"""
+    expected = []
+    for row in df.to_dict("records"):
+        results = engine.validate(ClaimRecord.from_dict(row))
+        expected.append([(r.rule_id, r.severity.value, r.message) for r in results])
+    return expected
+
+def columnar_findings(result, n):
+    got = [[] for _ in range(n)]
+    for r in result.findings.itertuples():
+        got[r.row].append((r.rule_id, r.severity, r.message))
+    return got
+
+class TestColumnarParity:
+    """validate_columnar == validate"""
+    def setup_method(self):
+        self.engine = RxHCCRuleEngine()
+
+    def test_synthetic_parity(self):
+        df = SyntheticClaimGenerator(seed=7).generate(2000, anomaly_rate=0.4)
+        result = self.engine.validate_columnar(df)
+        assert columnar_findings(result, len(df)) == scalar_findings(self.engine, df)
+
+    def test_sample_csv_parity(self):
+        df = pd.read_csv(SAMPLE_CSV)
+        result = self.engine.validate_columnar(df)
+        assert columnar_findings(result, len(df)) == scalar_findings(self.engine, df)
+
+    def test_max_severity_and_flags(self):
+        df = pd.DataFrame([
+            {"claim_id": "C1", "icd_codes": "E11.9", "ndc_codes": "00002-1433-80", "hcc_codes": ""},
+            {"claim_id": "C2", "icd_codes": "E10.9,E11.65", "ndc_codes": "00169-4060-12", "hcc_codes": "HCC85"},
+            {"claim_id": "C3", "icd_codes": "I10", "ndc_codes": "00088-2500-33", "hcc_codes": ""},
+        ])
+        result = self.engine.validate_columnar(df)
+        assert list(result.max_severity) == ["PASS", "CRITICAL", "WARNING"]
+        assert result.flags.iloc[0] == RuleFlag.NONE
+        assert result.flags.iloc[1] & RuleFlag.ICD_CONFLICT
+        assert result.flags.iloc[1] & RuleFlag.GLP1
+        assert result.flags.iloc[1] & RuleFlag.HCC_UPCODING
+        assert result.flags.iloc[2] == RuleFlag.NDC_MISMATCH
+        assert list(result.is_flagged) == [False, True, True]
+
+    def test_list_input_and_custom_rule(self):
+        def high_amount_check(claim: ClaimRecord):
+            if claim.claim_amount > 10000:
+                return ValidationResult(
+                    rule_id="CUSTOM-001",
+                    rule_name="High Amount Check",
+                    severity=Severity.WARNING,
+                    message=f"청구 금액 ${claim.claim_amount}이 $10,000 초과"
+                )
+            return None
+
+        self.engine.add_custom_rule(high_amount_check)
+        df = pd.DataFrame([
+            {"claim_id": "L1", "icd_codes": ["E11.9", "I10"], "ndc_codes": ["00002-1433-80"], "claim_amount": 25000.0},
+            {"claim_id": "L2", "icd_codes": "E11.9", "ndc_codes": "00002-1433-80", "claim_amount": 100.0},
+        ])
+        result = self.engine.validate_columnar(df)
+        assert columnar_findings(result, len(df)) == scalar_findings(self.engine, df)
+        assert result.flags.iloc[0] & RuleFlag.CUSTOM
+
+    def test_declarative_rule_parity(self):
+        self.engine.add_custom_rule({
+            "rule_id": "DECL-001", "name": "Insulin without Diabetes", "severity": "WARNING",
+            "message": "인슐린 처방에 당뇨 진단이 없습니다.",
+            "ndc_any": ["00088-2500", "00169-7501"], "icd_none": ["E10", "E11"],
+        })
+        self.engine.add_custom_rule({
+            "rule_id": "DECL-002", "name": "Respiratory HCC on Inhaler", "severity": "INFO",
+            "message": "호흡기 HCC + 흡입기", "hcc_any": ["HCC11"], "ndc_any": ["00173"],
+        })
+        df = SyntheticClaimGenerator(seed=9).generate(2000, anomaly_rate=0.4)
+        result = self.engine.validate_columnar(df)
+        got = columnar_findings(result, len(df))
+        assert got == scalar_findings(self.engine, df)
+        assert {"DECL-001", "DECL-002"} <= {f[0] for row in got for f in row}
+        assert not self.engine.has_custom_rules
+
+class TestCodeVocabulary:
+    """int32 사전 인코딩 (engine.vocab)"""
+
+    def test_encode_column_csr(self):
+        from engine.vocab import encode_code_column
+        col = pd.Series(["E11.9, I10", None, "I10", ["E10.9", "E11.9"], ""], dtype=object)
+        enc = encode_code_column(col)
+        assert enc.ids.dtype.name == "int32"
+        assert list(enc.offsets) == [0, 2, 2, 3, 5, 5]
+        assert [enc.codes_for(i) for i in range(5)] == [["E11.9", "I10"], [], ["I10"], ["E10.9", "E11.9"], []]
+        # 같은 코드는 한 ID로 공유
+        assert len(enc.vocab) == 3
+        assert enc.vocab.id_of("I10") == enc.ids[1] == enc.ids[2]
+
+    def test_encoded_claims_match_from_dict(self):
+        from engine.vocab import EncodedClaims
+        df = SyntheticClaimGenerator(seed=11).generate(300, anomaly_rate=0.5)
+        enc = EncodedClaims.from_dataframe(df)
+        for i, row in enumerate(df.to_dict("records")):
+            claim = ClaimRecord.from_dict(row)
+            assert enc.icd.codes_for(i) == claim.icd_codes
+            assert enc.ndc.codes_for(i) == claim.ndc_codes
+            assert enc.hcc.codes_for(i) == claim.hcc_codes
+
+    def test_reuse_encoding_across_rulesets(self):
+        from engine.vocab import EncodedClaims
+        df = SyntheticClaimGenerator(seed=5).generate(200, anomaly_rate=0.5)
+        enc = EncodedClaims.from_dataframe(df)
+        engine = RxHCCRuleEngine()
+        fresh = engine.validate_columnar(df)
+        reused = engine.validate_columnar(df, encoded=enc)
+        assert fresh.findings.equals(reused.findings)
@@ -0,0 +1,125 @@
+"""
+Incremental Re-validation Tests
+규칙 세트 변경 후 영향받는 청구만 재검증한 결과가 전체 재실행 결과와 같은지 검증
+"""
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord
+from engine.ruleset import RuleSet
+from engine.incremental import IncrementalValidator, DependencyIndex, diff_rulesets
+
+def synthetic_claims(n=600):
+    from engine.sagemaker_replication import SyntheticClaimGenerator
+    df = SyntheticClaimGenerator(seed=11).generate(n, anomaly_rate=0.4)
+    return [ClaimRecord.from_dict(row) for row in df.to_dict("records")]
+
+def edit_rules(edit):
+    data = RuleSet.default().to_dict()
+    edit(data)
+    return RuleSet.from_dict(data)
+
+def add_insulin_to_hypertension(data):
+    data["icd_ndc_mappings"]["I10"]["valid_ndc_prefixes"].append("00088-2500")
+
+def rename_conflict(data):
+    data["conflict_rules"][0]["message"] = "제1형/제2형 당뇨 동시 진단 (검토 필요)"
+
+def add_glp1_indication(data):
+    data["glp1_valid_icd_prefixes"].append("I10")
+
+def drop_hcc(data):
+    del data["hcc_high_risk_mappings"]["HCC18"]
+
+def add_declarative_rule(data):
+    data["declarative_rules"].append({
+        "rule_id": "DECL-001", "message": "인슐린 처방에 당뇨 진단이 없습니다.",
+        "ndc_any": ["00088-2500"], "icd_none": ["E10", "E11"],
+    })
+
+class TestRuleSetDiff:
+    def test_diff_detects_changed_entries(self):
+        base = RuleSet.default()
+        assert diff_rulesets(base, RuleSet.default()).is_empty
+
+        diff = diff_rulesets(base, edit_rules(add_insulin_to_hypertension))
+        assert diff.mapping_categories == {"I10"}
+        assert not diff.conflict_prefixes and not diff.hcc_codes
+
+        diff = diff_rulesets(base, edit_rules(rename_conflict))
+        assert diff.conflict_rule_ids == {"CONFLICT-001"}
+        assert not diff.conflict_prefixes
+
+        assert diff_rulesets(base, edit_rules(drop_hcc)).hcc_codes == {"HCC18"}
+
+class TestIncrementalValidator:
+    @pytest.mark.parametrize("edit", [add_insulin_to_hypertension, rename_conflict, add_glp1_indication, drop_hcc,
+                                      add_declarative_rule])
+    def test_delta_matches_full_rerun(self, edit):
+        pytest.importorskip("pandas")
+        claims = synthetic_claims()
+        incremental = IncrementalValidator(RxHCCRuleEngine())
+        incremental.validate_all(claims)
+
+        ruleset = edit_rules(edit)
+        report = incremental.apply_ruleset(ruleset)
+        expected = RxHCCRuleEngine(ruleset=ruleset).validate_many(claims)
+        assert incremental.results == expected
+        assert 0 < report.n_changed <= report.n_affected < len(claims)
+        assert incremental.rules_version == ruleset.version
+
+    def test_index_tracks_rules_after_patch(self):
+        claims = [
+            ClaimRecord(claim_id="I-1", patient_id="P", icd_codes=["I10"], ndc_codes=["00088-2500-33"]),
+            ClaimRecord(claim_id="I-2", patient_id="P", icd_codes=["E11.9"], ndc_codes=["00002-1433-80"]),
+        ]
+        incremental = IncrementalValidator()
+        incremental.validate_all(claims)
+        assert incremental.index.claims_with_rules(["NDC-MISMATCH-001"]) == {0}
+
+        report = incremental.apply_ruleset(edit_rules(add_insulin_to_hypertension))
+        assert report.n_affected == 1 and report.n_changed == 1
+        assert incremental.results[0][0].rule_id == "PASS-000"
+        assert incremental.index.claims_with_rules(["NDC-MISMATCH-001"]) == set()
+
+    def test_rule_postings_update_out_of_order(self):
+        from engine.rules import ValidationResult, Severity
+        def result(rule_id):
+            return [ValidationResult(rule_id, rule_id, Severity.WARNING, "")]
+        index = DependencyIndex.from_claims(
+            [ClaimRecord(claim_id=f"O-{i}", patient_id="P", icd_codes=["I10"], ndc_codes=[]) for i in range(6)],
+            [result("PASS-000")] * 6,
+        )
+        # 재검증은 위치 순서와 무관하게 들어옴
+        for pos in (4, 1, 5):
+            index.update_rules(pos, result("PASS-000"), result("NDC-MISMATCH-001"))
+        index.update_rules(5, result("NDC-MISMATCH-001"), result("PASS-000"))
+        index.update_rules(5, result("PASS-000"), result("PASS-000"))
+        assert index.claims_with_rules(["PASS-000"]) == {0, 2, 3, 5}
+        assert index.claims_with_rules(["NDC-MISMATCH-001"]) == {1, 4}
+
+class TestPandasRevalidation:
+    def test_revalidate_dataframe_patches_affected_rows(self):
+        pytest.importorskip("pandas")
+        from engine.sagemaker_replication import SyntheticClaimGenerator, PandasBatchValidator
+
+        df = SyntheticClaimGenerator(seed=5).generate(400, anomaly_rate=0.4)
+        validator = PandasBatchValidator()
+        validated = validator.validate_dataframe(df)
+        index = DependencyIndex.from_dataframe(validated)
+
+        ruleset = edit_rules(add_insulin_to_hypertension)
+        patched = validator.revalidate_dataframe(validated, ruleset, index=index)
+        report = validator.last_revalidation
+        assert 0 < report.n_changed <= report.n_affected < len(df)
+
+        full = PandasBatchValidator()
+        full.engine.swap_ruleset(ruleset)
+        expected = full.validate_dataframe(df)
+        assert list(patched["validation_results"].map(json.loads)) == list(expected["validation_results"].map(json.loads))
+        assert list(patched["max_severity"]) == list(expected["max_severity"])
+        assert list(patched["is_flagged"]) == list(expected["is_flagged"])
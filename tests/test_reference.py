@@ -0,0 +1,93 @@
+"""
+Reference Dictionary Tests
+원본 파일 → memory-mapped 바이너리 변환, binary search/prefix 조회, CODE-INVALID 규칙 검증
+"""
+import pytest
+import sys
+import os
+import pickle
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord
+from engine.reference import (
+    ReferenceData, ReferenceDictionary, CodeValidityRule,
+    compile_reference, normalize_ndc, ICD_SOURCE_FILE,
+)
+
+@pytest.fixture
+def reference(tmp_path):
+    return ReferenceData.load(cache_dir=str(tmp_path / "cache"))
+
+class TestReferenceDictionary:
+    def test_lookup_and_prefix(self, reference):
+        assert "E11.65" in reference.icd and "e1165" in reference.icd
+        assert "E11" not in reference.icd # 카테고리 코드는 청구 불가
+        assert "M54.5" not in reference.icd # FY2022에 M54.50/51/59로 세분화되어 폐기
+        assert reference.icd.with_prefix("I50") == ["I5020", "I5022", "I5032", "I509"]
+        assert list(reference.icd.contains_many(["E11.9", "X99.9"])) == [True, False]
+
+    def test_contains_many_matches_contains_for_long_codes(self, reference):
+        # 레코드 폭(6)보다 긴 코드가 잘려서 J84112로 매칭되면 안 됨
+        codes = ["J84.1129", "J84.112", "M25.5119", "E11.9", "X99.9"]
+        assert list(reference.icd.contains_many(codes)) == [c in reference.icd for c in codes] == [False, True, False, True, False]
+        assert list(reference.icd.contains_many(["J841129"])) == [False]
+
+    def test_ndc_formats_normalize_to_11_digits(self, reference):
+        # FDA 10자리 표기(4-4-2, 5-3-2, 5-4-1)와 청구 11자리 표기가 같은 키
+        assert normalize_ndc("0002-1433-80") == normalize_ndc("00002-1433-80") == "00002143380"
+        assert normalize_ndc("68382-087-06") == "68382008706"
+        assert normalize_ndc("59762-5005-1") == "59762500501"
+        assert "68382-0087-06" in reference.ndc
+        assert "12345-6789-01" not in reference.ndc
+        assert reference.ndc.count_prefix("00169-4060") == 2
+
+    def test_compiled_once_and_rebuilt_when_source_changes(self, tmp_path):
+        source = tmp_path / ICD_SOURCE_FILE
+        source.write_text("E119    Type 2 diabetes mellitus without complications\n")
+        cache = str(tmp_path / "cache")
+        path = compile_reference(str(source), "icd", cache)
+        assert compile_reference(str(source), "icd", cache) == path
+        assert len(ReferenceDictionary(path, "icd")) == 1
+
+        source.write_text("E119    Type 2 diabetes mellitus without complications\nI10     Essential (primary) hypertension\n")
+        rebuilt = compile_reference(str(source), "icd", cache)
+        assert rebuilt != path
+        assert len(ReferenceDictionary(rebuilt, "icd")) == 2
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX permissions")
+    def test_default_cache_is_private_user_dir(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("RXHCC_REFERENCE_CACHE", raising=False)
+        monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+        source = tmp_path / ICD_SOURCE_FILE
+        source.write_text("E119    Type 2 diabetes mellitus without complications\n")
+        path = compile_reference(str(source), "icd")
+        cache_dir = tmp_path / "xdg" / "rxhcc" / "reference"
+        assert os.path.dirname(path) == str(cache_dir)
+        assert os.stat(cache_dir).st_mode & 0o777 == 0o700
+
+        shared = tmp_path / "shared"
+        shared.mkdir()
+        shared.chmod(0o777)
+        with pytest.raises(PermissionError):
+            compile_reference(str(source), "icd", str(shared))
+
+    def test_pickle_reopens_memmap(self, reference):
+        restored = pickle.loads(pickle.dumps(reference))
+        assert restored.icd.path == reference.icd.path
+        assert len(pickle.dumps(reference.ndc)) < 300 # 배열이 아닌 경로만 전달
+        assert "00002-1433-80" in restored.ndc
+
+class TestCodeValidityRule:
+    def test_flags_invalid_codes(self, reference):
+        engine = RxHCCRuleEngine()
+        engine.add_custom_rule(CodeValidityRule(reference))
+        claim = ClaimRecord(claim_id="R-1", patient_id="P", icd_codes=["M54.5", "E11.9"],
+                            ndc_codes=["00002-1433-80", "12345-6789-01"])
+        result = next(r for r in engine.validate(claim) if r.rule_id == "CODE-INVALID")
+        assert result.details["invalid_icd_codes"] == ["M54.5"]
+        assert result.details["invalid_ndc_codes"] == ["12345-6789-01"]
+        assert "M54.5, 12345-6789-01" in result.message
+
+        valid = ClaimRecord(claim_id="R-2", patient_id="P", icd_codes=["E11.9"], ndc_codes=["00002-1433-80"])
+        assert [r.rule_id for r in engine.validate(valid)] == ["PASS-000"]
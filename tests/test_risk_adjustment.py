@@ -0,0 +1,78 @@
+"""
+CMS-HCC Risk Adjustment Tests
+crosswalk 로드, hierarchy 적용, 환자별 RAF 벡터화 계산과 청구 단위 스칼라 계산의 일치 검증
+"""
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pandas as pd
+
+from engine.rules import ClaimRecord
+from engine.risk_adjustment import HCCModel, compute_risk_adjustment, normalize_hcc
+from engine.sagemaker_replication import SyntheticClaimGenerator
+from engine.vocab import EncodedClaims
+
+@pytest.fixture(scope="module")
+def model():
+    return HCCModel.from_dir()
+
+class TestHCCModel:
+    def test_crosswalk_lookup_normalizes_codes(self, model):
+        assert model.hccs_for_icds(["E11.65", "e11.9", "J44.1", "I10"]) == ["HCC18", "HCC19", "HCC111"]
+        assert normalize_hcc("18") == "HCC18"
+
+    def test_hierarchy_trumps_lower_hcc(self, model):
+        assert model.apply_hierarchy(["HCC19", "HCC18", "HCC17"]) == ["HCC17"]
+        assert model.apply_hierarchy(["HCC19", "HCC111", "HCC112"]) == ["HCC19", "HCC111"]
+        assert model.raf_score(["E11.65", "E11.9"]) == pytest.approx(0.302)
+
+    def test_cms_column_names(self):
+        crosswalk = pd.DataFrame({"Diagnosis Code": ["E1165", "E119"], "CMS-HCC Model Category V24": ["18", "19"]})
+        coefficients = pd.DataFrame({"hcc_code": ["HCC18", "HCC19"], "coefficient": [0.3, 0.1]})
+        hierarchy = pd.DataFrame({"hcc_code": ["18"], "dropped_hcc": ["19"]})
+        custom = HCCModel.from_frames(crosswalk, coefficients, hierarchy)
+        assert custom.raf_score(["E11.9"]) == pytest.approx(0.1)
+        assert custom.raf_score(["E11.65", "E11.9"]) == pytest.approx(0.3)
+
+class TestComputeRiskAdjustment:
+    def test_patient_raf_with_hierarchy(self, model):
+        df = pd.DataFrame([
+            {"claim_id": "C-1", "patient_id": "P-1", "icd_codes": "E11.9", "ndc_codes": "", "hcc_codes": "HCC19"},
+            {"claim_id": "C-2", "patient_id": "P-1", "icd_codes": "E11.65,J44.1", "ndc_codes": "", "hcc_codes": "HCC18"},
+            {"claim_id": "C-3", "patient_id": "P-2", "icd_codes": "I10", "ndc_codes": "", "hcc_codes": "HCC85,HCC999"},
+        ])
+        result = compute_risk_adjustment(df, model)
+        patients = result.patients.set_index("patient_id")
+        assert patients.loc["P-1", "raf_score"] == pytest.approx(0.302 + 0.335)
+        assert patients.loc["P-1", "n_hccs"] == 2
+        assert patients.loc["P-2", "raf_score"] == 0
+
+        p1 = result.patient_hccs[result.patient_hccs["patient_id"] == "P-1"].set_index("hcc_code")
+        assert bool(p1.loc["HCC19", "trumped"]) and not bool(p1.loc["HCC18", "trumped"])
+        # 청구 C-1의 HCC19는 같은 청구 ICD(E11.9)가 뒷받침, C-3은 둘 다 뒷받침 없음
+        unsupported = result.unsupported_hccs
+        assert list(unsupported["claim_id"]) == ["C-3", "C-3"]
+        assert list(unsupported["hcc_code"]) == ["HCC85", "HCC999"]
+        assert pd.isna(unsupported["coefficient"].iloc[1])
+
+    def test_vectorized_matches_scalar(self, model):
+        df = SyntheticClaimGenerator(seed=7).generate(1500, anomaly_rate=0.3)
+        df["patient_id"] = "PAT-" + (pd.Series(range(len(df))) % 300).astype(str) # 환자당 청구 여러 건
+        result = compute_risk_adjustment(df, model, encoded=EncodedClaims.from_dataframe(df))
+
+        icds, unsupported = {}, []
+        for row, data in enumerate(df.to_dict("records")):
+            claim = ClaimRecord.from_dict(data)
+            icds.setdefault(claim.patient_id, []).extend(claim.icd_codes)
+            supported = set(model.hccs_for_icds(claim.icd_codes))
+            unsupported += [(row, h) for h in claim.hcc_codes if h not in supported]
+
+        expected = {p: model.raf_score(codes) for p, codes in icds.items()}
+        got = dict(zip(result.patients["patient_id"], result.patients["raf_score"]))
+        assert got.keys() == expected.keys()
+        assert all(got[p] == pytest.approx(expected[p]) for p in expected)
+        assert list(zip(result.unsupported_hccs["row"], result.unsupported_hccs["hcc_code"])) == unsupported
+        assert result.summary()["patients"] == 300
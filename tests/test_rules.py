@@ -2,6 +2,7 @@
 RxHCC Rule Engine Unit Tests
 """
 import pytest
+import json
 import sys
 import os
 
@@ -12,9 +13,11 @@ from engine.rules import (
     RxHCCRuleEngine,
     ClaimRecord, 
     ValidationResult,
-    Severity
+    Severity,
+    ICD_CONFLICT_RULES
 )
-from engine.langgraph_integrity import run_validation, run_validation_sequential
+from engine.prefix_index import PrefixIndex
+from engine.langgraph_integrity import run_validation, run_validation_sequential, run_validation_batch
 
 class TestClaimRecord:
     """ClaimRecord 파싱 테스트"""
@@ -51,6 +54,12 @@ class TestClaimRecord:
         record = ClaimRecord.from_dict(data)
         assert record.icd_codes == ["E11.9", "I10"]
 
+    def test_slots_and_interned_codes(self):
+        a = ClaimRecord.from_dict({"claim_id": "C-1", "icd_codes": "E11." + "9", "ndc_codes": ""})
+        b = ClaimRecord.from_dict({"claim_id": "C-2", "icd_codes": " E11.9", "ndc_codes": ""})
+        assert not hasattr(a, "__dict__")
+        assert a.icd_codes[0] is b.icd_codes[0]
+
 class TestRuleEngine:
     """규칙 엔진 테스트"""
     def setup_method(self):
@@ -181,6 +190,328 @@ class TestRuleEngine:
         custom_results = [r for r in results if r.rule_id == "CUSTOM-001"]
         assert len(custom_results) == 1
 
+    def test_rule_metadata_shared_not_copied(self):
+        claims = [
+            ClaimRecord(claim_id=f"M-{i}", patient_id="P", icd_codes=["I10"], ndc_codes=["00002-1433-80"])
+            for i in range(2)
+        ]
+        first, second = (self.engine.validate(c)[0] for c in claims)
+        assert first.rule_id == "NDC-MISMATCH-001"
+        assert "expected_ndc_prefixes" not in first.details
+        assert first.rule_meta is second.rule_meta
+        assert first.to_dict()["details"]["expected_ndc_prefixes"] == first.rule_meta["expected_ndc_prefixes"]
+        assert not hasattr(first, "__dict__")
+
+class TestLazyMessages:
+    """템플릿 ID + 파라미터 기반 지연 렌더링"""
+    def test_message_rendered_on_demand(self):
+        claim = ClaimRecord(claim_id="L-1", patient_id="P", icd_codes=["E11.9"], ndc_codes=[], hcc_codes=["HCC18"])
+        result = RxHCCRuleEngine().validate(claim)[0]
+        assert result.template_id == "HCC-UPCODE-001"
+        assert result._message is None
+        assert result.message.startswith("HCC HCC18 (Diabetes with Chronic Complications)")
+        assert result.render_message("en").startswith("HCC HCC18 (Diabetes with Chronic Complications) is coded")
+        assert result.to_dict(lang="en")["message"] == result.render_message("en")
+
+    def test_pass_and_literal_messages(self):
+        engine = RxHCCRuleEngine()
+        passed = engine.validate(ClaimRecord(claim_id="L-2", patient_id="P", icd_codes=["E11.9"], ndc_codes=[]))[0]
+        assert passed.to_dict()["message"] == "Claim L-2: 모든 검증을 통과했습니다."
+        assert passed.render_message("en") == "Claim L-2: all checks passed."
+
+        # 기본 문구와 다른 충돌 규칙 메시지는 원문 유지
+        custom = [dict(ICD_CONFLICT_RULES[0], message="custom text")]
+        claim = ClaimRecord(claim_id="L-3", patient_id="P", icd_codes=["E10.9", "E11.9"], ndc_codes=[])
+        result = RxHCCRuleEngine(custom_conflicts=custom).validate(claim)[0]
+        assert result.template_id is None
+        assert result.render_message("en") == "custom text"
+
+class TestTriageMode:
+    """mode="triage": 첫 CRITICAL에서 중단 + 적응형 규칙 순서"""
+    def test_stops_at_first_critical(self):
+        engine = RxHCCRuleEngine()
+        claim = ClaimRecord(
+            claim_id="T-1", patient_id="P", icd_codes=["E10.9", "E11.9"],
+            ndc_codes=["00169-4060-12"], hcc_codes=["HCC18"]
+        )
+        full = engine.validate(claim)
+        triage = engine.validate(claim, mode="triage")
+        assert any(r.severity == Severity.CRITICAL for r in triage)
+        assert len(triage) < len(full)
+        assert all(r in full for r in triage)
+
+    def test_no_critical_matches_full(self):
+        engine = RxHCCRuleEngine()
+        claim = ClaimRecord(claim_id="T-2", patient_id="P", icd_codes=["I10"], ndc_codes=["00002-1433-80"])
+        assert engine.validate(claim, mode="triage") == engine.validate(claim)
+        with pytest.raises(ValueError):
+            engine.validate(claim, mode="fast")
+
+    def test_reorders_by_hit_rate(self):
+        engine = RxHCCRuleEngine()
+        engine.add_custom_rule(lambda c: ValidationResult(
+            rule_id="CUSTOM-CRIT", rule_name="Always Critical", severity=Severity.CRITICAL, message="x"
+        ))
+        engine._triage_scheduler().reorder_every = 4
+        claim = ClaimRecord(claim_id="T-3", patient_id="P", icd_codes=["I10"], ndc_codes=["00002-1433-80"])
+        for _ in range(10):
+            results = engine.validate(claim, mode="triage")
+        assert next(iter(engine.triage_stats())) == "custom:0"
+        assert [r.rule_id for r in results] == ["CUSTOM-CRIT"]
+
+    def test_stateful_rules_run_after_critical(self):
+        from engine.duplicates import DuplicateDetector
+        engine = RxHCCRuleEngine()
+        engine.add_custom_rule(lambda c: ValidationResult(
+            rule_id="CUSTOM-CRIT", rule_name="Always Critical", severity=Severity.CRITICAL, message="x"
+        ))
+        skipped = []
+        engine.add_custom_rule(lambda c: skipped.append(c.claim_id))
+        detector = DuplicateDetector()
+        engine.add_custom_rule(detector)
+        scheduler = engine._triage_scheduler()
+        scheduler.reorder_every = 1
+        claim = ClaimRecord(claim_id="T-5", patient_id="P", icd_codes=["I10"], ndc_codes=["00002-1433-80"],
+                            provider_id="PRV", claim_date="2024-03-01", claim_amount=10.0)
+        for i in range(6):
+            results = engine.validate(ClaimRecord.from_dict({**claim.to_dict(), "claim_id": f"T-5-{i}"}), mode="triage")
+        assert scheduler.order()[0] == "custom:0"
+        # 상태 없는 규칙은 중단 후 건너뛰고, 중복 탐지기는 매 청구를 관측하여 full 모드와 같은 결과
+        assert len(skipped) < 6
+        assert detector.stats()["checked"] == 6
+        assert [r.rule_id for r in results] == ["CUSTOM-CRIT", "DUPLICATE-001"]
+
+    def test_add_unit_initializes_counters_first(self):
+        from engine.triage import TriageScheduler
+        scheduler = TriageScheduler(["a"], reorder_every=0)
+        scheduler.add_unit("b")
+        scheduler.add_unit("b")
+        assert scheduler.units == ["a", "b"]
+        assert set(scheduler.order()) == {"a", "b"}
+        assert scheduler.stats()["b"]["calls"] == 0
+
+    def test_run_validation_triage(self):
+        claim = {"claim_id": "T-4", "patient_id": "P", "icd_codes": "E10.9,E11.9", "ndc_codes": "00088-2500-33"}
+        state = run_validation(claim, mode="triage")
+        assert state["stage"] == "escalated"
+        assert state["metadata"]["mode"] == "triage"
+
+class TestRuleProfiling:
+    def test_disabled_by_default(self):
+        engine = RxHCCRuleEngine()
+        assert engine.profile_snapshot() is None
+        assert engine.profile_prometheus() == ""
+
+    def test_counts_calls_hits_and_exceptions(self):
+        engine = RxHCCRuleEngine()
+        engine.enable_profiling()
+
+        def broken_rule(claim):
+            raise RuntimeError("boom")
+        engine.add_custom_rule(broken_rule)
+
+        conflict = ClaimRecord(claim_id="PR-1", patient_id="P", icd_codes=["E10.9", "E11.9"], ndc_codes=[])
+        normal = ClaimRecord(claim_id="PR-2", patient_id="P", icd_codes=["I10"], ndc_codes=[])
+        for claim in (conflict, normal, normal):
+            engine.validate(claim)
+
+        snapshot = engine.profile_snapshot()
+        assert snapshot["icd_conflicts"]["calls"] == 3
+        assert snapshot["icd_conflicts"]["hits"] == 1
+        assert snapshot["glp1"]["hits"] == 0
+        assert snapshot["custom:0"]["exceptions"] == 3
+        assert snapshot["icd_conflicts"]["p99_us"] >= snapshot["icd_conflicts"]["p50_us"]
+
+        text = engine.profile_prometheus()
+        assert 'rxhcc_rule_hits_total{rule="icd_conflicts"} 1' in text
+        assert 'rxhcc_rule_exceptions_total{rule="custom:0"} 3' in text
+        assert 'rxhcc_rule_latency_seconds_count{rule="hcc_upcoding"} 3' in text
+
+class TestPrefixIndex:
+    """NDC/ICD prefix trie 테스트"""
+    def test_match_returns_all_prefix_groups(self):
+        index = PrefixIndex.from_groups({
+            "E11": ["00002-1433", "00169-4060"],
+            "E66": ["00169-4060"],
+            "GLP1": ["00169"],
+        })
+        assert index.match("00169-4060-12") == {"E11", "E66", "GLP1"}
+        assert index.match("00002-1433-80") == {"E11"}
+        assert index.match("99999-0000-00") == frozenset()
+        assert len(index) == 3
+
+    def test_matches_single_group(self):
+        index = PrefixIndex.from_groups({"A": ["E10"], "B": ["E1"]})
+        assert index.matches("E10.9", "A")
+        assert index.matches("E11.9", "B")
+        assert not index.matches("E11.9", "A")
+
+    def test_large_formulary(self):
+        """대량 NDC prefix 매핑도 기존 startswith 의미와 동일"""
+        prefixes = [f"{i:05d}-{j:04d}" for i in range(200) for j in range(0, 1000, 10)]
+        engine = RxHCCRuleEngine(custom_mappings={
+            "E11": {"valid_ndc_prefixes": prefixes, "description": "Type 2 Diabetes Mellitus"}
+        })
+        ok = ClaimRecord(claim_id="F-1", patient_id="P", icd_codes=["E11.9"], ndc_codes=["00150-0990-01"])
+        bad = ClaimRecord(claim_id="F-2", patient_id="P", icd_codes=["E11.9"], ndc_codes=["00150-0991-01"])
+        assert not [r for r in engine.validate(ok) if r.rule_id == "NDC-MISMATCH-001"]
+        assert [r for r in engine.validate(bad) if r.rule_id == "NDC-MISMATCH-001"]
+
+    def test_conflict_index_preserves_rule_order(self):
+        """역인덱스로 후보 규칙만 평가해도 결과는 테이블 순서 유지"""
+        rules = [
+            {"rule_id": "C-1", "name": "n1", "codes_a": ["J45"], "codes_b": ["J44"],
+             "severity": Severity.WARNING, "message": "m1"},
+            {"rule_id": "C-2", "name": "n2", "codes_a": ["Q99"], "codes_b": ["R99"],
+             "severity": Severity.WARNING, "message": "m2"},
+            {"rule_id": "C-3", "name": "n3", "codes_a": ["E10"], "codes_b": ["E11", "J44"],
+             "severity": Severity.CRITICAL, "message": "m3"},
+        ]
+        engine = RxHCCRuleEngine(custom_conflicts=rules)
+        record = ClaimRecord(claim_id="IX-1", patient_id="P", icd_codes=["J44.1", "E10.9", "J45.20"], ndc_codes=[])
+        assert [r.rule_id for r in engine._check_icd_conflicts(record)] == ["C-1", "C-3"]
+
+class TestSignatureCache:
+    """시그니처 LRU 캐시 테스트"""
+    def _claim(self, claim_id, icd_codes, hcc_codes=None):
+        return ClaimRecord(
+            claim_id=claim_id,
+            patient_id="PAT-C",
+            icd_codes=list(icd_codes),
+            ndc_codes=["00169-4060-12"],
+            hcc_codes=list(hcc_codes or []),
+        )
+
+    def test_cache_matches_uncached_and_rebinds(self):
+        plain = RxHCCRuleEngine()
+        cached = RxHCCRuleEngine(cache_size=8)
+        first = self._claim("C-1", ["E10.9", "I10"], ["HCC18"])
+        second = self._claim("C-2", ["E10.9", "I10"], ["HCC18"])
+
+        cached.validate(first)
+        results = cached.validate(second)
+        assert [r.to_dict() for r in results] == [r.to_dict() for r in plain.validate(second)]
+        # 청구 고유 리스트는 캐시 원본이 아닌 현재 청구의 객체여야 함
+        upcode = next(r for r in results if r.rule_id == "HCC-UPCODE-001")
+        assert upcode.details["actual_icds"] is second.icd_codes
+        assert cached.cache_stats()["hits"] == 1
+        assert cached.cache_stats()["misses"] == 1
+
+    def test_pass_message_bound_to_claim(self):
+        engine = RxHCCRuleEngine(cache_size=8)
+        engine.validate(ClaimRecord(claim_id="P-1", patient_id="P", icd_codes=["E11.9"], ndc_codes=["00002-1433-80"]))
+        results = engine.validate(ClaimRecord(claim_id="P-2", patient_id="P", icd_codes=["E11.9"], ndc_codes=["00002-1433-80"]))
+        assert results[0].rule_id == "PASS-000"
+        assert "P-2" in results[0].message
+        assert results[0].details["claim_id"] == "P-2"
+
+    def test_eviction_counter(self):
+        engine = RxHCCRuleEngine(cache_size=2)
+        for i, icd in enumerate(["E11.9", "I10", "J44.1", "E11.9"]):
+            engine.validate(self._claim(f"E-{i}", [icd]))
+        stats = engine.cache_stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 2
+        assert stats["hits"] == 0
+
+    def test_rules_version_tracks_tables(self):
+        default = RxHCCRuleEngine()
+        custom = RxHCCRuleEngine(custom_conflicts=ICD_CONFLICT_RULES[:1])
+        assert default.rules_version == RxHCCRuleEngine().rules_version
+        assert default.rules_version != custom.rules_version
+
+class TestConcurrentEngine:
+    """공유 엔진 동시 검증 + 규칙 교체 테스트"""
+    def test_validate_sees_consistent_snapshot(self):
+        import threading
+        from engine.ruleset import RuleSet
+
+        with_conflicts = RuleSet.default()
+        without_conflicts = RuleSet.from_tables(conflict_rules=[])
+        engine = RxHCCRuleEngine()
+        claim = ClaimRecord(claim_id="T-1", patient_id="P", icd_codes=["E10.9", "E11.65"], ndc_codes=[])
+        # 커스텀 규칙 finding이 생기면 PASS-000은 빠지므로 비교에서 제외
+        ignored = ("CUSTOM-T", "PASS-000")
+        expected = {
+            tuple(r.rule_id for r in engine.validate(claim) if r.rule_id not in ignored),
+            tuple(r.rule_id for r in RxHCCRuleEngine(ruleset=without_conflicts).validate(claim) if r.rule_id not in ignored),
+        }
+        stop = threading.Event()
+        errors = []
+
+        def reader(mode):
+            while not stop.is_set():
+                ids = tuple(r.rule_id for r in engine.validate(claim, mode=mode) if r.rule_id not in ignored)
+                if mode == "full" and ids not in expected:
+                    errors.append(ids)
+
+        readers = [threading.Thread(target=reader, args=(m,)) for m in ("full", "full", "triage")]
+        for t in readers:
+            t.start()
+        for i in range(200):
+            engine.swap_ruleset(without_conflicts if i % 2 else with_conflicts)
+            if i % 20 == 0:
+                engine.add_custom_rule(lambda c: ValidationResult(
+                    "CUSTOM-T", "custom", Severity.INFO, "", {"claim_id": c.claim_id}))
+        stop.set()
+        for t in readers:
+            t.join()
+
+        assert not errors
+        assert len(engine.custom_rules) == 10
+        custom = [r for r in engine.validate(claim, mode="triage") if r.rule_id == "CUSTOM-T"]
+        assert len(custom) == 10
+
+    def test_toggle_cache_and_codegen_during_validate(self, tmp_path, monkeypatch):
+        import threading
+        monkeypatch.setenv("RXHCC_CODEGEN_DIR", str(tmp_path))
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6) # 두 번 읽기 사이의 스레드 전환을 자주 일으킴
+        engine = RxHCCRuleEngine()
+        claim = ClaimRecord(claim_id="T-2", patient_id="P", icd_codes=["E10.9", "E11.65"], ndc_codes=["00088-2500-33"])
+        expected = engine.validate(claim)
+        stop = threading.Event()
+        errors = []
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    if engine.validate(claim) != expected:
+                        errors.append("mismatch")
+                    engine.cache_stats()
+                except Exception as e:
+                    errors.append(e)
+
+        readers = [threading.Thread(target=reader) for _ in range(3)]
+        try:
+            for t in readers:
+                t.start()
+            for i in range(100):
+                engine.enable_cache(64)
+                engine.enable_codegen()
+                engine.disable_cache()
+                engine.disable_codegen()
+        finally:
+            stop.set()
+            for t in readers:
+                t.join()
+            sys.setswitchinterval(interval)
+        assert not errors
+
+    def test_concurrent_writers_do_not_lose_rules(self):
+        import threading
+        engine = RxHCCRuleEngine()
+        rule = lambda c: None
+        threads = [
+            threading.Thread(target=lambda: [engine.add_custom_rule(rule) for _ in range(50)])
+            for _ in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(engine.custom_rules) == 200
+
 class TestLangGraphWorkflow:
     """LangGraph 워크플로우 테스트"""
     def test_sequential_normal(self):
@@ -222,5 +553,248 @@ class TestLangGraphWorkflow:
         assert "results" in state
         assert "metadata" in state
 
+    def test_graph_and_engine_compiled_once(self, monkeypatch):
+        from engine import langgraph_integrity as li
+        from engine.ruleset import RuleSet
+        if not li.LANGGRAPH_AVAILABLE:
+            pytest.skip("langgraph not installed")
+        li.clear_validation_cache()
+        builds = []
+        original = li.build_validation_graph
+        monkeypatch.setattr(li, "build_validation_graph", lambda: builds.append(1) or original())
+        try:
+            claim = {"claim_id": "WF-004", "patient_id": "P", "icd_codes": "E10.9,E11.65", "ndc_codes": "00088-2500-33"}
+            engine = li.get_validation_engine()
+            for _ in range(3):
+                assert run_validation(claim)["stage"] == "escalated"
+            assert len(builds) == 1
+            assert li.get_validation_engine() is engine
+
+            # 규칙 세트 변경 시에만 재컴파일, 새 규칙이 바로 반영
+            li.set_validation_ruleset(RuleSet.from_tables(conflict_rules=[]))
+            state = run_validation(claim)
+            assert len(builds) == 2
+            assert not any(r["rule_id"].startswith("CONFLICT") for r in state["results"])
+            run_validation(claim)
+            assert len(builds) == 2
+        finally:
+            li.clear_validation_cache()
+
+class TestRuleFanOut:
+    """full 모드 그래프: 규칙 단위별 branch fan-out + reducer 병합"""
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        from engine import langgraph_integrity as li
+        if not li.LANGGRAPH_AVAILABLE:
+            pytest.skip("langgraph not installed")
+        li.clear_validation_cache()
+        yield li
+        li.clear_validation_cache()
+
+    CLAIMS = [
+        {"claim_id": "F-1", "patient_id": "P", "icd_codes": "E10.9,E11.65", "ndc_codes": "00088-2500-33", "hcc_codes": "HCC85"},
+        {"claim_id": "F-2", "patient_id": "P", "icd_codes": "I10", "ndc_codes": "00169-4060-12"},
+        {"claim_id": "F-3", "patient_id": "P", "icd_codes": "", "ndc_codes": ""},
+    ]
+
+    def test_graph_matches_sequential_without_duplicates(self, fresh_cache):
+        li = fresh_cache
+        li.get_validation_engine().add_custom_rule(lambda c: ValidationResult(
+            rule_id="CUSTOM-FAN", rule_name="Custom", severity=Severity.WARNING, message="x"
+        ) if c.claim_id == "F-2" else None)
+        for claim in self.CLAIMS:
+            graph_state = li.run_validation(claim)
+            sequential_state = li.run_validation_sequential(claim)
+            assert graph_state["results"] == sequential_state["results"]
+            assert graph_state["stage"] == sequential_state["stage"]
+            assert graph_state["metadata"]["risk_score"] == sequential_state["metadata"]["risk_score"]
+
+    def test_irrelevant_branches_skipped(self, fresh_cache):
+        units = [li_state["metadata"]["rule_units"] for li_state in map(fresh_cache.run_validation, self.CLAIMS)]
+        assert units[0] == ["icd_ndc_mapping", "icd_conflicts", "glp1", "hcc_upcoding"]
+        assert units[1] == ["icd_ndc_mapping", "icd_conflicts", "glp1"]
+        assert units[2] == []
+
+    def test_slow_branches_overlap(self, fresh_cache):
+        import threading
+        li = fresh_cache
+        # 두 branch가 동시에 규칙 안에 있어야만 barrier를 통과 (순차 실행이면 timeout으로 BrokenBarrierError)
+        barrier = threading.Barrier(2, timeout=10)
+        met = []
+        def slow_rule(claim):
+            met.append(barrier.wait())
+            return None
+        engine = li.get_validation_engine()
+        engine.add_custom_rule(slow_rule)
+        engine.add_custom_rule(slow_rule)
+        state = li.run_validation(self.CLAIMS[2])
+        assert sorted(met) == [0, 1]
+        assert state["metadata"]["rule_units"] == ["custom:0", "custom:1"]
+
+class TestLeanState:
+    """
+    상태는 ClaimRecord/ValidationResult 객체와 severity 증분 카운트를 전달하고,
+    반환 상태는 results/claim_record로 한 번 직렬화된 JSON 호환 값만 보관
+    """
+    CLAIM = {"claim_id": "L-1", "patient_id": "P", "icd_codes": "E10.9,E11.65", "ndc_codes": "00088-2500-33", "hcc_codes": "HCC18"}
+
+    @pytest.mark.parametrize("mode", ["full", "triage"])
+    def test_serialized_output_and_incremental_counts(self, mode):
+        from collections import Counter
+        for state in (run_validation(self.CLAIM, mode), run_validation_sequential(self.CLAIM, mode),
+                      run_validation_batch([self.CLAIM], mode)[0]):
+            # 반환 상태는 직렬화된 값만 보관 (typed findings/record, 규칙 branch 기록, 규칙 스냅샷 없음)
+            assert not {"findings", "rule_findings", "record", "engine_state"} & state.keys()
+            assert state["claim_record"] == ClaimRecord.from_dict(self.CLAIM).to_dict()
+            assert state["claim_record"]["icd_codes"] == ["E10.9", "E11.65"]
+            json.dumps(state)
+            assert all(isinstance(r, dict) for r in state["results"])
+            assert state["results"][-1]["rule_id"] == "ESCALATE"
+            assert state["severity_counts"] == dict(Counter(r["severity"] for r in state["results"]))
+            assert state["stage"] == "escalated"
+
+    def test_rule_findings_cleared_after_merge(self):
+        from engine import langgraph_integrity as li
+        if li.get_validation_graph() is None:
+            pytest.skip("LangGraph not installed")
+        raw = li.get_validation_graph().invoke(li._initial_state(self.CLAIM, "full"))
+        assert raw["rule_findings"] == []
+        assert raw["metadata"]["rule_units"]
+
+    def test_claim_parsed_once(self, monkeypatch):
+        from engine import langgraph_integrity as li
+        calls = []
+        original = ClaimRecord.from_dict.__func__
+        monkeypatch.setattr(ClaimRecord, "from_dict", classmethod(lambda cls, data: calls.append(1) or original(cls, data)))
+        # 기본 설정(fast path 사전 필터 켜짐): 사전 필터가 파싱한 record를 parse_claim이 재사용
+        for fn in (li.run_validation, li.run_validation_sequential):
+            calls.clear()
+            fn(self.CLAIM)
+            assert len(calls) == 1
+        for sequential in (False, True):
+            calls.clear()
+            li.run_validation_batch([self.CLAIM, dict(self.CLAIM, claim_id="L-2")], sequential=sequential)
+            assert len(calls) == 2
+
+    def test_parse_error_state(self):
+        state = run_validation_sequential(None)
+        assert state["claim_record"] == {}
+        assert [r["rule_id"] for r in state["results"]] == ["PARSE-ERR", "ESCALATE"]
+        assert state["severity_counts"] == {"CRITICAL": 2}
+
+class TestFastPath:
+    """규칙 어휘에 걸리는 코드가 없는 청구는 파이프라인을 건너뛰고 같은 최종 상태 반환"""
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        from engine import langgraph_integrity as li
+        li.clear_validation_cache()
+        li.reset_fast_path_stats()
+        yield li
+        li.set_fast_path_enabled(True)
+        li.clear_validation_cache()
+
+    ROUTINE = [
+        {"claim_id": "R-1", "patient_id": "P", "icd_codes": "J06.9,Z00.00", "ndc_codes": "00093-0058-01", "claim_amount": 85.0},
+        {"claim_id": "R-2", "patient_id": "P", "icd_codes": "M54.50", "ndc_codes": ""},
+        {"claim_id": "R-3", "patient_id": "P", "icd_codes": "", "ndc_codes": "", "hcc_codes": "HCC999"},
+    ]
+
+    @pytest.mark.parametrize("mode", ["full", "triage"])
+    def test_fast_path_state_matches_full_pipeline(self, fresh_cache, mode):
+        li = fresh_cache
+        fast = [li.run_validation(c, mode) for c in self.ROUTINE]
+        assert li.fast_path_stats()["fast_path"] == len(self.ROUTINE)
+        li.set_fast_path_enabled(False)
+        full = [li.run_validation(c, mode) for c in self.ROUTINE]
+        for fast_state, full_state in zip(fast, full):
+            # 실행된 branch 기록(rule_units)만 다르고 키 구성과 나머지 값은 동일
+            assert fast_state.keys() == full_state.keys()
+            assert fast_state["metadata"].keys() == full_state["metadata"].keys()
+            assert {k: v for k, v in fast_state.items() if k != "metadata"} == {k: v for k, v in full_state.items() if k != "metadata"}
+            full_state["metadata"].pop("rule_units", None)
+            assert fast_state["metadata"].pop("rule_units", []) == []
+            assert fast_state["metadata"] == full_state["metadata"]
+            assert fast_state["stage"] == "approved"
+
+    @pytest.mark.parametrize("claim", [
+        {"claim_id": "S-1", "icd_codes": "E10.9,E11.65"},                       # 충돌 규칙 코드
+        {"claim_id": "S-2", "icd_codes": "I10", "ndc_codes": "00093-0058-01"},  # 매핑 카테고리 + NDC
+        {"claim_id": "S-3", "ndc_codes": " 00169-4060-12"},                     # GLP-1
+        {"claim_id": "S-4", "hcc_codes": "hcc18"},                              # HCC 업코딩
+    ])
+    def test_rule_vocabulary_codes_take_full_path(self, claim):
+        engine = RxHCCRuleEngine()
+        record = ClaimRecord.from_dict(claim)
+        assert not engine.is_fast_path(record)
+        assert engine.validate(record)[0].severity != Severity.PASS
+
+    def test_custom_and_declarative_rules_disable_fast_path(self):
+        engine = RxHCCRuleEngine()
+        record = ClaimRecord.from_dict(self.ROUTINE[0])
+        assert engine.is_fast_path(record)
+        engine.add_declarative_rule({"rule_id": "DECL-J06", "message": "x", "icd_any": ["j06"]})
+        assert not engine.is_fast_path(record)
+        assert engine.is_fast_path(ClaimRecord.from_dict(self.ROUTINE[1]))
+        engine.add_custom_rule(lambda c: None)
+        assert not engine.is_fast_path(ClaimRecord.from_dict(self.ROUTINE[1]))
+
+    @pytest.mark.parametrize("sequential", [False, True])
+    def test_batch_reports_fast_path_share(self, fresh_cache, sequential):
+        li = fresh_cache
+        claims = self.ROUTINE + [{"claim_id": "S-1", "patient_id": "P", "icd_codes": "E10.9,E11.65", "ndc_codes": "00088-2500-33"}]
+        states = li.run_validation_batch(claims, sequential=sequential)
+        assert [s["claim"]["claim_id"] for s in states] == [c["claim_id"] for c in claims]
+        assert [s["stage"] for s in states] == ["approved"] * 3 + ["escalated"]
+        assert li.fast_path_stats() == {"claims": 4, "fast_path": 3, "fast_path_share": 0.75}
+
+class TestValidationBatch:
+    """run_validation_batch / arun_validation_batch: 입력 순서 유지 + 청구 단위 오류 격리"""
+    def _claims(self):
+        return [
+            {"claim_id": f"B-{i}", "patient_id": "P", "icd_codes": "E10.9,E11.65" if i % 3 == 0 else "E11.9",
+             "ndc_codes": "00002-1433-80"}
+            for i in range(12)
+        ]
+
+    @pytest.fixture
+    def failing_claim(self, monkeypatch):
+        """B-5만 escalation 단계에서 예외 (노드가 잡지 않는 오류)"""
+        from engine import langgraph_integrity as li
+        original = li.escalation_check
+        def escalation_check(state):
+            if state["claim"]["claim_id"] == "B-5":
+                raise RuntimeError("boom")
+            return original(state)
+        monkeypatch.setattr(li, "escalation_check", escalation_check)
+        li.clear_validation_cache() # 패치된 노드로 그래프 재컴파일
+        yield "B-5"
+        li.clear_validation_cache()
+
+    def _check(self, states, claims):
+        assert [s["claim"]["claim_id"] for s in states] == [c["claim_id"] for c in claims]
+        for state, claim in zip(states, claims):
+            if claim["claim_id"] == "B-5":
+                assert state["stage"] == "error"
+                assert state["results"][-1]["rule_id"] == "PIPELINE-ERR"
+            else:
+                assert state["stage"] == ("escalated" if claim["icd_codes"].startswith("E10") else "approved")
+
+    @pytest.mark.parametrize("sequential", [False, True])
+    def test_batch_order_and_isolation(self, failing_claim, sequential):
+        from engine.langgraph_integrity import run_validation_batch
+        claims = self._claims()
+        self._check(run_validation_batch(claims, max_concurrency=3, sequential=sequential), claims)
+
+    @pytest.mark.parametrize("sequential", [False, True])
+    def test_async_batch_order_and_isolation(self, failing_claim, sequential):
+        import asyncio
+        from engine.langgraph_integrity import arun_validation_batch
+        claims = self._claims()
+        self._check(asyncio.run(arun_validation_batch(claims, max_concurrency=3, sequential=sequential)), claims)
+
+    def test_empty_batch(self):
+        from engine.langgraph_integrity import run_validation_batch
+        assert run_validation_batch([]) == []
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
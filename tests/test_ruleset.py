@@ -0,0 +1,148 @@
+"""
+RuleSet Tests
+컴파일된 규칙 세트 스냅샷, 파일 로드, 엔진 hot swap 검증
+"""
+import pytest
+import json
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, Severity, ICD_CONFLICT_RULES
+from engine.ruleset import RuleSet, RuleSetReloader, YAML_AVAILABLE
+
+def glp1_claim():
+    return ClaimRecord(claim_id="RS-1", patient_id="P", icd_codes=["I10"], ndc_codes=["00169-4060-12"])
+
+class TestRuleSet:
+    def test_default_is_frozen_and_versioned(self):
+        rs = RuleSet.default()
+        assert rs.version == RuleSet.default().version
+        assert isinstance(rs.conflicts, tuple)
+        assert rs.conflicts[0].severity == Severity.CRITICAL
+        with pytest.raises(TypeError):
+            rs.mappings["X99"] = None
+        with pytest.raises(Exception):
+            rs.version = "other"
+
+    def test_version_changes_with_content(self):
+        rs = RuleSet.default()
+        data = rs.to_dict()
+        data["conflict_rules"] = data["conflict_rules"][:1]
+        assert RuleSet.from_dict(data).version != rs.version
+
+    def test_json_file_roundtrip(self, tmp_path):
+        path = tmp_path / "rules.json"
+        RuleSet.default().to_file(str(path))
+        loaded = RuleSet.from_file(str(path))
+        assert loaded.version == RuleSet.default().version
+        assert loaded.source == str(path)
+
+    def test_yaml_file_roundtrip(self, tmp_path):
+        if not YAML_AVAILABLE:
+            pytest.skip("PyYAML not installed")
+        path = tmp_path / "rules.yaml"
+        RuleSet.default().to_file(str(path))
+        assert RuleSet.from_file(str(path)).version == RuleSet.default().version
+
+class TestRuleSetSwap:
+    def test_engine_uses_custom_tables(self):
+        engine = RxHCCRuleEngine(custom_conflicts=ICD_CONFLICT_RULES[:1])
+        assert len(engine.ruleset.conflicts) == 1
+        assert engine.conflict_rules[0]["rule_id"] == "CONFLICT-001"
+
+    def test_swap_changes_results_and_cache_key(self):
+        engine = RxHCCRuleEngine(cache_size=16)
+        assert any(r.rule_id == "GLP1-001" for r in engine.validate(glp1_claim()))
+
+        data = engine.ruleset.to_dict()
+        data["glp1_valid_icd_prefixes"].append("I10")
+        engine.swap_ruleset(RuleSet.from_dict(data))
+        assert not any(r.rule_id == "GLP1-001" for r in engine.validate(glp1_claim()))
+        assert engine.cache_stats()["misses"] == 2
+
+    def test_reloader_polls_file(self, tmp_path):
+        path = tmp_path / "rules.json"
+        RuleSet.default().to_file(str(path))
+        engine = RxHCCRuleEngine()
+        reloader = RuleSetReloader(engine, str(path))
+        assert reloader.poll() is False # 동일 버전은 교체하지 않음
+
+        data = json.loads(path.read_text(encoding="utf-8"))
+        data["glp1_valid_icd_prefixes"].append("I10")
+        path.write_text(json.dumps(data), encoding="utf-8")
+        os.utime(path, (1, 1))
+        assert reloader.poll() is True
+        assert engine.ruleset.source == str(path)
+        assert not any(r.rule_id == "GLP1-001" for r in engine.validate(glp1_claim()))
+
+    def test_reloader_keeps_rules_on_bad_file(self, tmp_path):
+        path = tmp_path / "rules.json"
+        path.write_text("{not json", encoding="utf-8")
+        engine = RxHCCRuleEngine()
+        version = engine.rules_version
+        assert RuleSetReloader(engine, str(path)).poll() is False
+        assert engine.rules_version == version
+
+INSULIN_WITHOUT_DIABETES = {
+    "rule_id": "DECL-001",
+    "name": "Insulin without Diabetes",
+    "severity": "WARNING",
+    "message": "인슐린 처방에 당뇨 진단이 없습니다.",
+    "ndc_any": ["00088-2500"],
+    "icd_none": ["E10", "E11"],
+}
+
+class TestDeclarativeRules:
+    def test_any_and_none_conditions(self):
+        engine = RxHCCRuleEngine()
+        engine.add_custom_rule(INSULIN_WITHOUT_DIABETES)
+        assert not engine.has_custom_rules # callable 경로가 아닌 규칙 세트로 컴파일
+        assert engine.ruleset.declarative[0].rule_id == "DECL-001"
+
+        no_diabetes = ClaimRecord(claim_id="D-1", patient_id="P", icd_codes=["I10"], ndc_codes=["00088-2500-33"])
+        results = engine.validate(no_diabetes)
+        assert [r.rule_id for r in results] == ["NDC-MISMATCH-001", "DECL-001"]
+        assert results[1].severity == Severity.WARNING
+        assert results[1].all_details()["conditions"]["icd_none"] == ("E10", "E11")
+
+        diabetes = ClaimRecord(claim_id="D-2", patient_id="P", icd_codes=["e11.9"], ndc_codes=["00088-2500-33"])
+        assert "DECL-001" not in [r.rule_id for r in engine.validate(diabetes)]
+
+    def test_requires_all_any_fields(self):
+        rule = dict(INSULIN_WITHOUT_DIABETES, rule_id="DECL-002", hcc_any=["HCC18"])
+        engine = RxHCCRuleEngine(ruleset=RuleSet.default().with_declarative_rules([rule]))
+        claim = ClaimRecord(claim_id="D-3", patient_id="P", icd_codes=["I10"], ndc_codes=["00088-2500-33"])
+        assert "DECL-002" not in [r.rule_id for r in engine.validate(claim)]
+        claim.hcc_codes = ["HCC18"]
+        assert "DECL-002" in [r.rule_id for r in engine.validate(claim)]
+
+    def test_invalid_rules_rejected(self):
+        with pytest.raises(ValueError):
+            RuleSet.default().with_declarative_rules([{"rule_id": "X", "message": "m", "icd_none": ["E11"]}])
+        with pytest.raises(ValueError):
+            RuleSet.default().with_declarative_rules([dict(INSULIN_WITHOUT_DIABETES, ndc_in=["1"])])
+        with pytest.raises(ValueError):
+            RuleSet.default().with_declarative_rules([dict(INSULIN_WITHOUT_DIABETES, rule_id="D\nimport os")])
+        conflicts = [dict(ICD_CONFLICT_RULES[0], rule_id="C-1\rX")]
+        with pytest.raises(ValueError):
+            RuleSet.from_tables(conflict_rules=conflicts)
+
+    def test_cached_batch_and_file_roundtrip(self, tmp_path):
+        ruleset = RuleSet.default().with_declarative_rules([INSULIN_WITHOUT_DIABETES])
+        assert ruleset.version != RuleSet.default().version
+        path = tmp_path / "rules.json"
+        ruleset.to_file(str(path))
+        assert RuleSet.from_file(str(path)).version == ruleset.version
+
+        claims = [
+            ClaimRecord(claim_id=f"D-{i}", patient_id="P", icd_codes=["I10"], ndc_codes=["00088-2500-33"])
+            for i in range(4)
+        ]
+        plain = RxHCCRuleEngine(ruleset=ruleset)
+        cached = RxHCCRuleEngine(ruleset=ruleset, cache_size=16)
+        expected = [plain.validate(c) for c in claims]
+        assert [cached.validate(c) for c in claims] == expected
+        assert plain.validate_many(claims) == expected
+        assert cached.cache_stats()["hits"] == 3
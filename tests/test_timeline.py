@@ -0,0 +1,71 @@
+"""
+Patient Timeline Tests
+환자별 타임라인 인덱스와 종단 규칙(custom rule 등록) 검증
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from engine.rules import RxHCCRuleEngine, ClaimRecord, Severity
+from engine.timeline import TimelineStore, LongitudinalRule, opioid_refill_rule
+
+HYDROCODONE = "68382-0087-06"
+
+def rx(claim_id, date, ndc=HYDROCODONE, patient="PAT-1", icd=("M54.5",)):
+    return ClaimRecord(claim_id=claim_id, patient_id=patient, icd_codes=list(icd), ndc_codes=[ndc], claim_date=date)
+
+class TestTimelineStore:
+    def test_sorted_insert_and_window(self):
+        store = TimelineStore()
+        for claim_id, date in [("A", "2024-01-10"), ("B", "2024-01-01"), ("C", "2024-01-20"), ("D", "2024-01-15")]:
+            store.add(rx(claim_id, date))
+        timeline = store.timeline("PAT-1")
+        assert [e.claim_id for e in timeline.events] == ["B", "A", "D", "C"]
+        assert list(timeline.days) == sorted(timeline.days)
+
+        day = timeline.events[1].day # 2024-01-10
+        assert [e.claim_id for e in store.window("PAT-1", day, 9, 5)] == ["B", "A", "D"]
+        assert store.add(rx("A", "2024-01-10")) is None # 같은 청구 재삽입 무시
+        assert store.n_events == 4
+
+    def test_ndc_class_query(self):
+        store = TimelineStore()
+        store.add(rx("A", "2024-02-01"))
+        store.add(rx("B", "2024-02-05", ndc="00002-1433-80"))
+        hits = store.find_ndc_class_within(rx("C", "2024-02-10"), "opioid", 15)
+        assert [e.claim_id for e in hits] == ["A"]
+        assert store.find_ndc_class_within(rx("C", "2024-03-10"), "opioid", 15) == []
+
+    def test_horizon_prunes_old_events(self):
+        store = TimelineStore(horizon_days=30)
+        store.add(rx("A", "2024-01-01"))
+        store.add(rx("B", "2024-03-01"))
+        assert [e.claim_id for e in store.timeline("PAT-1").events] == ["B"]
+        assert store.n_events == 1
+
+class TestLongitudinalRules:
+    def test_opioid_refill_via_custom_rule_api(self):
+        engine = RxHCCRuleEngine()
+        store = TimelineStore()
+        engine.add_custom_rule(opioid_refill_rule(store, within_days=15))
+
+        assert engine.validate(rx("O-1", "2024-05-01"))[0].rule_id == "PASS-000"
+        early = engine.validate(rx("O-2", "2024-05-10"))
+        assert [r.rule_id for r in early] == ["OPIOID-REFILL-001"]
+        assert early[0].details["days_between"] == 9
+        assert early[0].severity == Severity.WARNING
+        assert engine.validate(rx("O-3", "2024-06-30"))[0].rule_id == "PASS-000"
+        # 다른 환자는 영향 없음
+        assert engine.validate(rx("O-4", "2024-06-30", patient="PAT-2"))[0].rule_id == "PASS-000"
+
+    def test_shared_store_adds_claim_once(self):
+        engine = RxHCCRuleEngine()
+        store = TimelineStore()
+        seen = []
+        engine.add_custom_rule(opioid_refill_rule(store))
+        engine.add_custom_rule(LongitudinalRule(store, lambda claim, s: seen.append(len(s.timeline(claim.patient_id))) or None))
+        engine.validate(rx("S-1", "2024-01-01"))
+        engine.validate(rx("S-2", "2024-01-02"))
+        assert store.n_events == 2
+        assert seen == [1, 2]